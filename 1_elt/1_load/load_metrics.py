@@ -0,0 +1,171 @@
+#################################################################################
+##### This module instruments the load scripts with structured run records. #####
+##### 1. Times the read, parse, dedup and insert phases per table.          #####
+##### 2. Tracks input bytes, rows in/out, peak RSS and rows/s.              #####
+##### 3. Appends one JSON line per table to logs/load_runs.jsonl and        #####
+#####    optionally to the meta.load_runs table in DuckDB.                  #####
+#################################################################################
+
+import json
+import sys
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+# Get project root directory (3 levels up: 1_load -> 1_elt -> project_root)
+project_root = Path(__file__).parent.parent.parent
+log_path = project_root / "logs" / "load_runs.jsonl"
+
+RUNS_TABLE = "meta.load_runs"
+PHASES = ("read", "parse", "dedup", "insert")
+
+# Column order of the meta.load_runs table (and of each JSON line)
+RECORD_COLUMNS = {
+    "run_id": "VARCHAR",
+    "source": "VARCHAR",
+    "table_name": "VARCHAR",
+    "started_at": "TIMESTAMP",
+    "finished_at": "TIMESTAMP",
+    "read_seconds": "DOUBLE",
+    "parse_seconds": "DOUBLE",
+    "dedup_seconds": "DOUBLE",
+    "insert_seconds": "DOUBLE",
+    "total_seconds": "DOUBLE",
+    "input_bytes": "BIGINT",
+    "rows_in": "BIGINT",
+    "rows_out": "BIGINT",
+    "rows_per_second": "DOUBLE",
+    "peak_rss_bytes": "BIGINT",
+}
+
+
+def peak_rss_bytes() -> int | None:
+    """Peak resident set size of this process in bytes (None if unsupported)."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS reports bytes, Linux reports kilobytes
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+class LoadRunRecorder:
+    """Collects per-table phase timings and row counts for one loader run."""
+
+    def __init__(self, source: str):
+        self.source = source
+        self.run_id = uuid.uuid4().hex
+        self.started_at = datetime.now()
+        self.tables = {}
+
+    def _stats(self, table_name: str) -> dict:
+        if table_name not in self.tables:
+            stats = {f"{phase}_seconds": 0.0 for phase in PHASES}
+            stats.update({"input_bytes": 0, "rows_in": 0, "rows_out": 0})
+            self.tables[table_name] = stats
+        return self.tables[table_name]
+
+    @contextmanager
+    def phase(self, table_name: str, phase: str):
+        """
+        Time a block of work and add it to the given phase of a table.
+
+        Example:
+            with recorder.phase("whoop.whoop_sleeps", "insert"):
+                con.execute(...)
+        """
+        stats = self._stats(table_name)
+        start = time.perf_counter()
+        try:
+            yield stats
+        finally:
+            stats[f"{phase}_seconds"] += time.perf_counter() - start
+
+    def count(self, table_name: str, **counts):
+        """Add to the byte/row counters of a table (input_bytes, rows_in, rows_out)."""
+        stats = self._stats(table_name)
+        for key, value in counts.items():
+            stats[key] += value
+
+    def records(self) -> list[dict]:
+        """Build one record per table, in the column order of meta.load_runs."""
+        finished_at = datetime.now()
+        peak_rss = peak_rss_bytes()
+        records = []
+
+        for table_name, stats in self.tables.items():
+            total = sum(stats[f"{phase}_seconds"] for phase in PHASES)
+            record = {
+                "run_id": self.run_id,
+                "source": self.source,
+                "table_name": table_name,
+                "started_at": self.started_at.isoformat(),
+                "finished_at": finished_at.isoformat(),
+                **{
+                    key: round(value, 6)
+                    for key, value in stats.items()
+                    if key.endswith("_seconds")
+                },
+                "total_seconds": round(total, 6),
+                "input_bytes": stats["input_bytes"],
+                "rows_in": stats["rows_in"],
+                "rows_out": stats["rows_out"],
+                "rows_per_second": (
+                    round(stats["rows_in"] / total, 2) if total > 0 else None
+                ),
+                "peak_rss_bytes": peak_rss,
+            }
+            records.append({column: record[column] for column in RECORD_COLUMNS})
+
+        return records
+
+    def write(self, con=None) -> list[dict]:
+        """
+        Append the run records to logs/load_runs.jsonl and, if a DuckDB
+        connection is given, to the meta.load_runs table.
+
+        Returns:
+            The list of written records (one per table)
+        """
+        records = self.records()
+        if not records:
+            return records
+
+        log_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(log_path, "a") as f:
+            for record in records:
+                f.write(json.dumps(record) + "\n")
+
+        if con is not None:
+            try:
+                con.execute("CREATE SCHEMA IF NOT EXISTS meta;")
+                columns = ", ".join(
+                    f"{name} {dtype}" for name, dtype in RECORD_COLUMNS.items()
+                )
+                con.execute(f"CREATE TABLE IF NOT EXISTS {RUNS_TABLE} ({columns})")
+                placeholders = ", ".join("?" for _ in RECORD_COLUMNS)
+                con.executemany(
+                    f"INSERT INTO {RUNS_TABLE} VALUES ({placeholders})",
+                    [list(record.values()) for record in records],
+                )
+            except Exception as e:
+                print(f"  ⚠️  Could not write load metrics to {RUNS_TABLE}: {e}")
+
+        print(f"  📈 Load metrics written to: {log_path}")
+        return records
+
+
+def read_json_file(file_path: Path, recorder: LoadRunRecorder, table_name: str):
+    """Read and parse a raw JSON file, timing the read and parse phases separately."""
+    with recorder.phase(table_name, "read"):
+        raw = file_path.read_bytes()
+    with recorder.phase(table_name, "parse"):
+        data = json.loads(raw)
+    recorder.count(table_name, input_bytes=len(raw))
+    return data
@@ -8,7 +8,6 @@
 
 import duckdb
 import pandas as pd
-import json
 from pathlib import Path
 from datetime import datetime
 import re
@@ -19,9 +18,14 @@ project_root = Path(__file__).parent.parent.parent.parent
 sys.path.insert(0, str(project_root))
 from config_loader import Config
 
+# Import shared load instrumentation from the parent 1_load directory
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from load_metrics import LoadRunRecorder, read_json_file
+
 data_dir = project_root / "0_data" / "raw" / "strava"
 db_dir = project_root / "0_data" / "database"
 db_path = db_dir / "source.duckdb"
+table_name = "strava.strava_activities"
 
 
 def get_newest_activities_file() -> Path | None:
@@ -135,10 +139,17 @@ def flatten_activity(activity):
     return flat
 
 
-def load_to_duckdb(activities, config):
+def load_to_duckdb(activities, config, recorder=None):
     """
     Dynamically loads data into DuckDB table, only inserting new rows that don't already exist.
     Uses unique identifier 'activity_id' to check for duplicates.
+
+    Per-phase timings and row counts are collected in `recorder` (a new one is
+    created if none is passed) and written to logs/load_runs.jsonl and, if enabled
+    in config.yml, to the meta.load_runs table.
+
+    Returns:
+        List of load run records (one per table), or an empty list if nothing was loaded
     """
     # Ensure database directory exists
     # Use source.duckdb for the new multi-database structure
@@ -148,71 +159,82 @@ def load_to_duckdb(activities, config):
 
     if activities is None or len(activities) == 0:
         print("⚠️  No activities found")
-        return
+        return []
+
+    if recorder is None:
+        recorder = LoadRunRecorder("strava")
 
     # Flatten activities
-    flattened = [flatten_activity(a) for a in activities]
-    df = pd.DataFrame(flattened)
+    with recorder.phase(table_name, "parse"):
+        flattened = [flatten_activity(a) for a in activities]
+        df = pd.DataFrame(flattened)
+    recorder.count(table_name, rows_in=len(df))
 
     con = duckdb.connect(str(db_path))
     con.execute("CREATE SCHEMA IF NOT EXISTS strava;")
 
-    table_name = "strava.strava_activities"
     id_field = "activity_id"
     temp_table = "temp_activities"
 
-    # Check if table exists and get existing IDs
-    table_exists = False
-    existing_ids = set()
-
-    try:
-        # Try to query the table - if it exists, get existing IDs
-        existing_df = con.execute(f"SELECT {id_field} FROM {table_name}").df()
-        table_exists = True
-        if not existing_df.empty:
-            existing_ids = set(existing_df[id_field].tolist())
-    except Exception:
-        # Table doesn't exist - will create it
+    with recorder.phase(table_name, "dedup"):
+        # Check if table exists and get existing IDs
         table_exists = False
+        existing_ids = set()
 
-    # Filter out rows that already exist
-    if table_exists and existing_ids:
-        initial_count = len(df)
-        df = df[~df[id_field].isin(existing_ids)]
-        new_count = len(df)
-        skipped_count = initial_count - new_count
-
-        if skipped_count > 0:
-            print(
-                f"  ℹ️  Skipped {skipped_count} existing activities (already in database)"
-            )
+        try:
+            # Try to query the table - if it exists, get existing IDs
+            existing_df = con.execute(f"SELECT {id_field} FROM {table_name}").df()
+            table_exists = True
+            if not existing_df.empty:
+                existing_ids = set(existing_df[id_field].tolist())
+        except Exception:
+            # Table doesn't exist - will create it
+            table_exists = False
+
+        # Filter out rows that already exist
+        if table_exists and existing_ids:
+            initial_count = len(df)
+            df = df[~df[id_field].isin(existing_ids)]
+            new_count = len(df)
+            skipped_count = initial_count - new_count
+
+            if skipped_count > 0:
+                print(
+                    f"  ℹ️  Skipped {skipped_count} existing activities (already in database)"
+                )
 
     if len(df) == 0:
         print("⚠️  No new activities to insert (all already exist)")
-        con.close()
-        return
+    else:
+        # Insert new rows
+        with recorder.phase(table_name, "insert"):
+            con.register(temp_table, df)
 
-    # Insert new rows
-    con.register(temp_table, df)
+            if table_exists:
+                # Insert only new rows
+                con.execute(f"INSERT INTO {table_name} SELECT * FROM {temp_table}")
+                print(f"✅ Inserted {len(df)} new activities into {table_name}")
+            else:
+                # Create table with new data
+                con.execute(f"CREATE TABLE {table_name} AS SELECT * FROM {temp_table}")
+                print(f"✅ Created table {table_name} with {len(df)} activities")
 
-    if table_exists:
-        # Insert only new rows
-        con.execute(f"INSERT INTO {table_name} SELECT * FROM {temp_table}")
-        print(f"✅ Inserted {len(df)} new activities into {table_name}")
-    else:
-        # Create table with new data
-        con.execute(f"CREATE TABLE {table_name} AS SELECT * FROM {temp_table}")
-        print(f"✅ Created table {table_name} with {len(df)} activities")
+            con.unregister(temp_table)
+        recorder.count(table_name, rows_out=len(df))
 
-    con.unregister(temp_table)
+    write_to_db = config.load_metrics_to_duckdb if config else True
+    records = recorder.write(con if write_to_db else None)
 
     con.close()
     print(f"\n✅ Loading complete!")
     print(f"Data saved to: {db_path}")
+    return records
 
 
 # Main execution
 if __name__ == "__main__":
+    recorder = LoadRunRecorder("strava")
+
     # Get newest activities file
     print("📂 Scanning for Strava data files...")
     activities_file = get_newest_activities_file()
@@ -223,8 +245,7 @@ if __name__ == "__main__":
 
     if activities_file:
         try:
-            with open(activities_file, "r") as f:
-                activities_data = json.load(f)
+            activities_data = read_json_file(activities_file, recorder, table_name)
             print(
                 f"  ✅ Loaded {len(activities_data)} activities from {activities_file.name}"
             )
@@ -237,6 +258,6 @@ if __name__ == "__main__":
     if activities_data:
         print("\n💾 Loading data into DuckDB...")
         config = Config()
-        load_to_duckdb(activities_data, config)
+        load_to_duckdb(activities_data, config, recorder)
     else:
         print("\n⚠️  No data to load")
@@ -0,0 +1,169 @@
+#################################################################################
+##### This script computes metrics from Strava activity streams.            #####
+##### 1. Finds the stream files (streams_<activity_id>.json) of activities  #####
+#####    that are loaded but have no stream metrics yet.                    #####
+##### 2. Computes power curve, normalized power, best efforts and time in   #####
+#####    heart rate zones in batches with NumPy (see stream_metrics.py).    #####
+##### 3. Inserts one row per activity into a DuckDB database.               #####
+#################################################################################
+
+
+import duckdb
+from pathlib import Path
+from datetime import datetime
+import re
+import sys
+
+# Add project root to path to import modules (4 levels up: strava -> 1_load -> 1_elt -> project_root)
+project_root = Path(__file__).parent.parent.parent.parent
+sys.path.insert(0, str(project_root))
+from config_loader import Config
+
+# Import shared load instrumentation from the parent 1_load directory
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from load_metrics import LoadRunRecorder, read_json_file
+
+sys.path.insert(0, str(Path(__file__).parent))
+from stream_metrics import StreamBatch, compute_stream_metrics, metric_columns
+
+streams_dir = project_root / "0_data" / "raw" / "strava" / "streams"
+db_path = project_root / "0_data" / "database" / "source.duckdb"
+table_name = "strava.strava_activity_stream_metrics"
+activities_table = "strava.strava_activities"
+
+# Stream files read and computed at once
+BATCH_SIZE = 500
+# Used for the heart rate zones if config.yml has no athlete.max_heartrate
+DEFAULT_MAX_HEARTRATE = 190
+
+
+def find_stream_files() -> dict:
+    """
+    Stream files in the raw data directory.
+
+    Returns:
+        {activity_id: path} for all files named streams_<activity_id>.json
+    """
+    if not streams_dir.exists():
+        return {}
+
+    pattern = re.compile(r"^streams_(\d+)\.json$")
+    files = {}
+    for file_path in streams_dir.glob("streams_*.json"):
+        match = pattern.match(file_path.name)
+        if match:
+            files[int(match.group(1))] = file_path
+    return files
+
+
+def pending_activity_ids(con, stream_files: dict) -> list:
+    """
+    Activities with a stream file that are loaded but have no metrics yet.
+
+    Streams of activities that are not loaded yet are picked up by a later run,
+    so every metrics row has a matching activity.
+    """
+    loaded = {
+        row[0]
+        for row in con.execute(f"SELECT activity_id FROM {activities_table}").fetchall()
+    }
+    computed = {
+        row[0]
+        for row in con.execute(f"SELECT activity_id FROM {table_name}").fetchall()
+    }
+    return sorted((set(stream_files) & loaded) - computed)
+
+
+def load_stream_metrics(config=None, recorder=None):
+    """
+    Compute and insert the metrics of all pending stream files.
+
+    Returns:
+        List of load run records (one per table), or an empty list if nothing was loaded
+    """
+    if not db_path.exists():
+        print(f"⚠️  Database not found: {db_path} (load the Strava activities first)")
+        return []
+
+    con = duckdb.connect(str(db_path))
+    con.execute("CREATE SCHEMA IF NOT EXISTS strava;")
+    # Created even without stream files, so the dbt source always exists
+    columns = ", ".join(f"{column} DOUBLE" for column in metric_columns())
+    con.execute(
+        f"CREATE TABLE IF NOT EXISTS {table_name} "
+        f"(activity_id BIGINT, {columns}, max_heartrate DOUBLE, computed_at TIMESTAMP)"
+    )
+
+    stream_files = find_stream_files()
+    if not stream_files:
+        print("⚠️  No stream files found")
+        con.close()
+        return []
+
+    if recorder is None:
+        recorder = LoadRunRecorder("strava")
+
+    max_heartrate = (
+        config.get("athlete", "max_heartrate", default=DEFAULT_MAX_HEARTRATE)
+        if config
+        else DEFAULT_MAX_HEARTRATE
+    )
+
+    with recorder.phase(table_name, "dedup"):
+        try:
+            activity_ids = pending_activity_ids(con, stream_files)
+        except duckdb.CatalogException:
+            print(
+                f"⚠️  {activities_table} does not exist (load the Strava activities first)"
+            )
+            con.close()
+            return []
+
+    skipped = len(stream_files) - len(activity_ids)
+    if skipped:
+        print(
+            f"  ℹ️  Skipped {skipped} stream files (already computed or activity not loaded)"
+        )
+
+    inserted = 0
+    for batch_start in range(0, len(activity_ids), BATCH_SIZE):
+        batch_ids = activity_ids[batch_start : batch_start + BATCH_SIZE]
+        streams = [
+            read_json_file(stream_files[activity_id], recorder, table_name)
+            for activity_id in batch_ids
+        ]
+        recorder.count(table_name, rows_in=len(batch_ids))
+
+        with recorder.phase(table_name, "parse"):
+            df = compute_stream_metrics(StreamBatch(batch_ids, streams), max_heartrate)
+            df["max_heartrate"] = float(max_heartrate)
+            df["computed_at"] = datetime.now()
+
+        with recorder.phase(table_name, "insert"):
+            con.register("temp_stream_metrics", df)
+            con.execute(
+                f"INSERT INTO {table_name} BY NAME SELECT * FROM temp_stream_metrics"
+            )
+            con.unregister("temp_stream_metrics")
+        recorder.count(table_name, rows_out=len(df))
+        inserted += len(df)
+        print(
+            f"  ✅ Computed stream metrics of {inserted}/{len(activity_ids)} activities"
+        )
+
+    if inserted == 0:
+        print("⚠️  No new stream metrics to insert")
+
+    write_to_db = config.load_metrics_to_duckdb if config else True
+    records = recorder.write(con if write_to_db else None)
+
+    con.close()
+    print(f"\n✅ Stream metrics complete!")
+    print(f"Data saved to: {db_path}")
+    return records
+
+
+# Main execution
+if __name__ == "__main__":
+    print("📂 Scanning for Strava stream files...")
+    load_stream_metrics(Config(), LoadRunRecorder("strava"))
@@ -0,0 +1,255 @@
+#################################################################################
+##### This module computes per-activity metrics from Strava streams.        #####
+##### 1. Packs the streams of many activities into flat NumPy arrays.       #####
+##### 2. Mean-maximal power and normalized power from cumulative sums.      #####
+##### 3. Best 1k/5k/10k efforts from a binary search on the distance.       #####
+##### 4. Time in heart rate zones, all activities of a batch at once.       #####
+#################################################################################
+
+import numpy as np
+import pandas as pd
+
+# Durations of the mean-maximal power curve
+POWER_CURVE_SECONDS = {
+    "5s": 5,
+    "15s": 15,
+    "30s": 30,
+    "1m": 60,
+    "5m": 300,
+    "10m": 600,
+    "20m": 1200,
+    "60m": 3600,
+}
+BEST_EFFORT_METERS = {"1k": 1000, "5k": 5000, "10k": 10000}
+# Upper bounds of heart rate zones 1-4 as share of the maximum heart rate (zone 5 above)
+HEART_RATE_ZONE_BOUNDS = (0.6, 0.7, 0.8, 0.9)
+NORMALIZED_POWER_SECONDS = 30
+# Longer gaps between samples are recording pauses and do not count towards a zone
+MAX_SAMPLE_GAP_SECONDS = 10
+
+
+def metric_columns() -> list[str]:
+    """Column names of the metrics, in table order."""
+    return [
+        "stream_seconds",
+        *(f"max_power_{label}_watts" for label in POWER_CURVE_SECONDS),
+        "normalized_power_watts",
+        *(f"best_{label}_seconds" for label in BEST_EFFORT_METERS),
+        *(f"heart_rate_zone_{zone}_seconds" for zone in range(1, 6)),
+    ]
+
+
+def _stream(streams: dict, key: str) -> np.ndarray | None:
+    """One stream as float array (Strava key_by_type format), None if missing or empty."""
+    values = (streams.get(key) or {}).get("data")
+    if not values:
+        return None
+    return np.array(values, dtype=float)
+
+
+class StreamBatch:
+    """
+    Streams of many activities, concatenated into flat arrays.
+
+    Every metric runs once over the whole batch: activity k owns the slice
+    starts[k]:starts[k] + lengths[k] of a flat array, sliding windows that
+    cross into the next activity are masked, and the results are reduced per
+    activity with ufunc.reduceat. Activities without a stream get a length
+    of 0 in that stream's arrays.
+    """
+
+    def __init__(self, activity_ids: list, streams: list[dict]):
+        self.activity_ids = list(activity_ids)
+        times, watts, distances, heartrates = [], [], [], []
+
+        for activity_streams in streams:
+            time = _stream(activity_streams, "time")
+            if time is None:
+                time = np.zeros(0)
+            times.append(time)
+
+            # Power on a 1 Hz grid, seconds without a sample (pauses) count as 0 W
+            power = _stream(activity_streams, "watts")
+            if power is not None and len(power) == len(time):
+                grid = np.zeros(int(time[-1]) + 1)
+                grid[time.astype(int)] = np.nan_to_num(power)
+                power = grid
+            watts.append(power if power is not None else np.zeros(0))
+
+            distance = _stream(activity_streams, "distance")
+            usable = distance is not None and len(distance) == len(time)
+            distances.append(np.nan_to_num(distance) if usable else np.zeros(0))
+
+            heartrate = _stream(activity_streams, "heartrate")
+            usable = heartrate is not None and len(heartrate) == len(time)
+            heartrates.append(heartrate if usable else np.zeros(0))
+
+        self.stream_seconds = np.array(
+            [time[-1] - time[0] if len(time) else np.nan for time in times]
+        )
+        self.time, self.time_starts, self.time_lengths = self._pack(times)
+        self.watts, self.watts_starts, self.watts_lengths = self._pack(watts)
+        self.distance_time, _, _ = self._pack(
+            [
+                time if len(distance) else np.zeros(0)
+                for time, distance in zip(times, distances)
+            ]
+        )
+        self.distance, self.distance_starts, self.distance_lengths = self._pack(
+            distances
+        )
+        self.heartrate_time, _, _ = self._pack(
+            [
+                time if len(heartrate) else np.zeros(0)
+                for time, heartrate in zip(times, heartrates)
+            ]
+        )
+        self.heartrate, self.heartrate_starts, self.heartrate_lengths = self._pack(
+            heartrates
+        )
+
+    @staticmethod
+    def _pack(arrays: list) -> tuple:
+        """Concatenate per-activity arrays and return (flat array, starts, lengths)."""
+        lengths = np.array([len(array) for array in arrays], dtype=np.int64)
+        starts = np.concatenate(([0], np.cumsum(lengths)[:-1])).astype(np.int64)
+        flat = np.concatenate(arrays) if arrays else np.zeros(0)
+        return flat.astype(float), starts, lengths
+
+    def __len__(self) -> int:
+        return len(self.activity_ids)
+
+
+def _reduce(ufunc, values: np.ndarray, starts: np.ndarray, lengths: np.ndarray, empty):
+    """
+    ufunc.reduceat per activity slice, `empty` for activities with no values.
+
+    reduceat returns values[start] for empty slices, so these are masked after.
+    """
+    result = np.full(len(starts), empty, dtype=float)
+    present = lengths > 0
+    if present.any():
+        result[present] = ufunc.reduceat(values, starts[present])
+    return result
+
+
+def _window_sums(
+    values: np.ndarray, starts: np.ndarray, lengths: np.ndarray, window: int
+):
+    """
+    Sum of every `window` consecutive values, aligned to the window start.
+
+    Returns the sums and a mask of the windows that lie inside one activity.
+    """
+    cumsum = np.concatenate(([0.0], np.cumsum(values)))
+    sums = np.full(len(values), np.nan)
+    if len(values) >= window:
+        sums[: len(values) - window + 1] = cumsum[window:] - cumsum[:-window]
+    activity = np.repeat(np.arange(len(starts)), lengths)
+    ends = (starts + lengths)[activity]
+    valid = np.arange(len(values)) + window <= ends
+    return sums, valid
+
+
+def power_curve(batch: StreamBatch) -> dict:
+    """Highest average power over each duration of POWER_CURVE_SECONDS, per activity."""
+    curve = {}
+    for label, seconds in POWER_CURVE_SECONDS.items():
+        sums, valid = _window_sums(
+            batch.watts, batch.watts_starts, batch.watts_lengths, seconds
+        )
+        best = _reduce(
+            np.maximum,
+            np.where(valid, sums / seconds, -np.inf),
+            batch.watts_starts,
+            batch.watts_lengths,
+            -np.inf,
+        )
+        # Activities shorter than the duration have no value
+        curve[f"max_power_{label}_watts"] = np.where(np.isfinite(best), best, np.nan)
+    return curve
+
+
+def normalized_power(batch: StreamBatch) -> np.ndarray:
+    """Normalized power: fourth root of the mean of the 4th power of the 30 s rolling average."""
+    window = NORMALIZED_POWER_SECONDS
+    sums, valid = _window_sums(
+        batch.watts, batch.watts_starts, batch.watts_lengths, window
+    )
+    rolling = np.where(valid, sums / window, 0.0)
+    total = _reduce(np.add, rolling**4, batch.watts_starts, batch.watts_lengths, 0.0)
+    count = _reduce(
+        np.add, valid.astype(float), batch.watts_starts, batch.watts_lengths, 0.0
+    )
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(count > 0, (total / count) ** 0.25, np.nan)
+
+
+def best_efforts(batch: StreamBatch) -> dict:
+    """Shortest elapsed time to cover each distance of BEST_EFFORT_METERS, per activity."""
+    starts, lengths = batch.distance_starts, batch.distance_lengths
+    activity = np.repeat(np.arange(len(starts)), lengths)
+    ends = (starts + lengths)[activity]
+
+    # Shift every activity above the previous one, so the flat distance array is
+    # sorted and one searchsorted call finds the end of every effort in every activity
+    longest_effort = max(BEST_EFFORT_METERS.values())
+    activity_max = _reduce(np.maximum, batch.distance, starts, lengths, 0.0)
+    offsets = np.concatenate(([0.0], np.cumsum(activity_max + longest_effort + 1)[:-1]))
+    distance = np.maximum.accumulate(batch.distance + offsets[activity])
+
+    efforts = {}
+    for label, meters in BEST_EFFORT_METERS.items():
+        effort_end = np.searchsorted(distance, distance + meters, side="left")
+        valid = effort_end < ends
+        elapsed = np.full(len(distance), np.inf)
+        elapsed[valid] = (
+            batch.distance_time[effort_end[valid]] - batch.distance_time[valid]
+        )
+        best = _reduce(np.minimum, elapsed, starts, lengths, np.inf)
+        efforts[f"best_{label}_seconds"] = np.where(np.isfinite(best), best, np.nan)
+    return efforts
+
+
+def heart_rate_zones(batch: StreamBatch, max_heartrate: float) -> dict:
+    """Seconds spent in each heart rate zone (share of max_heartrate), per activity."""
+    starts, lengths = batch.heartrate_starts, batch.heartrate_lengths
+    activity = np.repeat(np.arange(len(starts)), lengths)
+    time = batch.heartrate_time
+
+    # A sample lasts until the next one of the same activity
+    duration = np.zeros(len(time))
+    if len(time) > 1:
+        duration[:-1] = np.diff(time)
+        duration[:-1][activity[1:] != activity[:-1]] = 0.0
+    duration[(duration < 0) | (duration > MAX_SAMPLE_GAP_SECONDS)] = 0.0
+    duration[~(batch.heartrate > 0)] = 0.0
+
+    zone = np.digitize(batch.heartrate / max_heartrate, HEART_RATE_ZONE_BOUNDS)
+    zones = len(HEART_RATE_ZONE_BOUNDS) + 1
+    seconds = np.bincount(
+        activity * zones + zone, weights=duration, minlength=len(starts) * zones
+    ).reshape(len(starts), zones)
+    seconds[lengths == 0] = np.nan
+    return {
+        f"heart_rate_zone_{zone + 1}_seconds": seconds[:, zone] for zone in range(zones)
+    }
+
+
+def compute_stream_metrics(batch: StreamBatch, max_heartrate: float) -> pd.DataFrame:
+    """
+    All stream metrics of a batch, one row per activity.
+
+    Metrics without the required stream (e.g. power for a run without a power
+    meter) or activities too short for a duration or distance are null.
+    """
+    metrics = {
+        "activity_id": batch.activity_ids,
+        "stream_seconds": batch.stream_seconds,
+        **power_curve(batch),
+        "normalized_power_watts": normalized_power(batch),
+        **best_efforts(batch),
+        **heart_rate_zones(batch, max_heartrate),
+    }
+    df = pd.DataFrame(metrics)
+    return df[["activity_id", *metric_columns()]]
@@ -7,17 +7,48 @@
 
 import duckdb
 import pandas as pd
-import json
 from pathlib import Path
 from datetime import datetime
 import re
+import sys
 
 # Get project root directory (4 levels up: whoop -> 1_load -> 1_elt -> project_root)
 project_root = Path(__file__).parent.parent.parent.parent
+sys.path.insert(0, str(project_root))
+from config_loader import Config
+
+# Import shared load instrumentation from the parent 1_load directory
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from load_metrics import LoadRunRecorder, read_json_file
+
 data_dir = project_root / "0_data" / "raw" / "whoop"
 db_dir = project_root / "0_data" / "database"
 db_path = db_dir / "source.duckdb"
 
+# Mapping: data key -> table name, display name, and unique ID field
+table_mapping = {
+    "workouts": {
+        "table": "whoop.whoop_workouts",
+        "display_name": "workouts",
+        "id_field": "id",
+    },
+    "sleeps": {
+        "table": "whoop.whoop_sleeps",
+        "display_name": "sleeps",
+        "id_field": "id",
+    },
+    "cycles": {
+        "table": "whoop.whoop_physiological_cycles",
+        "display_name": "physiological cycles",
+        "id_field": "cycle_id",
+    },
+    "recoveries": {
+        "table": "whoop.whoop_recoveries",
+        "display_name": "recoveries",
+        "id_field": "cycle_id",
+    },
+}
+
 
 def get_newest_file_by_prefix(prefix: str) -> Path | None:
     """
@@ -100,7 +131,7 @@ def get_files_in_directory():
     return categorized
 
 
-def load_to_duckdb(workouts, sleeps, cycles, recoveries):
+def load_to_duckdb(workouts, sleeps, cycles, recoveries, config=None, recorder=None):
     """
     Dynamically loads data into DuckDB tables, only inserting new rows that don't already exist.
     Uses unique identifiers to check for duplicates:
@@ -108,152 +139,136 @@ def load_to_duckdb(workouts, sleeps, cycles, recoveries):
     - sleeps: 'id'
     - cycles: 'cycle_id'
     - recoveries: 'cycle_id'
+
+    Per-phase timings and row counts are collected in `recorder` (a new one is
+    created if none is passed) and written to logs/load_runs.jsonl and, if enabled
+    in config.yml, to the meta.load_runs table.
+
+    Returns:
+        List of load run records (one per table)
     """
     # Ensure database directory exists
     db_dir.mkdir(parents=True, exist_ok=True)
 
+    if recorder is None:
+        recorder = LoadRunRecorder("whoop")
+
     con = duckdb.connect(str(db_path))
     con.execute("CREATE SCHEMA IF NOT EXISTS whoop;")
 
-    # Mapping: data -> table name, display name, and unique ID field
-    data_mapping = {
-        "workouts": {
-            "data": workouts,
-            "table": "whoop.whoop_workouts",
-            "display_name": "workouts",
-            "id_field": "id",
-        },
-        "sleeps": {
-            "data": sleeps,
-            "table": "whoop.whoop_sleeps",
-            "display_name": "sleeps",
-            "id_field": "id",
-        },
-        "cycles": {
-            "data": cycles,
-            "table": "whoop.whoop_physiological_cycles",
-            "display_name": "physiological cycles",
-            "id_field": "cycle_id",
-        },
-        "recoveries": {
-            "data": recoveries,
-            "table": "whoop.whoop_recoveries",
-            "display_name": "recoveries",
-            "id_field": "cycle_id",
-        },
+    data_by_key = {
+        "workouts": workouts,
+        "sleeps": sleeps,
+        "cycles": cycles,
+        "recoveries": recoveries,
     }
 
     # Process each data type
-    for key, config in data_mapping.items():
-        data = config["data"]
-        table_name = config["table"]
-        display_name = config["display_name"]
-        id_field = config["id_field"]
+    for key, config_entry in table_mapping.items():
+        data = data_by_key[key]
+        table_name = config_entry["table"]
+        display_name = config_entry["display_name"]
+        id_field = config_entry["id_field"]
 
         if data is None or len(data) == 0:
             print(f"⚠️  No {display_name} found")
             continue
 
-        df = pd.DataFrame(data)
+        with recorder.phase(table_name, "parse"):
+            df = pd.DataFrame(data)
+        recorder.count(table_name, rows_in=len(df))
         temp_table = f"temp_{key}"
 
-        # Check if table exists and get existing IDs
-        table_exists = False
-        existing_ids = set()
-
-        try:
-            # Try to query the table - if it exists, get existing IDs
-            existing_df = con.execute(f"SELECT {id_field} FROM {table_name}").df()
-            table_exists = True
-            if not existing_df.empty:
-                existing_ids = set(existing_df[id_field].tolist())
-        except Exception:
-            # Table doesn't exist - will create it
+        with recorder.phase(table_name, "dedup"):
+            # Check if table exists and get existing IDs
             table_exists = False
+            existing_ids = set()
 
-        # Filter out rows that already exist
-        if table_exists and existing_ids:
-            initial_count = len(df)
-            df = df[~df[id_field].isin(existing_ids)]
-            new_count = len(df)
-            skipped_count = initial_count - new_count
-
-            if skipped_count > 0:
-                print(
-                    f"  ℹ️  Skipped {skipped_count} existing {display_name} (already in database)"
-                )
+            try:
+                # Try to query the table - if it exists, get existing IDs
+                existing_df = con.execute(f"SELECT {id_field} FROM {table_name}").df()
+                table_exists = True
+                if not existing_df.empty:
+                    existing_ids = set(existing_df[id_field].tolist())
+            except Exception:
+                # Table doesn't exist - will create it
+                table_exists = False
+
+            # Filter out rows that already exist
+            if table_exists and existing_ids:
+                initial_count = len(df)
+                df = df[~df[id_field].isin(existing_ids)]
+                new_count = len(df)
+                skipped_count = initial_count - new_count
+
+                if skipped_count > 0:
+                    print(
+                        f"  ℹ️  Skipped {skipped_count} existing {display_name} (already in database)"
+                    )
 
         if len(df) == 0:
             print(f"⚠️  No new {display_name} to insert (all already exist)")
             continue
 
         # Insert new rows
-        con.register(temp_table, df)
+        with recorder.phase(table_name, "insert"):
+            con.register(temp_table, df)
+
+            if table_exists:
+                # Insert only new rows
+                con.execute(f"INSERT INTO {table_name} SELECT * FROM {temp_table}")
+                print(f"✅ Inserted {len(df)} new {display_name} into {table_name}")
+            else:
+                # Create table with new data
+                con.execute(f"CREATE TABLE {table_name} AS SELECT * FROM {temp_table}")
+                print(f"✅ Created table {table_name} with {len(df)} {display_name}")
 
-        if table_exists:
-            # Insert only new rows
-            con.execute(f"INSERT INTO {table_name} SELECT * FROM {temp_table}")
-            print(f"✅ Inserted {len(df)} new {display_name} into {table_name}")
-        else:
-            # Create table with new data
-            con.execute(f"CREATE TABLE {table_name} AS SELECT * FROM {temp_table}")
-            print(f"✅ Created table {table_name} with {len(df)} {display_name}")
+            con.unregister(temp_table)
+        recorder.count(table_name, rows_out=len(df))
 
-        con.unregister(temp_table)
+    write_to_db = config.load_metrics_to_duckdb if config else True
+    records = recorder.write(con if write_to_db else None)
 
     con.close()
     print(f"\n✅ Loading complete!")
     print(f"Data saved to: {db_path}")
+    return records
 
 
 # Main execution
 if __name__ == "__main__":
+    recorder = LoadRunRecorder("whoop")
+
     # Get categorized files (newest version of each)
     files = get_files_in_directory()
 
     # Read JSON files
     print("\n📖 Reading JSON files...")
-    workouts_data = None
-    sleeps_data = None
-    cycles_data = None
-    recoveries_data = None
+    loaded_data = {}
 
-    if files["workouts"]:
+    for key, config_entry in table_mapping.items():
+        loaded_data[key] = None
+        if not files[key]:
+            continue
         try:
-            with open(files["workouts"], "r") as f:
-                workouts_data = json.load(f)
-            print(
-                f"  ✅ Loaded {len(workouts_data)} workouts from {files['workouts'].name}"
+            loaded_data[key] = read_json_file(
+                files[key], recorder, config_entry["table"]
             )
-        except Exception as e:
-            print(f"  ⚠️  Failed to read workouts file: {e}")
-
-    if files["sleeps"]:
-        try:
-            with open(files["sleeps"], "r") as f:
-                sleeps_data = json.load(f)
-            print(f"  ✅ Loaded {len(sleeps_data)} sleeps from {files['sleeps'].name}")
-        except Exception as e:
-            print(f"  ⚠️  Failed to read sleeps file: {e}")
-
-    if files["cycles"]:
-        try:
-            with open(files["cycles"], "r") as f:
-                cycles_data = json.load(f)
-            print(f"  ✅ Loaded {len(cycles_data)} cycles from {files['cycles'].name}")
-        except Exception as e:
-            print(f"  ⚠️  Failed to read cycles file: {e}")
-
-    if files["recoveries"]:
-        try:
-            with open(files["recoveries"], "r") as f:
-                recoveries_data = json.load(f)
             print(
-                f"  ✅ Loaded {len(recoveries_data)} recoveries from {files['recoveries'].name}"
+                f"  ✅ Loaded {len(loaded_data[key])} {config_entry['display_name']} from {files[key].name}"
             )
         except Exception as e:
-            print(f"  ⚠️  Failed to read recoveries file: {e}")
+            print(f"  ⚠️  Failed to read {key} file: {e}")
 
     # Load to DuckDB
     print("\n💾 Loading data into DuckDB...")
-    load_to_duckdb(workouts_data, sleeps_data, cycles_data, recoveries_data)
+    # config.yml is optional here, without it the load metrics go to DuckDB
+    config = Config() if Path("config.yml").exists() else None
+    load_to_duckdb(
+        loaded_data["workouts"],
+        loaded_data["sleeps"],
+        loaded_data["cycles"],
+        loaded_data["recoveries"],
+        config,
+        recorder,
+    )
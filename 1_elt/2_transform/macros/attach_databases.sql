@@ -8,6 +8,9 @@
         -- Paths are relative to dbt project directory (transform/dbt_model/) - go up 2 levels to project root
         ATTACH '../../0_data/database/source.duckdb' AS source (TYPE DUCKDB);
         ATTACH '../../0_data/database/transform.duckdb' AS transform (TYPE DUCKDB);
+    {% elif target.name == 'single' %}
+        -- Attach the raw tables of the loaders read-only for the single-file target
+        ATTACH '../../0_data/database/source.duckdb' AS source (TYPE DUCKDB, READ_ONLY);
     {% endif %}
 {% endmacro %}
 
@@ -1,5 +1,6 @@
 {% macro generate_schema_name(custom_schema_name, node) -%}
 {#- Organize schemas by entity name (whoop, strava, etc.) -#}
+{%- set entity_schema -%}
 {%- if custom_schema_name is not none -%}
         {{ custom_schema_name | trim }}
     {%- else -%}
@@ -27,5 +28,12 @@
 {{ target.schema }}
 {%- endif -%}
 {%- endif -%}
+{%- endset -%}
+{#- The single-file build separates the staging and intermediate layers by schema prefix -#}
+{%- if target.name == 'single' and node.resource_type == 'model' and node.fqn[1] in ['staging', 'intermediate'] -%}
+{{ node.fqn[1] }}_{{ entity_schema | trim }}
+{%- else -%}
+{{ entity_schema | trim }}
+{%- endif -%}
 {%- endmacro %}
 
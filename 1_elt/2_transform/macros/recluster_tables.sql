@@ -0,0 +1,61 @@
+{% macro recluster_tables(max_unsorted_fraction=none) %}
+{#-
+    Maintenance operation for models with a `cluster_by` config:
+
+        dbt run-operation recluster_tables --target analytics
+
+    The models write their rows sorted by these columns, but incremental runs
+    append late-arriving days at the end of the table. A table is rewritten in
+    order once more than `max_unsorted_fraction` (default: the
+    `cluster_max_unsorted_fraction` var) of its rows sit behind a later value of
+    the leading column, so DuckDB's min/max zone maps keep skipping row groups on
+    date filters. Each check scans the whole table, which is why it is not part of
+    the regular runs.
+-#}
+{%- set threshold = max_unsorted_fraction if max_unsorted_fraction is not none else var('cluster_max_unsorted_fraction') -%}
+{%- if execute -%}
+    {%- for node in graph.nodes.values() if node.resource_type == 'model' and node.config.get('cluster_by') -%}
+        {%- set relation = adapter.get_relation(database=node.database, schema=node.schema, identifier=node.alias) -%}
+        {%- if relation is none -%}
+            {{ log("Skipping " ~ node.name ~ ": not built in this target", info=True) }}
+        {%- else -%}
+            {%- do recluster_table(relation, node.config.get('cluster_by'), threshold) -%}
+        {%- endif -%}
+    {%- endfor -%}
+{%- endif -%}
+{% endmacro %}
+
+
+{% macro recluster_table(relation, cluster_by, max_unsorted_fraction) %}
+{#- Rewrite one table in `cluster_by` order if too many rows are out of order. -#}
+{%- set leading_column = cluster_by[0] -%}
+{%- set unsorted_query -%}
+    select
+        count(*) as row_count,
+        count(*) filter (where {{ leading_column }} < previous_max) as unsorted_rows
+    from (
+        select
+            {{ leading_column }},
+            max({{ leading_column }}) over (
+                order by rowid rows between unbounded preceding and 1 preceding
+            ) as previous_max
+        from {{ relation }}
+    )
+{%- endset -%}
+{%- set result = run_query(unsorted_query) -%}
+{%- set row_count = result.columns[0].values()[0] -%}
+{%- set unsorted_rows = result.columns[1].values()[0] -%}
+{%- if unsorted_rows > row_count * max_unsorted_fraction -%}
+    {{ log("Reclustering " ~ relation ~ ": " ~ unsorted_rows ~ " of " ~ row_count ~ " rows out of order", info=True) }}
+    {%- set recluster_query -%}
+        create or replace table {{ relation }} as
+        select * from {{ relation }}
+        order by {{ cluster_by | join(', ') }}
+    {%- endset -%}
+    {%- do run_query(recluster_query) -%}
+    {#- run-operation does not commit on its own -#}
+    {%- do adapter.commit() -%}
+{%- else -%}
+    {{ log(relation ~ ": " ~ unsorted_rows ~ " of " ~ row_count ~ " rows out of order, kept", info=True) }}
+{%- endif -%}
+{% endmacro %}
@@ -1,9 +1,36 @@
+{{
+    config(
+        materialized = 'incremental',
+        unique_key = 'strava_activity_id_internal',
+        incremental_strategy = 'delete+insert',
+        on_schema_change = 'append_new_columns'
+    )
+}}
+
 with
 
-strava_activities_data as (
+strava_activities_source as (
     select * from {{ ref('stg_strava_activities') }}
 ),
 
+{% if is_incremental() %}
+-- days that received activities since the last run, plus the lookback window
+-- whole days are reprocessed so strava_activity_id_of_day stays consistent
+affected_days as (
+    select distinct date_trunc('day', start_date) :: date as date_day
+    from strava_activities_source
+    where extracted_at > (select max(extracted_at) from {{ this }})
+        or start_date >= (select max(start_date) from {{ this }}) - interval '{{ var("incremental_lookback_days") }} days'
+),
+{% endif %}
+
+strava_activities_data as (
+    select * from strava_activities_source
+    {% if is_incremental() %}
+        where date_trunc('day', start_date) :: date in (select date_day from affected_days)
+    {% endif %}
+),
+
 activity_mapping_data as (
     select * from {{ ref('stg_dbt_seeds_activity_mapping') }}
 ),
@@ -12,8 +39,9 @@ enhanced as (
     select
 
         activity_id as strava_activity_id_internal,
-        row_number() over (order by start_date) as strava_activity_id,
-        row_number() over (partition by date_trunc('day', start_date) order by start_date) as strava_activity_id_of_day,
+        -- stable surrogate key: does not change when older activities arrive later
+        {{ dbt_utils.generate_surrogate_key(['activity_id']) }} as strava_activity_id,
+        row_number() over (partition by date_trunc('day', start_date) order by start_date, activity_id) as strava_activity_id_of_day,
         name,
         type,
         sport_type as strava_activity_name,
@@ -120,7 +148,10 @@ final as (
         enhanced.gear_id,
         enhanced.extracted_at,
         activity_mapping_data.aligned_activity_name as activity_name,
-        activity_mapping_data.is_sport_exercise as is_sport_exercise
+        activity_mapping_data.is_sport_exercise as is_sport_exercise,
+
+        -- watermark for incremental downstream models
+        current_timestamp as transformed_at
 
     from enhanced
     left join activity_mapping_data on enhanced.strava_activity_name = activity_mapping_data.original_activity_name
@@ -0,0 +1,67 @@
+{{
+    config(
+        materialized = 'incremental',
+        unique_key = 'cycle_id_internal',
+        incremental_strategy = 'delete+insert',
+        on_schema_change = 'append_new_columns'
+    )
+}}
+
+with
+
+whoop_cycles_source as (
+    select * from {{ ref('stg_whoop_cycles') }}
+),
+
+whoop_recoveries as (
+    select * from {{ ref('stg_whoop_recoveries') }}
+),
+
+whoop_cycles_data as (
+    select * from whoop_cycles_source
+    {% if is_incremental() %}
+        -- new cycles and cycles inside the lookback window (WHOOP rescores the current cycle and its recovery)
+        where cycle_start_time >= (select max(cycle_start_time) from {{ this }}) - interval '{{ var("incremental_lookback_days") }} days'
+            or cycle_id not in (select cycle_id_internal from {{ this }})
+    {% endif %}
+),
+
+final as (
+    select
+
+        -- stable surrogate key: does not change when older cycles arrive later
+        whoop_cycles_data.cycle_id as cycle_id_internal,
+        {{ dbt_utils.generate_surrogate_key(['whoop_cycles_data.cycle_id']) }} as cycle_id,
+
+        -- a cycle starts when waking up, so its start date is the day its recovery belongs to
+        date_trunc('day', whoop_cycles_data.cycle_start_time) :: date as date_day,
+        whoop_cycles_data.cycle_start_time,
+        whoop_cycles_data.cycle_end_time,
+        whoop_cycles_data.cycle_timezone,
+        whoop_cycles_data.score_state = 'SCORED' as is_scored,
+
+        -- cycle strain
+        whoop_cycles_data.day_strain,
+        whoop_cycles_data.kilojoule,
+        whoop_cycles_data.average_heart_rate,
+        whoop_cycles_data.max_heart_rate,
+
+        -- recovery of the cycle (null until WHOOP has scored it)
+        whoop_recoveries.sleep_id as recovery_sleep_id,
+        whoop_recoveries.recovery_score,
+        whoop_recoveries.resting_heart_rate,
+        whoop_recoveries.hrv_rmssd_milli,
+        whoop_recoveries.spo2_percentage,
+        whoop_recoveries.skin_temp_celsius,
+        whoop_recoveries.is_user_calibrating,
+
+        -- watermark for incremental downstream models
+        current_timestamp as transformed_at
+
+    from whoop_cycles_data
+    left join whoop_recoveries
+        on whoop_cycles_data.cycle_id = whoop_recoveries.cycle_id
+            and whoop_recoveries.score_state = 'SCORED'
+)
+
+select * from final
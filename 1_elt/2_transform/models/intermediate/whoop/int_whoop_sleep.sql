@@ -1,9 +1,36 @@
+{{
+    config(
+        materialized = 'incremental',
+        unique_key = 'sleep_id_internal',
+        incremental_strategy = 'delete+insert',
+        on_schema_change = 'append_new_columns'
+    )
+}}
+
 with
 
-whoop_sleep_data as (
+whoop_sleep_source as (
     select * from {{ ref('stg_whoop_sleep') }}
 ),
 
+{% if is_incremental() %}
+-- days with new sleeps or sleeps inside the lookback window (WHOOP rescores recent sleeps)
+-- whole days are reprocessed so sleep_id_of_day stays consistent
+affected_days as (
+    select distinct date_trunc('day', sleep_onset) :: date as sleep_start_date
+    from whoop_sleep_source
+    where sleep_onset >= (select max(sleep_onset) from {{ this }}) - interval '{{ var("incremental_lookback_days") }} days'
+        or sleep_id not in (select sleep_id_internal from {{ this }})
+),
+{% endif %}
+
+whoop_sleep_data as (
+    select * from whoop_sleep_source
+    {% if is_incremental() %}
+        where date_trunc('day', sleep_onset) :: date in (select sleep_start_date from affected_days)
+    {% endif %}
+),
+
 moon_data as (
     select * from {{ ref('stg_dbt_seeds_moon_data') }}
 ),
@@ -12,9 +39,10 @@ enhanced as (
 
     select
 
-        -- sleep id
-        row_number() over (order by sleep_onset) as sleep_id,
-        row_number() over (partition by date_trunc('day', sleep_onset) order by sleep_onset) as sleep_id_of_day,
+        -- sleep id (stable surrogate key: does not change when older sleeps arrive later)
+        whoop_sleep_data.sleep_id as sleep_id_internal,
+        {{ dbt_utils.generate_surrogate_key(['whoop_sleep_data.sleep_id']) }} as sleep_id,
+        row_number() over (partition by date_trunc('day', sleep_onset) order by sleep_onset, whoop_sleep_data.sleep_id) as sleep_id_of_day,
 
         -- date day
         -- it can happen that the sleep onset start after 00:00, so we need to subtract 1 day for the night date
@@ -70,7 +98,10 @@ combined_data as (
 
         moon_data.moon_phase,
         moon_data.illumination as moon_illumination,
-        moon_data.phase_cycle as moon_phase_cycle
+        moon_data.phase_cycle as moon_phase_cycle,
+
+        -- watermark for incremental downstream models
+        current_timestamp as transformed_at
 
     from enhanced
     left join moon_data on enhanced.date_day = moon_data.date_day
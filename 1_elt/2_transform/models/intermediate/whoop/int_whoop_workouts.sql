@@ -1,9 +1,36 @@
+{{
+    config(
+        materialized = 'incremental',
+        unique_key = 'whoop_workout_id_internal',
+        incremental_strategy = 'delete+insert',
+        on_schema_change = 'append_new_columns'
+    )
+}}
+
 with
 
-whoop_workouts_data as (
+whoop_workouts_source as (
     select * from {{ ref('stg_whoop_workouts') }}
 ),
 
+{% if is_incremental() %}
+-- days with new workouts or workouts inside the lookback window (WHOOP rescores recent workouts)
+-- whole days are reprocessed so whoop_workout_id_of_day stays consistent
+affected_days as (
+    select distinct date_trunc('day', workout_start_time) :: date as date_day
+    from whoop_workouts_source
+    where workout_start_time >= (select max(workout_start_time) from {{ this }}) - interval '{{ var("incremental_lookback_days") }} days'
+        or whoop_workout_id not in (select whoop_workout_id_internal from {{ this }})
+),
+{% endif %}
+
+whoop_workouts_data as (
+    select * from whoop_workouts_source
+    {% if is_incremental() %}
+        where date_trunc('day', workout_start_time) :: date in (select date_day from affected_days)
+    {% endif %}
+),
+
 activity_mapping_data as (
     select * from {{ ref('stg_dbt_seeds_activity_mapping') }}
 ),
@@ -11,8 +38,10 @@ activity_mapping_data as (
 enhanced as (
     select
 
-        row_number() over (order by workout_start_time) as whoop_workout_id,
-        row_number() over (partition by date_trunc('day', workout_start_time) order by workout_start_time) as whoop_workout_id_of_day,
+        -- stable surrogate key: does not change when older workouts arrive later
+        whoop_workouts_data.whoop_workout_id as whoop_workout_id_internal,
+        {{ dbt_utils.generate_surrogate_key(['whoop_workouts_data.whoop_workout_id']) }} as whoop_workout_id,
+        row_number() over (partition by date_trunc('day', workout_start_time) order by workout_start_time, whoop_workouts_data.whoop_workout_id) as whoop_workout_id_of_day,
 
         date_trunc('day', workout_start_time) :: date as date_day,
         workout_start_time,
@@ -42,6 +71,7 @@ final as (
     select
 
         -- DuckDB does not support except clause, so we need to list all columns explicitly
+        enhanced.whoop_workout_id_internal,
         enhanced.whoop_workout_id,
         enhanced.whoop_workout_id_of_day,
         enhanced.date_day,
@@ -63,7 +93,10 @@ final as (
         enhanced.zone_four_milli,
         enhanced.zone_five_milli,
         activity_mapping_data.aligned_activity_name as activity_name,
-        activity_mapping_data.is_sport_exercise as is_sport_exercise
+        activity_mapping_data.is_sport_exercise as is_sport_exercise,
+
+        -- watermark for incremental downstream models
+        current_timestamp as transformed_at
 
     from enhanced
     left join activity_mapping_data on enhanced.whoop_activity_name = activity_mapping_data.original_activity_name
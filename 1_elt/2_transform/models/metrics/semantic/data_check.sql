@@ -1,3 +1,12 @@
+{{
+    config(
+        materialized = 'incremental',
+        unique_key = 'date_day',
+        incremental_strategy = 'delete+insert',
+        on_schema_change = 'append_new_columns'
+    )
+}}
+
 with
 
 dates as (
@@ -16,6 +25,67 @@ strava_activities as (
     select * from {{ ref('fct_strava_activities') }}
 ),
 
+{% if is_incremental() %}
+-- new days of the date spine plus days that received (re)transformed fact rows since the last run
+-- (a source without any rows yet has no watermark, so all of its rows count as new)
+affected_days as (
+    select date_day from dates
+    where date_day not in (select date_day from {{ this }})
+
+    union
+
+    select date_day from whoop_sleeps
+    where transformed_at > (select coalesce(max(whoop_sleeps_transformed_at), '1970-01-01' :: timestamp) from {{ this }})
+
+    union
+
+    select date_day from whoop_workouts
+    where transformed_at > (select coalesce(max(whoop_workouts_transformed_at), '1970-01-01' :: timestamp) from {{ this }})
+
+    union
+
+    select date_day from strava_activities
+    where transformed_at > (select coalesce(max(strava_activities_transformed_at), '1970-01-01' :: timestamp) from {{ this }})
+),
+{% endif %}
+
+-- one pass per source: distinct days with row counts, joined once to the date spine
+whoop_sleeps_per_day as (
+    select
+        date_day,
+        count(*) as whoop_sleeps_count,
+        max(transformed_at) as whoop_sleeps_transformed_at
+    from whoop_sleeps
+    {% if is_incremental() %}
+        where date_day in (select date_day from affected_days)
+    {% endif %}
+    group by date_day
+),
+
+whoop_workouts_per_day as (
+    select
+        date_day,
+        count(*) as whoop_workouts_count,
+        max(transformed_at) as whoop_workouts_transformed_at
+    from whoop_workouts
+    {% if is_incremental() %}
+        where date_day in (select date_day from affected_days)
+    {% endif %}
+    group by date_day
+),
+
+strava_activities_per_day as (
+    select
+        date_day,
+        count(*) as strava_activities_count,
+        max(transformed_at) as strava_activities_transformed_at
+    from strava_activities
+    {% if is_incremental() %}
+        where date_day in (select date_day from affected_days)
+    {% endif %}
+    group by date_day
+),
+
 combined_data as (
 
     select
@@ -24,12 +94,26 @@ combined_data as (
         dates.day_name,
         dates.is_weekend,
 
-        -- to avoid duplicates, we use exists instead of left join
-        exists(select 1 from whoop_sleeps where whoop_sleeps.date_day = dates.date_day) as is_whoop_sleeps_data_available,
-        exists(select 1 from whoop_workouts where whoop_workouts.date_day = dates.date_day) as is_whoop_workouts_data_available,
-        exists(select 1 from strava_activities where strava_activities.date_day = dates.date_day) as is_strava_activities_data_available
+        whoop_sleeps_per_day.date_day is not null as is_whoop_sleeps_data_available,
+        whoop_workouts_per_day.date_day is not null as is_whoop_workouts_data_available,
+        strava_activities_per_day.date_day is not null as is_strava_activities_data_available,
+
+        coalesce(whoop_sleeps_per_day.whoop_sleeps_count, 0) as whoop_sleeps_count,
+        coalesce(whoop_workouts_per_day.whoop_workouts_count, 0) as whoop_workouts_count,
+        coalesce(strava_activities_per_day.strava_activities_count, 0) as strava_activities_count,
+
+        -- watermarks for the incremental run
+        whoop_sleeps_per_day.whoop_sleeps_transformed_at,
+        whoop_workouts_per_day.whoop_workouts_transformed_at,
+        strava_activities_per_day.strava_activities_transformed_at
 
     from dates
+    left join whoop_sleeps_per_day on dates.date_day = whoop_sleeps_per_day.date_day
+    left join whoop_workouts_per_day on dates.date_day = whoop_workouts_per_day.date_day
+    left join strava_activities_per_day on dates.date_day = strava_activities_per_day.date_day
+    {% if is_incremental() %}
+        where dates.date_day in (select date_day from affected_days)
+    {% endif %}
 
 )
 
@@ -1,7 +1,21 @@
+{{
+    config(
+        materialized = 'incremental',
+        unique_key = 'strava_activity_id',
+        incremental_strategy = 'delete+insert',
+        on_schema_change = 'append_new_columns',
+        cluster_by = ['date_day', 'activity_name']
+    )
+}}
+
 with
 
 strava as (
     select * from {{ ref('fct_strava_activities') }}
+    {% if is_incremental() %}
+        -- only activities merged into fct_strava_activities since the last run
+        where transformed_at > (select max(transformed_at) from {{ this }})
+    {% endif %}
 ),
 
 activity_type as (
@@ -16,10 +30,14 @@ final as (
         strava.date_day,
         strava.name,
         activity_type.activity_name,
-        activity_type.is_sport_exercise
+        activity_type.is_sport_exercise,
+
+        -- metadata
+        strava.transformed_at
 
     from strava
     left join activity_type on strava.strava_activity_type_id = activity_type.strava_activity_type_id
 )
 
 select * from final
+order by {{ config.get('cluster_by') | join(', ') }}
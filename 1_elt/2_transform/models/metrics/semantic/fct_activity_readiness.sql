@@ -0,0 +1,180 @@
+-- One row per Strava activity and WHOOP workout with the state the athlete started it in:
+-- the last main sleep that ended before the start, the WHOOP cycle the start falls into and the
+-- last scored recovery. ASOF joins match each activity to the latest earlier row in one sorted pass.
+{{
+    config(
+        materialized = 'incremental',
+        unique_key = 'activity_id',
+        incremental_strategy = 'delete+insert',
+        on_schema_change = 'append_new_columns',
+        cluster_by = ['date_day', 'activity_source']
+    )
+}}
+
+with
+
+strava_activities as (
+    select * from {{ ref('int_strava_activities') }}
+),
+
+whoop_workouts as (
+    select * from {{ ref('fct_whoop_workouts') }}
+),
+
+whoop_sleeps as (
+    select * from {{ ref('int_whoop_sleep') }}
+    where nap is false
+),
+
+whoop_cycles as (
+    select * from {{ ref('int_whoop_cycles') }}
+),
+
+{% if is_incremental() %}
+-- earliest start time whose activity, preceding sleep, cycle or recovery was (re)transformed
+-- since the last run: every activity from there on is matched again
+recompute_from as (
+    select least(
+        (
+            select min(start_date) from strava_activities
+            where transformed_at > (select max(transformed_at) from {{ this }})
+        ),
+        (
+            select min(workout_start_time) from whoop_workouts
+            where transformed_at > (select max(transformed_at) from {{ this }})
+        ),
+        (
+            select min(wake_onset) from whoop_sleeps
+            where transformed_at > (select max(transformed_at) from {{ this }})
+        ),
+        (
+            select min(cycle_start_time) from whoop_cycles
+            where transformed_at > (select max(transformed_at) from {{ this }})
+        )
+    ) as activity_start_time
+),
+{% endif %}
+
+activities as (
+    select
+        'strava' as activity_source,
+        strava_activity_id as source_activity_id,
+        date_day,
+        start_date as activity_start_time,
+        activity_name,
+        is_sport_exercise,
+        moving_time_minutes as duration_minutes
+    from strava_activities
+
+    union all
+
+    select
+        'whoop' as activity_source,
+        whoop_workout_id as source_activity_id,
+        date_day,
+        workout_start_time as activity_start_time,
+        activity_name,
+        is_sport_exercise,
+        duration_minutes
+    from whoop_workouts
+),
+
+recomputed_activities as (
+    select * from activities
+    {% if is_incremental() %}
+        where activity_start_time >= (select activity_start_time from recompute_from)
+    {% endif %}
+),
+
+{#- In incremental runs, a recomputed activity can only match the last row before the first
+    recomputed activity or a later one, so the ASOF joins do not sort the whole history. -#}
+prior_sleeps as (
+    select * from whoop_sleeps
+    {% if is_incremental() %}
+        where wake_onset >= coalesce(
+            (
+                select max(wake_onset) from whoop_sleeps
+                where wake_onset <= (select activity_start_time from recompute_from)
+            ),
+            '1970-01-01' :: timestamp
+        )
+    {% endif %}
+),
+
+cycles as (
+    select * from whoop_cycles
+    {% if is_incremental() %}
+        where cycle_start_time >= coalesce(
+            (
+                select max(cycle_start_time) from whoop_cycles
+                where cycle_start_time <= (select activity_start_time from recompute_from)
+            ),
+            '1970-01-01' :: timestamp
+        )
+    {% endif %}
+),
+
+recoveries as (
+    select * from whoop_cycles
+    where recovery_score is not null
+    {% if is_incremental() %}
+        and cycle_start_time >= coalesce(
+            (
+                select max(cycle_start_time) from whoop_cycles
+                where recovery_score is not null
+                    and cycle_start_time <= (select activity_start_time from recompute_from)
+            ),
+            '1970-01-01' :: timestamp
+        )
+    {% endif %}
+),
+
+final as (
+    select
+
+        {{ dbt_utils.generate_surrogate_key(['recomputed_activities.activity_source', 'recomputed_activities.source_activity_id']) }} as activity_id,
+        recomputed_activities.activity_source,
+        recomputed_activities.source_activity_id,
+        recomputed_activities.date_day,
+        recomputed_activities.activity_start_time,
+        recomputed_activities.activity_name,
+        recomputed_activities.is_sport_exercise,
+        recomputed_activities.duration_minutes,
+
+        -- last main sleep that ended before the activity started
+        prior_sleeps.sleep_id,
+        prior_sleeps.date_day as sleep_date_day,
+        prior_sleeps.wake_onset as sleep_wake_onset,
+        date_diff('minute', prior_sleeps.wake_onset, recomputed_activities.activity_start_time) / 60 as hours_since_wake_up,
+        prior_sleeps.asleep_duration_hours,
+        prior_sleeps.deep_sleep_duration_hours,
+        prior_sleeps.rem_duration_hours,
+        prior_sleeps.sleep_performance,
+        prior_sleeps.sleep_efficiency,
+        prior_sleeps.sleep_debt_hours,
+
+        -- WHOOP cycle the activity started in
+        cycles.cycle_id,
+        cycles.cycle_start_time,
+
+        -- last scored recovery (usually the one of the same cycle)
+        recoveries.cycle_id as recovery_cycle_id,
+        recoveries.date_day as recovery_date_day,
+        recoveries.recovery_score,
+        recoveries.resting_heart_rate,
+        recoveries.hrv_rmssd_milli,
+
+        -- watermark for the incremental run
+        current_timestamp as transformed_at
+
+    from recomputed_activities
+    asof left join prior_sleeps
+        on recomputed_activities.activity_start_time >= prior_sleeps.wake_onset
+    asof left join cycles
+        on recomputed_activities.activity_start_time >= cycles.cycle_start_time
+    asof left join recoveries
+        on recomputed_activities.activity_start_time >= recoveries.cycle_start_time
+)
+
+select * from final
+order by {{ config.get('cluster_by') | join(', ') }}
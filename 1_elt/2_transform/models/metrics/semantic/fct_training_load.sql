@@ -0,0 +1,184 @@
+-- Daily training load with acute:chronic workload ratios and a Banister fitness/fatigue model.
+-- One row per calendar day (rest days have a load of 0), so the latest values are one row away.
+{{
+    config(
+        materialized = 'incremental',
+        unique_key = 'date_day',
+        incremental_strategy = 'delete+insert',
+        on_schema_change = 'append_new_columns',
+        cluster_by = ['date_day']
+    )
+}}
+
+{% set acute_days = 7 %}
+{% set chronic_days = 28 %}
+{% set fitness_days = 42 %}
+{% set fatigue_days = 7 %}
+-- exponential weights older than 6 time constants (< 0.25%) are dropped
+{% set banister_window_days = 6 * fitness_days %}
+
+with
+
+whoop_cycles as (
+    select * from {{ ref('int_whoop_cycles') }}
+),
+
+strava_activities as (
+    select * from {{ ref('fct_strava_activities') }}
+),
+
+{% if is_incremental() %}
+-- first day whose load changed since the last run, or the first new calendar day:
+-- it and every later day are recomputed
+recompute_from as (
+    select least(
+        (
+            select min(date_day) from whoop_cycles
+            where transformed_at > (select coalesce(max(whoop_transformed_at), '1970-01-01' :: timestamp) from {{ this }})
+        ),
+        (
+            select min(date_day) from strava_activities
+            where transformed_at > (select coalesce(max(strava_transformed_at), '1970-01-01' :: timestamp) from {{ this }})
+        ),
+        (select max(date_day) + 1 from {{ this }})
+    ) as date_day
+),
+{% endif %}
+
+bounds as (
+    select
+        least(
+            (select min(date_day) from whoop_cycles),
+            (select min(date_day) from strava_activities)
+        ) as first_day,
+        greatest(
+            current_date,
+            (select max(date_day) from whoop_cycles),
+            (select max(date_day) from strava_activities)
+        ) as last_day
+),
+
+days as (
+    select unnest(generate_series(
+        {% if is_incremental() %}
+            -- the recomputed days plus their trailing windows
+            greatest(first_day, (select date_day from recompute_from) - {{ banister_window_days - 1 }}) :: timestamp,
+        {% else %}
+            first_day :: timestamp,
+        {% endif %}
+        last_day :: timestamp,
+        interval 1 day
+    )) :: date as date_day
+    from bounds
+),
+
+whoop_per_day as (
+    select
+        date_day,
+        sum(day_strain) as whoop_strain,
+        max(transformed_at) as whoop_transformed_at
+    from whoop_cycles
+    where date_day >= (select min(date_day) from days)
+    group by date_day
+),
+
+strava_per_day as (
+    select
+        date_day,
+        count(*) as strava_activity_count,
+        sum(moving_time_minutes) as strava_moving_minutes,
+        max(transformed_at) as strava_transformed_at
+    from strava_activities
+    where date_day >= (select min(date_day) from days)
+    group by date_day
+),
+
+daily_load as (
+    select
+        days.date_day,
+        coalesce(whoop_per_day.whoop_strain, 0) as whoop_strain,
+        coalesce(strava_per_day.strava_activity_count, 0) as strava_activity_count,
+        coalesce(strava_per_day.strava_moving_minutes, 0) as strava_moving_minutes,
+        whoop_per_day.whoop_transformed_at,
+        strava_per_day.strava_transformed_at
+    from days
+    left join whoop_per_day on days.date_day = whoop_per_day.date_day
+    left join strava_per_day on days.date_day = strava_per_day.date_day
+),
+
+rolling as (
+    select
+
+        *,
+
+        count(*) over chronic as chronic_day_count,
+        avg(whoop_strain) over acute as acute_strain,
+        avg(whoop_strain) over chronic as chronic_strain,
+        avg(strava_moving_minutes) over acute as acute_moving_minutes,
+        avg(strava_moving_minutes) over chronic as chronic_moving_minutes
+
+    from daily_load
+    window
+        acute as (order by date_day rows between {{ acute_days - 1 }} preceding and current row),
+        chronic as (order by date_day rows between {{ chronic_days - 1 }} preceding and current row)
+),
+
+-- Banister impulse-response model on WHOOP strain as exponentially weighted averages:
+-- fitness (chronic training load) and fatigue (acute training load) in strain units
+banister as (
+    select
+        load_day.date_day,
+        (1 - exp(-1 / {{ fitness_days }}.0)) * sum(
+            history.whoop_strain * exp(-(load_day.date_day - history.date_day) / {{ fitness_days }}.0)
+        ) as fitness,
+        (1 - exp(-1 / {{ fatigue_days }}.0)) * sum(
+            history.whoop_strain * exp(-(load_day.date_day - history.date_day) / {{ fatigue_days }}.0)
+        ) as fatigue
+    from daily_load as load_day
+    inner join daily_load as history
+        on history.date_day between load_day.date_day - {{ banister_window_days - 1 }} and load_day.date_day
+    {% if is_incremental() %}
+        where load_day.date_day >= (select date_day from recompute_from)
+    {% endif %}
+    group by load_day.date_day
+),
+
+final as (
+    select
+
+        rolling.date_day,
+
+        -- daily load
+        rolling.whoop_strain,
+        rolling.strava_activity_count,
+        rolling.strava_moving_minutes,
+
+        -- acute:chronic workload ratio ({{ acute_days }}/{{ chronic_days }} days), once {{ chronic_days }} days of history exist
+        rolling.acute_strain,
+        rolling.chronic_strain,
+        case
+            when rolling.chronic_day_count = {{ chronic_days }}
+                then rolling.acute_strain / nullif(rolling.chronic_strain, 0)
+        end as strain_acwr,
+        rolling.acute_moving_minutes,
+        rolling.chronic_moving_minutes,
+        case
+            when rolling.chronic_day_count = {{ chronic_days }}
+                then rolling.acute_moving_minutes / nullif(rolling.chronic_moving_minutes, 0)
+        end as moving_minutes_acwr,
+
+        -- Banister fitness ({{ fitness_days }} days), fatigue ({{ fatigue_days }} days) and form
+        banister.fitness,
+        banister.fatigue,
+        banister.fitness - banister.fatigue as form,
+
+        -- watermarks for the incremental run
+        rolling.whoop_transformed_at,
+        rolling.strava_transformed_at
+
+    from rolling
+    inner join banister on rolling.date_day = banister.date_day
+)
+
+select * from final
+order by {{ config.get('cluster_by') | join(', ') }}
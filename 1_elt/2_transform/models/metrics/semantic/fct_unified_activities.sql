@@ -0,0 +1,129 @@
+-- One row per training session across Strava and WHOOP: a Strava activity and a WHOOP workout
+-- that overlap in time are merged into one row with the Strava details and the WHOOP strain.
+-- The overlap condition is two inequalities on start/end times, which DuckDB runs as a sort-based
+-- inequality join (IEJoin, or a piecewise merge join for small inputs) instead of comparing every
+-- activity with every workout. A full rebuild therefore stays O(n log n) in the history length.
+{{
+    config(
+        materialized = 'table',
+        cluster_by = ['date_day', 'activity_name']
+    )
+}}
+
+with
+
+strava_activities as (
+    select * from {{ ref('int_strava_activities') }}
+),
+
+whoop_workouts as (
+    select * from {{ ref('fct_whoop_workouts') }}
+),
+
+strava as (
+    select
+        strava_activity_id,
+        start_date as start_time,
+        start_date + to_seconds(elapsed_time_seconds :: bigint) as end_time,
+        activity_name,
+        is_sport_exercise,
+        moving_time_minutes,
+        distance_kilometers,
+        total_elevation_gain_meters,
+        average_heartrate,
+        max_heartrate,
+        kilojoules
+    from strava_activities
+),
+
+whoop as (
+    select
+        whoop_workout_id,
+        workout_start_time as start_time,
+        workout_end_time as end_time,
+        activity_name,
+        is_sport_exercise,
+        duration_minutes,
+        activity_strain,
+        average_heart_rate,
+        max_heart_rate,
+        kilojoule
+    from whoop_workouts
+),
+
+overlapping as (
+    select
+        strava.strava_activity_id,
+        whoop.whoop_workout_id,
+        -- overlap divided by the time spanned by both (intersection over union)
+        date_diff('second', greatest(strava.start_time, whoop.start_time), least(strava.end_time, whoop.end_time))
+            / nullif(date_diff('second', least(strava.start_time, whoop.start_time), greatest(strava.end_time, whoop.end_time)), 0)
+            as overlap_ratio
+    from strava
+    inner join whoop
+        on whoop.start_time < strava.end_time
+            and strava.start_time < whoop.end_time
+),
+
+-- each activity and each workout belongs to at most one session: the pair with the largest overlap
+matches as (
+    select * from (
+        select * from overlapping
+        where overlap_ratio >= {{ var('activity_overlap_min_ratio') }}
+        qualify row_number() over (partition by strava_activity_id order by overlap_ratio desc, whoop_workout_id) = 1
+    )
+    qualify row_number() over (partition by whoop_workout_id order by overlap_ratio desc, strava_activity_id) = 1
+),
+
+sessions as (
+    select
+        strava.strava_activity_id,
+        matches.whoop_workout_id,
+        matches.overlap_ratio
+    from strava
+    left join matches on strava.strava_activity_id = matches.strava_activity_id
+
+    union all
+
+    select
+        null as strava_activity_id,
+        whoop.whoop_workout_id,
+        null as overlap_ratio
+    from whoop
+    where whoop.whoop_workout_id not in (select whoop_workout_id from matches)
+),
+
+final as (
+    select
+
+        {{ dbt_utils.generate_surrogate_key(['sessions.strava_activity_id', 'sessions.whoop_workout_id']) }} as unified_activity_id,
+        sessions.strava_activity_id,
+        sessions.whoop_workout_id,
+        case
+            when sessions.strava_activity_id is not null and sessions.whoop_workout_id is not null then 'both'
+            when sessions.strava_activity_id is not null then 'strava'
+            else 'whoop'
+        end as activity_source,
+        least(strava.start_time, whoop.start_time) :: date as date_day,
+        least(strava.start_time, whoop.start_time) as start_time,
+        greatest(strava.end_time, whoop.end_time) as end_time,
+
+        -- Strava classification and measures take precedence, WHOOP fills the gaps
+        coalesce(strava.activity_name, whoop.activity_name) as activity_name,
+        coalesce(strava.is_sport_exercise, whoop.is_sport_exercise) as is_sport_exercise,
+        coalesce(strava.moving_time_minutes, whoop.duration_minutes) as duration_minutes,
+        strava.distance_kilometers,
+        strava.total_elevation_gain_meters,
+        coalesce(whoop.average_heart_rate, strava.average_heartrate) as average_heart_rate,
+        coalesce(whoop.max_heart_rate, strava.max_heartrate) as max_heart_rate,
+        coalesce(whoop.kilojoule, strava.kilojoules) as kilojoule,
+        whoop.activity_strain,
+        sessions.overlap_ratio
+
+    from sessions
+    left join strava on sessions.strava_activity_id = strava.strava_activity_id
+    left join whoop on sessions.whoop_workout_id = whoop.whoop_workout_id
+)
+
+select * from final
+order by {{ config.get('cluster_by') | join(', ') }}
@@ -0,0 +1,63 @@
+-- Pre-aggregated activities per day and sport, so dashboards and Chat-to-Data
+-- answer time-bucketed questions without scanning fct_activities row by row
+{{
+    config(
+        materialized = 'incremental',
+        unique_key = 'date_day',
+        incremental_strategy = 'delete+insert',
+        on_schema_change = 'append_new_columns'
+    )
+}}
+
+with
+
+activities as (
+    select * from {{ ref('fct_activities') }}
+),
+
+strava as (
+    select * from {{ ref('fct_strava_activities') }}
+),
+
+{% if is_incremental() %}
+-- days that received (re)transformed activities since the last run, recomputed for all sports
+affected_days as (
+    select distinct date_day from activities
+    where transformed_at > (select max(transformed_at) from {{ this }})
+),
+{% endif %}
+
+final as (
+
+    select
+
+        activities.date_day,
+        date_trunc('week', activities.date_day) :: date as week_start,
+        date_trunc('month', activities.date_day) :: date as month_start,
+        activities.activity_name,
+        activities.is_sport_exercise,
+
+        -- measures
+        count(*) as activity_count,
+        sum(strava.distance_kilometers) as distance_kilometers,
+        sum(strava.moving_time_hours) as moving_time_hours,
+        sum(strava.elapsed_time_hours) as elapsed_time_hours,
+        sum(strava.total_elevation_gain_meters) as total_elevation_gain_meters,
+        sum(strava.kilojoules) as kilojoules,
+
+        -- metadata
+        max(activities.transformed_at) as transformed_at
+
+    from activities
+    left join strava on activities.strava_activity_id = strava.strava_activity_id
+    {% if is_incremental() %}
+        where activities.date_day in (select date_day from affected_days)
+    {% endif %}
+    group by
+        activities.date_day,
+        activities.activity_name,
+        activities.is_sport_exercise
+
+)
+
+select * from final
@@ -0,0 +1,55 @@
+{{
+    config(
+        materialized = 'incremental',
+        unique_key = 'week_start',
+        incremental_strategy = 'delete+insert',
+        on_schema_change = 'append_new_columns'
+    )
+}}
+
+with
+
+daily as (
+    select * from {{ ref('rollup_activities_daily') }}
+),
+
+{% if is_incremental() %}
+-- weeks containing days that were re-aggregated in rollup_activities_daily since the last run
+affected_weeks as (
+    select distinct week_start from daily
+    where transformed_at > (select max(transformed_at) from {{ this }})
+),
+{% endif %}
+
+final as (
+
+    select
+
+        week_start,
+        activity_name,
+        is_sport_exercise,
+
+        -- measures
+        sum(activity_count) :: bigint as activity_count,
+        count(*) as active_days,
+        sum(distance_kilometers) as distance_kilometers,
+        sum(moving_time_hours) as moving_time_hours,
+        sum(elapsed_time_hours) as elapsed_time_hours,
+        sum(total_elevation_gain_meters) as total_elevation_gain_meters,
+        sum(kilojoules) as kilojoules,
+
+        -- metadata
+        max(transformed_at) as transformed_at
+
+    from daily
+    {% if is_incremental() %}
+        where week_start in (select week_start from affected_weeks)
+    {% endif %}
+    group by
+        week_start,
+        activity_name,
+        is_sport_exercise
+
+)
+
+select * from final
@@ -17,7 +17,8 @@ distinct_activity_types as (
 
 final as (
     select
-        row_number() over (order by type, activity_name) as strava_activity_type_id,
+        -- stable surrogate key, so incremental facts keep valid foreign keys when new types appear
+        {{ dbt_utils.generate_surrogate_key(['type', 'activity_name', 'is_sport_exercise']) }} as strava_activity_type_id,
         type,
         activity_name,
         is_sport_exercise
@@ -13,7 +13,8 @@ distinct_gear as (
 final as (
 
     select
-        row_number() over (order by gear_id nulls last) as strava_gear_id,
+        -- stable surrogate key, so incremental facts keep valid foreign keys when new gear appears
+        {{ dbt_utils.generate_surrogate_key(['gear_id']) }} as strava_gear_id,
         gear_id
     from distinct_gear
 
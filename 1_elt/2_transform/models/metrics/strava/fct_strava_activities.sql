@@ -1,10 +1,24 @@
 -- Kimball fact table: one row per Strava activity
 -- Foreign keys: date_day -> dim_dates, strava_activity_type_id -> dim_strava_activity_type, strava_gear_id -> dim_strava_gear
 -- Degenerate dimensions: strava_activity_id, strava_activity_id_of_day, name (activity title)
+{{
+    config(
+        materialized = 'incremental',
+        unique_key = 'strava_activity_id',
+        incremental_strategy = 'delete+insert',
+        on_schema_change = 'append_new_columns',
+        cluster_by = ['date_day', 'strava_activity_type_id']
+    )
+}}
+
 with
 
 strava as (
     select * from {{ ref('int_strava_activities') }}
+    {% if is_incremental() %}
+        -- only rows (re)transformed in int_strava_activities since the last run
+        where transformed_at > (select max(transformed_at) from {{ this }})
+    {% endif %}
 ),
 
 activity_type as (
@@ -54,7 +68,10 @@ final as (
         strava.max_heartrate,
         strava.average_watts,
         strava.kilojoules,
-        strava.average_cadence
+        strava.average_cadence,
+
+        -- metadata
+        strava.transformed_at
 
     from strava
     left join activity_type
@@ -66,3 +83,4 @@ final as (
 )
 
 select * from final
+order by {{ config.get('cluster_by') | join(', ') }}
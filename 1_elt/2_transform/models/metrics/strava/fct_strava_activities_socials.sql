@@ -1,10 +1,24 @@
 -- Kimball fact table: one row per Strava activity (social/engagement grain)
 -- Foreign keys: date_day -> dim_dates, strava_activity_type_id -> dim_strava_activity_type, strava_gear_id -> dim_strava_gear
 -- Degenerate dimensions: strava_activity_id, strava_activity_id_of_day, name; flags: trainer, commute, manual, private, flagged
+{{
+    config(
+        materialized = 'incremental',
+        unique_key = 'strava_activity_id',
+        incremental_strategy = 'delete+insert',
+        on_schema_change = 'append_new_columns',
+        cluster_by = ['date_day', 'strava_activity_type_id']
+    )
+}}
+
 with
 
 strava as (
     select * from {{ ref('int_strava_activities') }}
+    {% if is_incremental() %}
+        -- only rows (re)transformed in int_strava_activities since the last run
+        where transformed_at > (select max(transformed_at) from {{ this }})
+    {% endif %}
 ),
 
 activity_type as (
@@ -39,7 +53,10 @@ final as (
         strava.commute,
         strava.manual,
         strava.private,
-        strava.flagged
+        strava.flagged,
+
+        -- metadata
+        strava.transformed_at
 
     from strava
     left join activity_type on strava.type = activity_type.type
@@ -50,3 +67,4 @@ final as (
 )
 
 select * from final
+order by {{ config.get('cluster_by') | join(', ') }}
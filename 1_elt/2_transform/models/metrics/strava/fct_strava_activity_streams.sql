@@ -0,0 +1,66 @@
+-- Kimball fact table: one row per Strava activity with per-second streams
+-- Foreign keys: date_day -> dim_dates, strava_activity_type_id -> dim_strava_activity_type
+-- Measures are computed from the streams by 1_elt/1_load/strava/load_strava_streams.py
+{{
+    config(
+        materialized = 'incremental',
+        unique_key = 'strava_activity_id',
+        incremental_strategy = 'delete+insert',
+        on_schema_change = 'append_new_columns',
+        cluster_by = ['date_day', 'strava_activity_type_id']
+    )
+}}
+
+with
+
+stream_metrics as (
+    select * from {{ ref('stg_strava_activity_stream_metrics') }}
+    {% if is_incremental() %}
+        -- only activities whose streams were computed since the last run
+        where computed_at > (select max(computed_at) from {{ this }})
+    {% endif %}
+),
+
+strava_activities as (
+    select * from {{ ref('fct_strava_activities') }}
+),
+
+final as (
+    select
+
+        strava_activities.strava_activity_id,
+        strava_activities.date_day,
+        strava_activities.strava_activity_type_id,
+
+        -- stream metrics (null if the stream is missing or the activity is too short)
+        stream_metrics.stream_seconds,
+        stream_metrics.max_power_5s_watts,
+        stream_metrics.max_power_15s_watts,
+        stream_metrics.max_power_30s_watts,
+        stream_metrics.max_power_1m_watts,
+        stream_metrics.max_power_5m_watts,
+        stream_metrics.max_power_10m_watts,
+        stream_metrics.max_power_20m_watts,
+        stream_metrics.max_power_60m_watts,
+        stream_metrics.normalized_power_watts,
+        stream_metrics.best_1k_seconds,
+        stream_metrics.best_5k_seconds,
+        stream_metrics.best_10k_seconds,
+        stream_metrics.heart_rate_zone_1_seconds,
+        stream_metrics.heart_rate_zone_2_seconds,
+        stream_metrics.heart_rate_zone_3_seconds,
+        stream_metrics.heart_rate_zone_4_seconds,
+        stream_metrics.heart_rate_zone_5_seconds,
+        stream_metrics.max_heartrate,
+
+        -- metadata
+        stream_metrics.computed_at
+
+    from stream_metrics
+    -- streams are only computed for loaded activities
+    inner join strava_activities
+        on {{ dbt_utils.generate_surrogate_key(['stream_metrics.activity_id']) }} = strava_activities.strava_activity_id
+)
+
+select * from final
+order by {{ config.get('cluster_by') | join(', ') }}
@@ -16,7 +16,7 @@ filter_activities as (
 
 enhanced as (
     select
-        row_number() over (order by activity_name) as whoop_workout_activity_name_id,
+        {{ dbt_utils.generate_surrogate_key(['activity_name']) }} as whoop_workout_activity_name_id,
         activity_name,
         is_sport_exercise
 
@@ -0,0 +1,106 @@
+-- Rolling HRV, resting heart rate and recovery baselines per day, so dashboards read
+-- today's deviation from the personal baseline instead of windowing over full history
+{{
+    config(
+        materialized = 'incremental',
+        unique_key = 'date_day',
+        incremental_strategy = 'delete+insert',
+        on_schema_change = 'append_new_columns',
+        cluster_by = ['date_day']
+    )
+}}
+
+{% set baseline_days = 30 %}
+
+with
+
+whoop_cycles as (
+    select * from {{ ref('int_whoop_cycles') }}
+),
+
+{% if is_incremental() %}
+-- first day with (re)transformed cycles since the last run: it and every later day are recomputed
+recompute_from as (
+    select min(date_day) as date_day from whoop_cycles
+    where transformed_at > (select max(transformed_at) from {{ this }})
+),
+{% endif %}
+
+daily as (
+    select
+        date_day,
+        avg(recovery_score) as recovery_score,
+        avg(hrv_rmssd_milli) as hrv_rmssd_milli,
+        avg(resting_heart_rate) as resting_heart_rate,
+        max(transformed_at) as transformed_at
+    from whoop_cycles
+    {% if is_incremental() %}
+        -- the baselines of the recomputed days reach {{ baseline_days }} days back
+        where date_day >= (select date_day from recompute_from) - interval '{{ baseline_days }} days'
+    {% endif %}
+    group by date_day
+),
+
+rolling as (
+    select
+
+        date_day,
+        recovery_score,
+        hrv_rmssd_milli,
+        resting_heart_rate,
+
+        avg(recovery_score) over last_7_days as recovery_score_7d_avg,
+        avg(hrv_rmssd_milli) over last_7_days as hrv_rmssd_7d_avg,
+        avg(resting_heart_rate) over last_7_days as resting_heart_rate_7d_avg,
+
+        -- baselines exclude the day itself, so a day is compared against its history
+        count(hrv_rmssd_milli) over baseline as baseline_day_count,
+        avg(hrv_rmssd_milli) over baseline as hrv_rmssd_baseline,
+        stddev_samp(hrv_rmssd_milli) over baseline as hrv_rmssd_baseline_stddev,
+        avg(resting_heart_rate) over baseline as resting_heart_rate_baseline,
+
+        transformed_at
+
+    from daily
+    window
+        last_7_days as (order by date_day range between interval 6 days preceding and current row),
+        baseline as (order by date_day range between interval {{ baseline_days }} days preceding and interval 1 day preceding)
+),
+
+final as (
+    select
+
+        date_day,
+
+        -- values of the day
+        recovery_score,
+        hrv_rmssd_milli,
+        resting_heart_rate,
+
+        -- 7-day trends
+        recovery_score_7d_avg,
+        hrv_rmssd_7d_avg,
+        resting_heart_rate_7d_avg,
+
+        -- {{ baseline_days }}-day baselines and today's deviation from them
+        baseline_day_count,
+        hrv_rmssd_baseline,
+        hrv_rmssd_baseline_stddev,
+        case
+            when baseline_day_count >= 7
+                then (hrv_rmssd_milli - hrv_rmssd_baseline) / nullif(hrv_rmssd_baseline_stddev, 0)
+        end as hrv_rmssd_z_score,
+        resting_heart_rate_baseline,
+        resting_heart_rate - resting_heart_rate_baseline as resting_heart_rate_deviation,
+
+        -- watermark for the incremental run
+        transformed_at
+
+    from rolling
+    {% if is_incremental() %}
+        where date_day >= (select date_day from recompute_from)
+    {% endif %}
+)
+
+select * from final
+order by {{ config.get('cluster_by') | join(', ') }}
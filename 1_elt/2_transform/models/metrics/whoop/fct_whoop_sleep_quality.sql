@@ -1,7 +1,21 @@
+{{
+    config(
+        materialized = 'incremental',
+        unique_key = 'sleep_id',
+        incremental_strategy = 'delete+insert',
+        on_schema_change = 'append_new_columns',
+        cluster_by = ['date_day']
+    )
+}}
+
 with
 
 whoop_quality as (
     select * from {{ ref('int_whoop_sleep') }}
+    {% if is_incremental() %}
+        -- only rows (re)transformed in int_whoop_sleep since the last run
+        where transformed_at > (select max(transformed_at) from {{ this }})
+    {% endif %}
 ),
 
 final as (
@@ -29,9 +43,13 @@ final as (
         -- moon data
         moon_phase,
         moon_phase_cycle,
-        moon_illumination
+        moon_illumination,
+
+        -- metadata
+        transformed_at
 
     from whoop_quality
 )
 
 select * from final
+order by {{ config.get('cluster_by') | join(', ') }}
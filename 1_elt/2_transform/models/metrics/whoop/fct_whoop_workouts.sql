@@ -1,7 +1,21 @@
+{{
+    config(
+        materialized = 'incremental',
+        unique_key = 'whoop_workout_id',
+        incremental_strategy = 'delete+insert',
+        on_schema_change = 'append_new_columns',
+        cluster_by = ['date_day', 'activity_name']
+    )
+}}
+
 with
 
 whoop_workouts as (
     select * from {{ ref('int_whoop_workouts') }}
+    {% if is_incremental() %}
+        -- only rows (re)transformed in int_whoop_workouts since the last run
+        where transformed_at > (select max(transformed_at) from {{ this }})
+    {% endif %}
 ),
 
 final as (
@@ -36,9 +50,13 @@ final as (
         percent_recorded,
         distance_meter,
         altitude_gain_meter,
-        altitude_change_meter
+        altitude_change_meter,
+
+        -- metadata
+        transformed_at
 
     from whoop_workouts
 )
 
 select * from final
+order by {{ config.get('cluster_by') | join(', ') }}
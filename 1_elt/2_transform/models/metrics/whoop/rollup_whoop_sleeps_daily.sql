@@ -0,0 +1,65 @@
+-- Pre-aggregated sleep metrics per day, so dashboards answer weekly/monthly
+-- questions without scanning fct_whoop_sleeps row by row
+{{
+    config(
+        materialized = 'incremental',
+        unique_key = 'date_day',
+        incremental_strategy = 'delete+insert',
+        on_schema_change = 'append_new_columns'
+    )
+}}
+
+with
+
+whoop_sleeps as (
+    select * from {{ ref('fct_whoop_sleeps') }}
+),
+
+{% if is_incremental() %}
+-- days that received (re)transformed sleeps since the last run
+affected_days as (
+    select distinct date_day from whoop_sleeps
+    where transformed_at > (select max(transformed_at) from {{ this }})
+),
+{% endif %}
+
+final as (
+
+    select
+
+        date_day,
+        date_trunc('week', date_day) :: date as week_start,
+        date_trunc('month', date_day) :: date as month_start,
+
+        count(*) as sleep_count,
+        -- sleeps with scored stage durations (averages are taken over these)
+        count(asleep_duration_minutes) as scored_sleep_count,
+
+        -- total minutes per sleep metric
+        sum(asleep_duration_minutes) as total_asleep_duration_minutes,
+        sum(in_bed_duration_minutes) as total_in_bed_duration_minutes,
+        sum(light_sleep_duration_minutes) as total_light_sleep_duration_minutes,
+        sum(deep_sleep_duration_minutes) as total_deep_sleep_duration_minutes,
+        sum(rem_duration_minutes) as total_rem_duration_minutes,
+        sum(awake_duration_minutes) as total_awake_duration_minutes,
+
+        -- average minutes per scored sleep
+        sum(asleep_duration_minutes) / nullif(count(asleep_duration_minutes), 0) as avg_asleep_duration_minutes,
+        sum(in_bed_duration_minutes) / nullif(count(asleep_duration_minutes), 0) as avg_in_bed_duration_minutes,
+        sum(light_sleep_duration_minutes) / nullif(count(asleep_duration_minutes), 0) as avg_light_sleep_duration_minutes,
+        sum(deep_sleep_duration_minutes) / nullif(count(asleep_duration_minutes), 0) as avg_deep_sleep_duration_minutes,
+        sum(rem_duration_minutes) / nullif(count(asleep_duration_minutes), 0) as avg_rem_duration_minutes,
+        sum(awake_duration_minutes) / nullif(count(asleep_duration_minutes), 0) as avg_awake_duration_minutes,
+
+        -- metadata
+        max(transformed_at) as transformed_at
+
+    from whoop_sleeps
+    {% if is_incremental() %}
+        where date_day in (select date_day from affected_days)
+    {% endif %}
+    group by date_day
+
+)
+
+select * from final
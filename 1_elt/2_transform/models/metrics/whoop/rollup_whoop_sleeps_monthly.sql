@@ -0,0 +1,61 @@
+{{
+    config(
+        materialized = 'incremental',
+        unique_key = 'month_start',
+        incremental_strategy = 'delete+insert',
+        on_schema_change = 'append_new_columns'
+    )
+}}
+
+with
+
+daily as (
+    select * from {{ ref('rollup_whoop_sleeps_daily') }}
+),
+
+{% if is_incremental() %}
+-- months containing days that were re-aggregated in rollup_whoop_sleeps_daily since the last run
+affected_months as (
+    select distinct month_start from daily
+    where transformed_at > (select max(transformed_at) from {{ this }})
+),
+{% endif %}
+
+final as (
+
+    select
+
+        month_start,
+
+        count(*) as nights_count,
+        sum(sleep_count) :: bigint as sleep_count,
+        sum(scored_sleep_count) :: bigint as scored_sleep_count,
+
+        -- total minutes per sleep metric
+        sum(total_asleep_duration_minutes) as total_asleep_duration_minutes,
+        sum(total_in_bed_duration_minutes) as total_in_bed_duration_minutes,
+        sum(total_light_sleep_duration_minutes) as total_light_sleep_duration_minutes,
+        sum(total_deep_sleep_duration_minutes) as total_deep_sleep_duration_minutes,
+        sum(total_rem_duration_minutes) as total_rem_duration_minutes,
+        sum(total_awake_duration_minutes) as total_awake_duration_minutes,
+
+        -- average minutes per scored sleep (weighted by the daily counts, not an average of daily averages)
+        sum(total_asleep_duration_minutes) / nullif(sum(scored_sleep_count), 0) as avg_asleep_duration_minutes,
+        sum(total_in_bed_duration_minutes) / nullif(sum(scored_sleep_count), 0) as avg_in_bed_duration_minutes,
+        sum(total_light_sleep_duration_minutes) / nullif(sum(scored_sleep_count), 0) as avg_light_sleep_duration_minutes,
+        sum(total_deep_sleep_duration_minutes) / nullif(sum(scored_sleep_count), 0) as avg_deep_sleep_duration_minutes,
+        sum(total_rem_duration_minutes) / nullif(sum(scored_sleep_count), 0) as avg_rem_duration_minutes,
+        sum(total_awake_duration_minutes) / nullif(sum(scored_sleep_count), 0) as avg_awake_duration_minutes,
+
+        -- metadata
+        max(transformed_at) as transformed_at
+
+    from daily
+    {% if is_incremental() %}
+        where month_start in (select month_start from affected_months)
+    {% endif %}
+    group by month_start
+
+)
+
+select * from final
@@ -0,0 +1,35 @@
+with
+
+strava_stream_metrics_data as (
+    select * from {{ source('strava', 'strava_activity_stream_metrics') }}
+),
+
+final as (
+    select
+
+        activity_id :: bigint as activity_id,
+        stream_seconds :: double as stream_seconds,
+        max_power_5s_watts :: double as max_power_5s_watts,
+        max_power_15s_watts :: double as max_power_15s_watts,
+        max_power_30s_watts :: double as max_power_30s_watts,
+        max_power_1m_watts :: double as max_power_1m_watts,
+        max_power_5m_watts :: double as max_power_5m_watts,
+        max_power_10m_watts :: double as max_power_10m_watts,
+        max_power_20m_watts :: double as max_power_20m_watts,
+        max_power_60m_watts :: double as max_power_60m_watts,
+        normalized_power_watts :: double as normalized_power_watts,
+        best_1k_seconds :: double as best_1k_seconds,
+        best_5k_seconds :: double as best_5k_seconds,
+        best_10k_seconds :: double as best_10k_seconds,
+        heart_rate_zone_1_seconds :: double as heart_rate_zone_1_seconds,
+        heart_rate_zone_2_seconds :: double as heart_rate_zone_2_seconds,
+        heart_rate_zone_3_seconds :: double as heart_rate_zone_3_seconds,
+        heart_rate_zone_4_seconds :: double as heart_rate_zone_4_seconds,
+        heart_rate_zone_5_seconds :: double as heart_rate_zone_5_seconds,
+        max_heartrate :: double as max_heartrate, -- heart rate zones are shares of this
+        computed_at :: timestamp as computed_at
+
+    from strava_stream_metrics_data
+)
+
+select * from final
@@ -0,0 +1,24 @@
+with
+
+whoop_cycles_data as (
+    select * from {{ source('whoop', 'whoop_physiological_cycles') }}
+),
+
+final as (
+    select
+
+        "id" :: bigint as cycle_id,
+        "start" :: timestamp as cycle_start_time,
+        "end" :: timestamp as cycle_end_time,
+        "timezone_offset" :: varchar as cycle_timezone,
+        "score_state" :: varchar as score_state,
+
+        "score".strain :: double as day_strain,
+        "score".kilojoule :: double as kilojoule,
+        "score".average_heart_rate :: integer as average_heart_rate,
+        "score".max_heart_rate :: integer as max_heart_rate
+
+    from whoop_cycles_data
+)
+
+select * from final
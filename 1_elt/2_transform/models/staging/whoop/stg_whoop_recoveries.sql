@@ -0,0 +1,24 @@
+with
+
+whoop_recoveries_data as (
+    select * from {{ source('whoop', 'whoop_recoveries') }}
+),
+
+final as (
+    select
+
+        "cycle_id" :: bigint as cycle_id,
+        "sleep_id" :: varchar as sleep_id,
+        "score_state" :: varchar as score_state,
+
+        "score".user_calibrating :: boolean as is_user_calibrating,
+        "score".recovery_score :: double as recovery_score,
+        "score".resting_heart_rate :: double as resting_heart_rate,
+        "score".hrv_rmssd_milli :: double as hrv_rmssd_milli,
+        "score".spo2_percentage :: double as spo2_percentage,
+        "score".skin_temp_celsius :: double as skin_temp_celsius
+
+    from whoop_recoveries_data
+)
+
+select * from final
@@ -7,7 +7,7 @@ whoop_sleep_data as (
 final as (
     select
 
-        "id" :: timestamp as sleep_id,
+        "id" :: varchar as sleep_id,
         "start" :: timestamp as sleep_onset,
         "end" :: timestamp as wake_onset,
         "score".sleep_performance_percentage :: decimal(10, 2) as sleep_performance,
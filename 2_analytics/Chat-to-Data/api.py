@@ -2,21 +2,52 @@
 # FastAPI backend for Text-to-SQL querying of fct_activities
 # =====================================================================
 
-from fastapi import FastAPI, HTTPException
+from contextlib import ExitStack, asynccontextmanager
+from fastapi import FastAPI, Header, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from pathlib import Path
+import asyncio
 import duckdb
+import hashlib
+import importlib.util
 import pandas as pd
 import yaml
 import os
 import re
+import sys
 from typing import Optional
+from urllib.parse import quote
 from datetime import datetime, date
 
 # Get the project root directory (go up 3 levels from 2_analytics/Chat-to-Data/api.py)
 PROJECT_ROOT = Path(__file__).parent.parent.parent
-DUCKDB_PATH = str(PROJECT_ROOT / "0_data" / "database" / "analytics.duckdb")
+sys.path.insert(0, str(PROJECT_ROOT))
+from analytics_db import (
+    analytics_connection,
+    cached_query,
+    current_database_path,
+    current_build_id,
+    database_version,
+    interrupt_after,
+    result_cache,
+)
+
+sys.path.insert(0, str(Path(__file__).parent))
+from rollup_router import route_to_rollup
+from sql_cache import SqlCache
+from intent_compiler import compile_intent
+from query_guard import QueryRejected, check_cost, limit_rows, validate_sql
+from result_stream import (
+    MEDIA_TYPES,
+    arrow_stream,
+    columnar_json,
+    ndjson_rows,
+    negotiate_format,
+)
+
 TABLE_NAME = "semantic.fct_activities"
 YAML_SCHEMA_PATH = (
     PROJECT_ROOT
@@ -28,7 +59,73 @@ YAML_SCHEMA_PATH = (
     / "fct_activities.yml"
 )
 
-app = FastAPI()
+# Sleep and recovery before each activity, for questions like "how did my sleep affect the next run"
+READINESS_TABLE_NAME = "semantic.fct_activity_readiness"
+READINESS_YAML_SCHEMA_PATH = YAML_SCHEMA_PATH.with_name("fct_activity_readiness.yml")
+READINESS_KEYWORDS = ("sleep", "slept", "recovery", "recovered", "hrv", "resting heart")
+
+# Generated SQL per normalized question, model and schema version (survives restarts)
+SQL_CACHE_PATH = Path(
+    os.getenv(
+        "SQL_CACHE_PATH",
+        PROJECT_ROOT / "0_data" / "database" / "chat_sql_cache.sqlite",
+    )
+)
+sql_cache = SqlCache(
+    SQL_CACHE_PATH,
+    max_entries=int(os.getenv("SQL_CACHE_MAX_ENTRIES", "1000")),
+    ttl_seconds=float(os.getenv("SQL_CACHE_TTL_SECONDS", str(7 * 24 * 3600))),
+)
+
+# Questions the intent compiler understands at least this well are answered without the LLM
+INTENT_MIN_CONFIDENCE = float(os.getenv("INTENT_MIN_CONFIDENCE", "0.8"))
+
+# Ollama generations in flight per process. Further questions wait for a slot up to
+# LLM_QUEUE_TIMEOUT_SECONDS and are then answered by the rule-based fallback.
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "2"))
+LLM_QUEUE_TIMEOUT_SECONDS = float(os.getenv("LLM_QUEUE_TIMEOUT_SECONDS", "5"))
+OLLAMA_TIMEOUT_SECONDS = float(os.getenv("OLLAMA_TIMEOUT_SECONDS", "30"))
+llm_semaphore = asyncio.Semaphore(LLM_MAX_CONCURRENCY)
+
+# Rows fetched from DuckDB per chunk of a streamed result (ndjson, arrow, columns)
+STREAM_BATCH_ROWS = int(os.getenv("STREAM_BATCH_ROWS", "10000"))
+
+# Guardrails for generated SQL: rows returned, wall-clock time (DuckDB interrupt)
+# and the largest estimated row count of any plan step
+QUERY_MAX_ROWS = int(os.getenv("QUERY_MAX_ROWS", "10000"))
+STREAM_MAX_ROWS = int(os.getenv("STREAM_MAX_ROWS", "1000000"))
+QUERY_TIMEOUT_SECONDS = float(os.getenv("QUERY_TIMEOUT_SECONDS", "10"))
+STREAM_TIMEOUT_SECONDS = float(os.getenv("STREAM_TIMEOUT_SECONDS", "60"))
+QUERY_MAX_ESTIMATED_ROWS = int(os.getenv("QUERY_MAX_ESTIMATED_ROWS", "100000000"))
+
+# Pooled async HTTP client for Ollama (created on first use, closed at shutdown)
+_http_client = None
+
+# Ollama and database status, refreshed by a background task instead of per /health request
+HEALTH_PROBE_INTERVAL_SECONDS = float(os.getenv("HEALTH_PROBE_INTERVAL_SECONDS", "15"))
+HEALTH_PROBE_TIMEOUT_SECONDS = 2
+_health = {
+    "checked_at": None,
+    "ollama": {"available": None, "models": [], "error": None},
+    "database": {"available": None, "path": None, "version": None, "error": None},
+}
+
+# Schema context built from the YAML files, rebuilt only when one of their mtimes changes
+_schema_cache = {"mtimes": None, "context": None, "version": None, "built_at": None}
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Build the schema context at startup and probe Ollama and the database in the background."""
+    load_schema_context()
+    probe_task = asyncio.create_task(health_probe_loop())
+    yield
+    probe_task.cancel()
+    if _http_client is not None:
+        await _http_client.aclose()
+
+
+app = FastAPI(lifespan=lifespan)
 
 # Allow HTML frontend to access API
 app.add_middleware(
@@ -36,6 +133,7 @@ app.add_middleware(
     allow_origins=["*"],
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Query-SQL", "X-Query-Cached"],
 )
 
 
@@ -55,15 +153,62 @@ def root():
 
 class QueryRequest(BaseModel):
     question: str
+    format: Optional[str] = None
 
 
 class QueryResponse(BaseModel):
     sql: str
     result: list
     error: Optional[str] = None
+    cached: bool = False
+    truncated: bool = False
+    # Intent of the rule-based compiler if it answered without the LLM
+    intent: Optional[str] = None
+
+
+def _schema_mtimes() -> tuple:
+    """mtimes of the YAML schema files (None for a missing file)."""
+    mtimes = []
+    for path in (YAML_SCHEMA_PATH, READINESS_YAML_SCHEMA_PATH):
+        try:
+            mtimes.append(path.stat().st_mtime_ns)
+        except OSError:
+            mtimes.append(None)
+    return tuple(mtimes)
+
+
+def get_schema_context() -> dict:
+    """
+    Cached schema context for the LLM.
+
+    The YAML files are only read and parsed again when one of them changed, so
+    requests just stat the files. Edits to the YAML are picked up without a restart.
+
+    Returns:
+        Dict with the context string, its version (hash of the context) and build time
+    """
+    mtimes = _schema_mtimes()
+    if _schema_cache["mtimes"] != mtimes:
+        context = build_schema_context()
+        _schema_cache.update(
+            mtimes=mtimes,
+            context=context,
+            version=hashlib.sha256(context.encode()).hexdigest()[:12],
+            built_at=datetime.now().isoformat(),
+        )
+    return {
+        "context": _schema_cache["context"],
+        "version": _schema_cache["version"],
+        "built_at": _schema_cache["built_at"],
+    }
 
 
 def load_schema_context() -> str:
+    """Schema context string for the LLM (cached, see get_schema_context)."""
+    return get_schema_context()["context"]
+
+
+def build_schema_context() -> str:
     """Load the YAML schema file and convert it to a context string for the LLM."""
     try:
         with open(YAML_SCHEMA_PATH, "r") as f:
@@ -102,11 +247,34 @@ Columns:
         if "is_sport_exercise" not in added_columns:
             context += "- is_sport_exercise: Boolean flag (true/false) indicating if the activity is a sport/exercise (true) or general activity (false). Use this to filter for sport activities.\n"
 
-        return context
+        return context + load_readiness_context()
     except Exception as e:
         return f"Table: {TABLE_NAME}\nColumns: strava_activity_id, strava_activity_id_of_day, date_day, name, activity_name, is_sport_exercise"
 
 
+def load_readiness_context() -> str:
+    """Context of the activity readiness table, empty if its YAML schema is missing."""
+    try:
+        with open(READINESS_YAML_SCHEMA_PATH, "r") as f:
+            model_info = yaml.safe_load(f)["models"][0]
+    except (OSError, KeyError, IndexError, TypeError):
+        return ""
+
+    context = f"""
+Table: {READINESS_TABLE_NAME}
+
+Description:
+{model_info.get('description', '')}
+
+Columns:
+"""
+    for col in model_info.get("columns", []):
+        col_desc = col.get("description", "").strip()
+        col_desc = re.sub(r"\*\*([^*]+)\*\*", r"\1", col_desc)
+        context += f"- {col.get('name', '')}: {col_desc}\n"
+    return context
+
+
 def get_sql_prompt(question: str, schema_context: str) -> str:
     """Generate the prompt for SQL conversion."""
     return f"""You are a SQL expert. Convert the following natural language question into a SQL query for DuckDB.
@@ -118,7 +286,7 @@ Rules:
 1. Only use columns that exist in the schema above
 2. Use proper SQL syntax for DuckDB
 3. Return ONLY the SQL query, no explanations, no markdown formatting, no code blocks
-4. Use the table name: {TABLE_NAME}
+4. Use the table name: {TABLE_NAME}, or {READINESS_TABLE_NAME} for questions about sleep, recovery, HRV or resting heart rate before activities
 5. For date comparisons, use date_day column (format: 'YYYY-MM-DD')
 6. For sport types, use the activity_name column with exact values like 'Run', 'Ride', 'Swim', 'Yoga', 'WeightTraining', etc.
 7. The name column contains user-defined activity names (free-form text)
@@ -156,265 +324,302 @@ def clean_sql_response(sql: str) -> str:
     return sql
 
 
-def generate_sql_with_ollama(question: str, schema_context: str) -> str:
-    """Generate SQL query using Ollama (local, free, no API key needed)."""
-    try:
-        import requests
+def ollama_model() -> str:
+    """Ollama model used for SQL generation."""
+    # Default to llama3.2, can use llama3, mistral, etc.
+    return os.getenv("OLLAMA_MODEL", "llama3.2")
+
+
+def get_http_client():
+    """The shared httpx.AsyncClient, keeps connections to Ollama open between requests."""
+    global _http_client
+    if _http_client is None:
+        import httpx
+
+        _http_client = httpx.AsyncClient(
+            timeout=OLLAMA_TIMEOUT_SECONDS,
+            # One connection more than generations, so the health probe never queues
+            limits=httpx.Limits(max_connections=LLM_MAX_CONCURRENCY + 1),
+        )
+    return _http_client
 
-        ollama_url = os.getenv("OLLAMA_URL", "http://localhost:11434")
-        model = os.getenv(
-            "OLLAMA_MODEL", "llama3.2"
-        )  # Default to llama3.2, can use llama3, mistral, etc.
 
-        prompt = get_sql_prompt(question, schema_context)
+async def generate_sql_with_ollama(question: str, schema_context: str) -> str:
+    """Generate SQL query using Ollama (local, free, no API key needed).
 
-        response = requests.post(
+    Raises ValueError if httpx is missing or Ollama cannot be reached or answers with an error.
+    """
+    try:
+        import httpx
+    except ImportError:
+        raise ValueError("httpx library not installed. Install with: pip install httpx")
+
+    client = get_http_client()
+    ollama_url = os.getenv("OLLAMA_URL", "http://localhost:11434")
+    prompt = get_sql_prompt(question, schema_context)
+
+    try:
+        response = await client.post(
             f"{ollama_url}/api/generate",
             json={
-                "model": model,
+                "model": ollama_model(),
                 "prompt": prompt,
                 "stream": False,
                 "options": {
                     "temperature": 0.1,
                 },
             },
-            timeout=30,
         )
         response.raise_for_status()
-
+        # A body that is not JSON raises json.JSONDecodeError, a ValueError
         sql = response.json().get("response", "").strip()
-        return clean_sql_response(sql)
-    except ImportError:
-        raise ValueError(
-            "requests library not installed. Install with: pip install requests"
-        )
-    except Exception as e:
+    except (httpx.HTTPError, ValueError) as e:
         raise ValueError(
             f"Ollama error: {str(e)}. Make sure Ollama is running: ollama serve"
         )
+    return clean_sql_response(sql)
 
 
-def generate_sql_with_llm(question: str, schema_context: str) -> str:
-    """Generate SQL using Ollama."""
-    return generate_sql_with_ollama(question, schema_context)
-
-
-def parse_date_from_question(question: str) -> Optional[str]:
-    """Extract date information from question and return SQL WHERE clause for dates."""
-    question_lower = question.lower()
-    current_year = datetime.now().year
-
-    # Pattern: "in March 2025" or "in March"
-    month_year_match = re.search(r"in\s+(\w+)\s+(\d{4})", question_lower)
-    if month_year_match:
-        month_name = month_year_match.group(1)
-        year = int(month_year_match.group(2))
-        month_num = _month_name_to_number(month_name)
-        if month_num:
-            start_date = f"{year}-{month_num:02d}-01"
-            # Calculate end date (first day of next month)
-            if month_num == 12:
-                end_date = f"{year + 1}-01-01"
-            else:
-                end_date = f"{year}-{month_num + 1:02d}-01"
-            return f"date_day >= '{start_date}' AND date_day < '{end_date}'"
-
-    # Pattern: "in March" (without year, search across all years for that month)
-    month_only_match = re.search(r"in\s+(\w+)(?:\s|$)", question_lower)
-    if month_only_match and not month_year_match:
-        month_name = month_only_match.group(1)
-        month_num = _month_name_to_number(month_name)
-        if month_num:
-            # Use EXTRACT to filter by month across all years
-            return f"EXTRACT(MONTH FROM date_day) = {month_num}"
-
-    # Pattern: "in 2025" or "during 2025"
-    year_match = re.search(r"(?:in|during)\s+(\d{4})", question_lower)
-    if year_match:
-        year = int(year_match.group(1))
-        return f"date_day >= '{year}-01-01' AND date_day < '{year + 1}-01-01'"
-
-    # Pattern: "last 30 days" or "past 30 days"
-    days_match = re.search(r"(?:last|past)\s+(\d+)\s+days?", question_lower)
-    if days_match:
-        days = int(days_match.group(1))
-        return f"date_day >= CURRENT_DATE - INTERVAL '{days} days'"
-
-    # Pattern: "this month"
-    if "this month" in question_lower:
-        return f"date_day >= DATE_TRUNC('month', CURRENT_DATE) AND date_day < DATE_TRUNC('month', CURRENT_DATE) + INTERVAL '1 month'"
-
-    # Pattern: "this year"
-    if "this year" in question_lower:
-        return f"date_day >= DATE_TRUNC('year', CURRENT_DATE) AND date_day < DATE_TRUNC('year', CURRENT_DATE) + INTERVAL '1 year'"
-
-    return None
-
-
-def _month_name_to_number(month_name: str) -> Optional[int]:
-    """Convert month name to number (1-12)."""
-    months = {
-        "january": 1,
-        "jan": 1,
-        "february": 2,
-        "feb": 2,
-        "march": 3,
-        "mar": 3,
-        "april": 4,
-        "apr": 4,
-        "may": 5,
-        "june": 6,
-        "jun": 6,
-        "july": 7,
-        "jul": 7,
-        "august": 8,
-        "aug": 8,
-        "september": 9,
-        "sep": 9,
-        "sept": 9,
-        "october": 10,
-        "oct": 10,
-        "november": 11,
-        "nov": 11,
-        "december": 12,
-        "dec": 12,
-    }
-    return months.get(month_name.lower())
+async def generate_sql_with_llm(question: str, schema_context: str) -> str:
+    """Generate SQL using Ollama, at most LLM_MAX_CONCURRENCY generations at a time.
+
+    Raises ValueError if no slot frees up within LLM_QUEUE_TIMEOUT_SECONDS.
+    """
+    try:
+        await asyncio.wait_for(
+            llm_semaphore.acquire(), timeout=LLM_QUEUE_TIMEOUT_SECONDS
+        )
+    except asyncio.TimeoutError:
+        raise ValueError(
+            f"All {LLM_MAX_CONCURRENCY} LLM slots busy for {LLM_QUEUE_TIMEOUT_SECONDS}s"
+        )
+    try:
+        return await generate_sql_with_ollama(question, schema_context)
+    finally:
+        llm_semaphore.release()
 
 
 def generate_sql_simple(question: str, schema_context: str) -> str:
-    """Enhanced rule-based SQL generation as fallback with date parsing."""
-    question_lower = question.lower()
-
-    # Extract date filter if present
-    date_filter = parse_date_from_question(question)
-    where_clause = f"WHERE {date_filter}" if date_filter else ""
-
-    # Extract sport type if present (use activity_name column)
-    sport_filter = ""
-    if "run" in question_lower or "running" in question_lower:
-        sport_filter = "activity_name = 'Run'"
-    elif (
-        "ride" in question_lower
-        or "cycling" in question_lower
-        or "bike" in question_lower
-    ):
-        sport_filter = "activity_name = 'Ride'"
-    elif "swim" in question_lower or "swimming" in question_lower:
-        sport_filter = "activity_name = 'Swim'"
-    elif "hike" in question_lower or "hiking" in question_lower:
-        sport_filter = "activity_name = 'Hike'"
-    elif "walk" in question_lower or "walking" in question_lower:
-        sport_filter = "activity_name = 'Walk'"
-    elif "yoga" in question_lower:
-        sport_filter = "activity_name = 'Yoga'"
-    elif (
-        "weight" in question_lower
-        or "weight training" in question_lower
-        or "strength" in question_lower
-    ):
-        sport_filter = "activity_name = 'WeightTraining'"
-    elif "sport" in question_lower or "exercise" in question_lower:
-        # Filter for sport/exercise activities
-        sport_filter = "is_sport_exercise = true"
-
-    # Build WHERE clause
-    conditions = []
-    if date_filter:
-        conditions.append(f"({date_filter})")
-    if sport_filter:
-        conditions.append(sport_filter)
-
-    where_clause = f"WHERE {' AND '.join(conditions)}" if conditions else ""
-
-    # Determine query type
-    if "how many" in question_lower or "count" in question_lower:
-        if "per day" in question_lower or "each day" in question_lower:
-            if date_filter:
-                return f"SELECT date_day, COUNT(*) as activity_count FROM {TABLE_NAME} {where_clause} GROUP BY date_day ORDER BY date_day"
-            else:
-                return f"SELECT date_day, COUNT(*) as activity_count FROM {TABLE_NAME} GROUP BY date_day ORDER BY date_day"
-        else:
-            return f"SELECT COUNT(*) as count FROM {TABLE_NAME} {where_clause}"
-
-    elif (
-        "list" in question_lower
-        or "show" in question_lower
-        or "what" in question_lower
-        or "which" in question_lower
-    ):
+    """Rule-based SQL generation as fallback: readiness questions, else the intent compiler."""
+    intent = compile_intent(question)
+    if any(keyword in question.lower() for keyword in READINESS_KEYWORDS):
+        where_clause = (
+            f"WHERE {' AND '.join(intent['conditions'])}"
+            if intent["conditions"]
+            else ""
+        )
         return (
-            f"SELECT * FROM {TABLE_NAME} {where_clause} ORDER BY date_day DESC LIMIT 50"
+            f"SELECT date_day, activity_source, activity_name, asleep_duration_hours, "
+            f"sleep_performance, recovery_score, hrv_rmssd_milli "
+            f"FROM {READINESS_TABLE_NAME} {where_clause} ORDER BY activity_start_time DESC LIMIT 50"
         )
+    return intent["sql"]
 
-    # Default fallback
-    return f"SELECT * FROM {TABLE_NAME} {where_clause} ORDER BY date_day DESC LIMIT 10"
 
+def _guarded_query(sql: str) -> pd.DataFrame:
+    """Result of a validated query: at most QUERY_MAX_ROWS + 1 rows, cost-checked and time-limited."""
+    return cached_query(
+        limit_rows(sql, QUERY_MAX_ROWS + 1),
+        timeout_seconds=QUERY_TIMEOUT_SECONDS,
+        precheck=lambda con, _: check_cost(con, sql, QUERY_MAX_ESTIMATED_ROWS),
+    )
 
-@app.get("/query")
-def query_activities_get(question: str = "How many activities did I do?"):
-    """GET endpoint for testing - accepts question as query parameter.
 
-    Example: http://127.0.0.1:8000/query?question=How%20many%20activities%20did%20I%20do
-    """
-    try:
-        # Use the same logic as POST endpoint
-        schema_context = load_schema_context()
+def execute_sql(sql: str):
+    """Execute a query, on a rollup table if it can answer the query exactly.
 
-        # Generate SQL - try LLM first, fallback to simple if no LLM available
+    Falls back to the original SQL if the rollup query fails (e.g. rollups not built yet).
+    Only a single SELECT is executed (QueryRejected otherwise). The result has at most
+    QUERY_MAX_ROWS + 1 rows, so the caller can tell that it was truncated.
+    Results are cached until the next analytics build is published.
+    Returns the result DataFrame and the SQL that was executed.
+    """
+    sql = validate_sql(sql)
+    rollup_sql = route_to_rollup(sql)
+    if rollup_sql:
         try:
-            sql = generate_sql_with_llm(question, schema_context)
-        except (ValueError, Exception) as e:
-            # Fallback to simple generation if LLM fails or not available
-            sql = generate_sql_simple(question, schema_context)
+            return _guarded_query(rollup_sql), rollup_sql
+        except duckdb.InterruptException:
+            raise
+        except duckdb.Error:
+            pass
+    return _guarded_query(sql), sql
 
-        # Execute SQL
-        con = duckdb.connect(DUCKDB_PATH, read_only=True)
-        try:
-            df = con.execute(sql).fetchdf()
-            result = df.to_dict(orient="records")
-        except Exception as e:
-            con.close()
-            return QueryResponse(
-                sql=sql, result=[], error=f"SQL execution error: {str(e)}"
-            )
-        finally:
-            con.close()
 
-        return QueryResponse(sql=sql, result=result, error=None)
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+def open_result(sql: str):
+    """Execute a query for streaming, on a rollup table if it can answer the query exactly.
 
+    Returns the cursor, the SQL that was executed and an ExitStack that releases
+    the connection; it has to be closed once the result is sent. The same guardrails
+    as for execute_sql apply, with STREAM_MAX_ROWS and STREAM_TIMEOUT_SECONDS
+    (the timeout covers sending the result).
+    """
+    sql = validate_sql(sql)
+    stack = ExitStack()
+    con = stack.enter_context(analytics_connection())
+    try:
+        stack.enter_context(interrupt_after(con, STREAM_TIMEOUT_SECONDS))
+        rollup_sql = route_to_rollup(sql)
+        candidates = [rollup_sql, sql] if rollup_sql else [sql]
+        for candidate in candidates:
+            try:
+                check_cost(con, candidate, QUERY_MAX_ESTIMATED_ROWS)
+                cursor = con.execute(limit_rows(candidate, STREAM_MAX_ROWS))
+                return cursor, candidate, stack
+            except duckdb.InterruptException:
+                raise
+            except duckdb.Error:
+                if candidate is sql:
+                    raise
+    except Exception:
+        stack.close()
+        raise
+
+
+def _closing(chunks, stack: ExitStack):
+    """Yield the chunks of a streamed result, then release its connection."""
+    with stack:
+        yield from chunks
+
+
+def stream_result(
+    cursor, executed_sql: str, stack: ExitStack, result_format: str, cached: bool
+):
+    """StreamingResponse of an executed query; the SQL is sent in the X-Query-SQL header."""
+    if result_format == "ndjson":
+        chunks = ndjson_rows(cursor, STREAM_BATCH_ROWS)
+    elif result_format == "arrow":
+        chunks = arrow_stream(cursor, STREAM_BATCH_ROWS)
+    else:
+        header = {"sql": executed_sql, "error": None, "cached": cached}
+        chunks = columnar_json(cursor, STREAM_BATCH_ROWS, header)
+    return StreamingResponse(
+        _closing(chunks, stack),
+        media_type=MEDIA_TYPES[result_format],
+        headers={
+            "X-Query-SQL": quote(executed_sql),
+            "X-Query-Cached": str(cached).lower(),
+        },
+    )
 
-@app.post("/query", response_model=QueryResponse)
-def query_activities(request: QueryRequest):
-    """Convert natural language question to SQL and execute it."""
+
+def get_result_format(accept: Optional[str], requested: Optional[str]) -> str:
+    """Negotiated result format, HTTPException if it is unknown or unavailable."""
     try:
-        # Load schema context
-        schema_context = load_schema_context()
+        result_format = negotiate_format(accept, requested)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if result_format == "arrow" and importlib.util.find_spec("pyarrow") is None:
+        raise HTTPException(
+            status_code=406,
+            detail="Arrow results need pyarrow. Install with: pip install pyarrow",
+        )
+    return result_format
+
 
+async def answer_question(question: str, result_format: str = "records"):
+    """Generate SQL for a question (intent compiler, cached LLM output, LLM, or rule-based fallback) and execute it.
+
+    Waiting on Ollama does not occupy a worker thread; DuckDB runs in the thread pool.
+    The records format is answered from the result cache as a QueryResponse, all
+    other formats are streamed from DuckDB in batches of STREAM_BATCH_ROWS rows.
+    """
+    schema = get_schema_context()
+    model = ollama_model()
+
+    # Everyday questions are compiled by rule, the LLM only sees the long tail
+    intent = compile_intent(question)
+    if intent["confidence"] >= INTENT_MIN_CONFIDENCE:
+        sql, cached = intent["sql"], False
+    else:
+        intent["intent"] = None
+        # Repeated questions skip the LLM
+        sql = sql_cache.get(question, model, schema["version"])
+        cached = sql is not None
+    llm_sql = None
+    if sql is None and _health["ollama"]["available"] is False:
+        # Ollama was not reachable at the last probe, don't wait for a connection error
+        sql = generate_sql_simple(question, schema["context"])
+    elif sql is None:
         # Generate SQL - try LLM first, fallback to simple if no LLM available
         try:
-            sql = generate_sql_with_llm(request.question, schema_context)
-        except (ValueError, Exception) as e:
-            # Fallback to simple generation if LLM fails or not available
-            sql = generate_sql_simple(request.question, schema_context)
+            sql = llm_sql = await generate_sql_with_llm(question, schema["context"])
+        except ValueError:
+            # Ollama unreachable, timed out, answered with an error or all slots busy
+            sql = generate_sql_simple(question, schema["context"])
 
-        # Execute SQL
-        con = duckdb.connect(DUCKDB_PATH, read_only=True)
-        try:
-            df = con.execute(sql).fetchdf()
-            result = df.to_dict(orient="records")
-        except Exception as e:
-            con.close()
-            return QueryResponse(
-                sql=sql, result=[], error=f"SQL execution error: {str(e)}"
+    # Execute SQL (time-bucketed counts are answered from the rollup tables)
+    try:
+        if result_format == "records":
+            df, executed_sql = await run_in_threadpool(execute_sql, sql)
+            truncated = len(df) > QUERY_MAX_ROWS
+            result = df.head(QUERY_MAX_ROWS).to_dict(orient="records")
+        else:
+            cursor, executed_sql, stack = await run_in_threadpool(open_result, sql)
+    except Exception as e:
+        if cached:
+            sql_cache.invalidate(question, model, schema["version"])
+        if isinstance(e, QueryRejected):
+            error = f"Query rejected: {str(e)}"
+        elif isinstance(e, duckdb.InterruptException):
+            timeout = (
+                QUERY_TIMEOUT_SECONDS
+                if result_format == "records"
+                else STREAM_TIMEOUT_SECONDS
             )
-        finally:
-            con.close()
+            error = f"Query timed out after {timeout:g} seconds"
+        else:
+            error = f"SQL execution error: {str(e)}"
+        return QueryResponse(
+            sql=sql, result=[], error=error, cached=cached, intent=intent["intent"]
+        )
+
+    # Only LLM output that executed is cached; the rule-based fallback is instant anyway
+    if llm_sql is not None:
+        await run_in_threadpool(
+            sql_cache.put, question, model, schema["version"], llm_sql
+        )
 
-        return QueryResponse(sql=sql, result=result, error=None)
+    if result_format != "records":
+        return stream_result(cursor, executed_sql, stack, result_format, cached)
+    return QueryResponse(
+        sql=executed_sql,
+        result=result,
+        error=None,
+        cached=cached,
+        truncated=truncated,
+        intent=intent["intent"],
+    )
 
+
+@app.get("/query")
+async def query_activities_get(
+    question: str = "How many activities did I do?",
+    format: Optional[str] = None,
+    accept: Optional[str] = Header(None),
+):
+    """GET endpoint for testing - accepts question as query parameter.
+
+    Example: http://127.0.0.1:8000/query?question=How%20many%20activities%20did%20I%20do
+    Streamed formats: ?format=columns|ndjson|arrow, or Accept: application/x-ndjson
+    or application/vnd.apache.arrow.stream
+    """
+    result_format = get_result_format(accept, format)
+    try:
+        return await answer_question(question, result_format)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.post("/query", response_model=QueryResponse)
+async def query_activities(request: QueryRequest, accept: Optional[str] = Header(None)):
+    """Convert natural language question to SQL and execute it.
+
+    The result format is negotiated like for GET, with `format` in the request body.
+    """
+    result_format = get_result_format(accept, request.format)
+    try:
+        return await answer_question(request.question, result_format)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -423,8 +628,12 @@ def query_activities(request: QueryRequest):
 def get_schema():
     """Get the schema information for the table."""
     try:
-        schema_context = load_schema_context()
-        return {"schema": schema_context}
+        schema = get_schema_context()
+        return {
+            "schema": schema["context"],
+            "schema_version": schema["version"],
+            "schema_built_at": schema["built_at"],
+        }
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -433,11 +642,12 @@ def get_schema():
 def get_data_info():
     """Data endpoint - returns information about available data."""
     try:
-        con = duckdb.connect(DUCKDB_PATH)
-        # Get row count from the main table
-        result = con.execute(f"SELECT COUNT(*) as count FROM {TABLE_NAME}").fetchone()
+        with analytics_connection() as con:
+            # Get row count from the main table
+            result = con.execute(
+                f"SELECT COUNT(*) as count FROM {TABLE_NAME}"
+            ).fetchone()
         count = result[0] if result else 0
-        con.close()
 
         return {
             "message": "Data endpoint",
@@ -453,28 +663,90 @@ def get_data_info():
         }
 
 
-@app.get("/health")
-def health_check():
-    """Health check endpoint."""
-    llm_status = "Simple rule-based (fallback)"
+async def probe_ollama() -> dict:
+    """Reachability and installed models of Ollama (GET /api/tags)."""
+    ollama_url = os.getenv("OLLAMA_URL", "http://localhost:11434")
+    try:
+        response = await get_http_client().get(
+            f"{ollama_url}/api/tags", timeout=HEALTH_PROBE_TIMEOUT_SECONDS
+        )
+        response.raise_for_status()
+        models = [model.get("name") for model in response.json().get("models", [])]
+        return {"available": True, "models": models, "error": None}
+    except ImportError:
+        return {
+            "available": False,
+            "models": [],
+            "error": "httpx library not installed. Install with: pip install httpx",
+        }
+    except Exception as e:
+        return {"available": False, "models": [], "error": str(e) or type(e).__name__}
 
-    # Check if Ollama is available
+
+def probe_database() -> dict:
+    """Whether the current analytics database answers a query, and its version."""
     try:
-        import requests
+        with analytics_connection() as con:
+            con.execute("SELECT 1").fetchall()
+        return {
+            "available": True,
+            "path": str(current_database_path()),
+            "version": database_version(),
+            "error": None,
+        }
+    except Exception as e:
+        return {
+            "available": False,
+            "path": str(current_database_path()),
+            "version": None,
+            "error": str(e),
+        }
+
+
+async def refresh_health():
+    """Probe Ollama and the database once and store the result for /health and routing."""
+    ollama, database = await asyncio.gather(
+        probe_ollama(), run_in_threadpool(probe_database)
+    )
+    _health.update(
+        checked_at=datetime.now().isoformat(), ollama=ollama, database=database
+    )
 
-        ollama_url = os.getenv("OLLAMA_URL", "http://localhost:11434")
-        # Quick check if Ollama is accessible
+
+async def health_probe_loop():
+    """Refresh the health status every HEALTH_PROBE_INTERVAL_SECONDS until shutdown."""
+    while True:
         try:
-            requests.get(f"{ollama_url}/api/tags", timeout=2)
-            llm_status = "Ollama (available)"
-        except:
-            llm_status = "Ollama (will try, may not be running)"
-    except ImportError:
-        llm_status = "Ollama (requests library not installed)"
+            await refresh_health()
+        except Exception as e:
+            print(f"⚠️  Health probe failed: {e}")
+        await asyncio.sleep(HEALTH_PROBE_INTERVAL_SECONDS)
+
+
+@app.get("/health")
+async def health_check():
+    """Health check endpoint.
+
+    Returns the status of the last background probe without contacting Ollama or
+    the database, so it answers instantly.
+    """
+    ollama = _health["ollama"]
+    if ollama["available"] is None:
+        llm_status = "Ollama (not checked yet)"
+    elif ollama["available"]:
+        llm_status = "Ollama (available)"
+    else:
+        llm_status = "Simple rule-based (Ollama not reachable)"
 
     return {
         "status": "ok",
         "table": TABLE_NAME,
-        "database": DUCKDB_PATH,
+        "database": str(current_database_path()),
+        "database_build_id": current_build_id(),
         "llm_provider": llm_status,
+        "checked_at": _health["checked_at"],
+        "ollama": {**ollama, "model": ollama_model()},
+        "database_status": _health["database"],
+        "sql_cache": sql_cache.stats(),
+        "result_cache": result_cache.stats(),
     }
@@ -0,0 +1,263 @@
+# =====================================================================
+# Compiles everyday questions about fct_activities to SQL without the LLM
+# =====================================================================
+
+import re
+from typing import Optional
+
+SOURCE_TABLE = "semantic.fct_activities"
+
+MONTHS = {
+    "january": 1,
+    "jan": 1,
+    "february": 2,
+    "feb": 2,
+    "march": 3,
+    "mar": 3,
+    "april": 4,
+    "apr": 4,
+    "may": 5,
+    "june": 6,
+    "jun": 6,
+    "july": 7,
+    "jul": 7,
+    "august": 8,
+    "aug": 8,
+    "september": 9,
+    "sep": 9,
+    "sept": 9,
+    "october": 10,
+    "oct": 10,
+    "november": 11,
+    "nov": 11,
+    "december": 12,
+    "dec": 12,
+}
+
+# Words for the standardized sport types (aligned_activity_name of seeds/activity_mapping.csv)
+SPORT_WORDS = {
+    "Run": ("run", "runs", "running", "ran", "jog", "jogs", "jogging"),
+    "Cycling": ("ride", "rides", "riding", "cycling", "bike", "bikes", "biking"),
+    "Swim": ("swim", "swims", "swimming"),
+    "Hiking": ("hike", "hikes", "hiking"),
+    "Yoga": ("yoga",),
+    "WeightTraining": ("strength", "weightlifting", "lifting", "weights", "weight"),
+    "HIIT": ("hiit",),
+    "Nordic Ski": ("ski", "skiing"),
+    "Padel": ("padel",),
+    "Badminton": ("badminton",),
+}
+SPORT_BY_WORD = {word: sport for sport, words in SPORT_WORDS.items() for word in words}
+
+# Words that filter on is_sport_exercise instead of one sport type
+SPORT_CLASS_WORDS = {"sport", "sports", "exercise", "exercises", "workout", "workouts"}
+
+# Words that carry no meaning for the query once the intent is known
+FILLER_WORDS = set(
+    """
+    i me my did do does done have had has the a an of all activities activity
+    were was there is are be go went times time can you please total overall
+    to for with that so far ever from sessions session training trainings
+    recorded tracked log logged many much in
+    """.split()
+)
+
+COUNT_PATTERN = r"\bhow\s+many\b|\bhow\s+often\b|\bnumber\s+of\b|\bcount\b"
+LIST_PATTERN = r"\b(?:list|show|display|give|which|what)\b"
+TYPES_PATTERN = (
+    r"\b(?:sport|activity)\s+types?\b|\btypes\s+of\s+(?:sports?|activities)\b"
+)
+FIRST_OF_DAY_PATTERN = (
+    r"\bfirst\s+activit(?:y|ies)\s+(?:of|on)\s+(?:the|each|every)\s+day\b"
+)
+LATEST_PATTERN = r"\b(?:latest|most\s+recent|last)\s+(?=(?:\w+\s+)?(?:activity|run|ride|swim|hike|workout|session)\b)"
+GROUP_PATTERNS = {
+    "day": r"\b(?:per|each|every|by|a)\s+day\b|\bdaily\b",
+    "week": r"\b(?:per|each|every|by|a)\s+week\b|\bweekly\b",
+    "month": r"\b(?:per|each|every|by|a)\s+month\b|\bmonthly\b",
+    "year": r"\b(?:per|each|every|by|a)\s+year\b|\byearly\b|\bannually\b",
+    "sport": r"\b(?:per|each|every|by)\s+(?:sport|sport\s+type|type|activity\s+type)\b",
+}
+# Bucket expression and alias per grouping (the date truncations are routed to the rollups)
+GROUP_COLUMNS = {
+    "day": ("date_day", "date_day"),
+    "week": ("DATE_TRUNC('week', date_day)", "week_start"),
+    "month": ("DATE_TRUNC('month', date_day)", "month_start"),
+    "year": ("EXTRACT(YEAR FROM date_day)", "year"),
+    "sport": ("activity_name", "activity_name"),
+}
+
+# Each word the compiler cannot place multiplies the confidence by this factor
+UNKNOWN_WORD_FACTOR = 0.75
+# Confidence of a question without a recognized intent (answered with recent activities)
+NO_INTENT_CONFIDENCE = 0.5
+
+
+def _month_name_to_number(month_name: str) -> Optional[int]:
+    """Convert month name to number (1-12)."""
+    return MONTHS.get(month_name.lower())
+
+
+def _parse_date(question_lower: str) -> tuple[Optional[str], Optional[re.Match]]:
+    """Date condition of a lowercase question and the match it was parsed from."""
+    # Pattern: "in March 2025"
+    for match in re.finditer(r"\bin\s+(\w+)\s+(\d{4})\b", question_lower):
+        month_num = _month_name_to_number(match.group(1))
+        if month_num:
+            year = int(match.group(2))
+            start_date = f"{year}-{month_num:02d}-01"
+            # Calculate end date (first day of next month)
+            if month_num == 12:
+                end_date = f"{year + 1}-01-01"
+            else:
+                end_date = f"{year}-{month_num + 1:02d}-01"
+            return f"date_day >= '{start_date}' AND date_day < '{end_date}'", match
+
+    # Pattern: "in March" (without year, search across all years for that month)
+    for match in re.finditer(r"\bin\s+(\w+)\b", question_lower):
+        month_num = _month_name_to_number(match.group(1))
+        if month_num:
+            return f"EXTRACT(MONTH FROM date_day) = {month_num}", match
+
+    # Pattern: "in 2025" or "during 2025"
+    match = re.search(r"\b(?:in|during)\s+(\d{4})\b", question_lower)
+    if match:
+        year = int(match.group(1))
+        return f"date_day >= '{year}-01-01' AND date_day < '{year + 1}-01-01'", match
+
+    # Pattern: "last 30 days" or "past 30 days"
+    match = re.search(
+        r"\b(?:in\s+the\s+)?(?:last|past)\s+(\d+)\s+days?\b", question_lower
+    )
+    if match:
+        days = int(match.group(1))
+        return f"date_day >= CURRENT_DATE - INTERVAL '{days} days'", match
+
+    # Pattern: "last week" / "last month" / "last year" (the previous calendar period)
+    match = re.search(r"\b(?:last|previous)\s+(week|month|year)\b", question_lower)
+    if match:
+        unit = match.group(1)
+        return (
+            f"date_day >= DATE_TRUNC('{unit}', CURRENT_DATE) - INTERVAL '1 {unit}' "
+            f"AND date_day < DATE_TRUNC('{unit}', CURRENT_DATE)"
+        ), match
+
+    # Pattern: "this week" / "this month" / "this year"
+    match = re.search(r"\bthis\s+(week|month|year)\b", question_lower)
+    if match:
+        unit = match.group(1)
+        return (
+            f"date_day >= DATE_TRUNC('{unit}', CURRENT_DATE) "
+            f"AND date_day < DATE_TRUNC('{unit}', CURRENT_DATE) + INTERVAL '1 {unit}'"
+        ), match
+
+    return None, None
+
+
+def parse_date_from_question(question: str) -> Optional[str]:
+    """Extract date information from question and return SQL WHERE clause for dates."""
+    return _parse_date(question.lower())[0]
+
+
+def compile_intent(question: str) -> dict:
+    """
+    Compile a question about activities to SQL on fct_activities.
+
+    Recognizes counts, listings, sport types, the first activity of the day and
+    the latest activity, grouped per day/week/month/year/sport and filtered by
+    sport and date. Every phrase that is understood is removed from the question;
+    each remaining word that is not a filler word lowers the confidence.
+
+    Returns:
+        Dict with the SQL, the confidence (0-1), the intent, the WHERE conditions
+        and the words that were not understood
+    """
+    text = " " + re.sub(r"[^\w\s-]", " ", question.lower()) + " "
+    spans = []
+
+    def take(pattern: str) -> Optional[re.Match]:
+        """Find a phrase and blank it out, so its words are not counted as unknown."""
+        nonlocal text
+        match = re.search(pattern, text)
+        if match:
+            text = (
+                text[: match.start()] + " " * len(match.group(0)) + text[match.end() :]
+            )
+            spans.append(match.group(0))
+        return match
+
+    conditions = []
+    date_filter, date_match = _parse_date(text)
+    if date_filter:
+        conditions.append(f"({date_filter})")
+        take(re.escape(date_match.group(0)))
+
+    is_count = take(COUNT_PATTERN) is not None
+    is_types = take(TYPES_PATTERN) is not None
+    is_first_of_day = take(FIRST_OF_DAY_PATTERN) is not None
+    is_latest = take(LATEST_PATTERN) is not None
+    group = next(
+        (name for name, pattern in GROUP_PATTERNS.items() if take(pattern)), None
+    )
+    is_list = take(LIST_PATTERN) is not None
+
+    # Sports and the remaining words
+    sports, sport_class, unknown = [], False, []
+    for word in text.split():
+        if word in SPORT_BY_WORD:
+            if SPORT_BY_WORD[word] not in sports:
+                sports.append(SPORT_BY_WORD[word])
+        elif word in SPORT_CLASS_WORDS:
+            sport_class = True
+        elif word not in FILLER_WORDS and word not in ("and", "or"):
+            unknown.append(word)
+
+    if len(sports) == 1:
+        conditions.append(f"activity_name = '{sports[0]}'")
+    elif sports:
+        conditions.append(
+            "activity_name IN (" + ", ".join(f"'{sport}'" for sport in sports) + ")"
+        )
+    elif sport_class:
+        conditions.append("is_sport_exercise = true")
+    if is_first_of_day:
+        conditions.append("strava_activity_id_of_day = 1")
+    where_clause = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+
+    if is_types or (group == "sport" and not is_count):
+        group = "sport"
+    if group:
+        intent = f"count_per_{group}"
+        expression, alias = GROUP_COLUMNS[group]
+        select = expression if expression == alias else f"{expression} AS {alias}"
+        order = "activity_count DESC" if group == "sport" else alias
+        sql = (
+            f"SELECT {select}, COUNT(*) AS activity_count FROM {SOURCE_TABLE}{where_clause} "
+            f"GROUP BY {alias} ORDER BY {order}"
+        )
+    elif is_count:
+        intent = "count"
+        sql = f"SELECT COUNT(*) AS count FROM {SOURCE_TABLE}{where_clause}"
+    elif is_latest:
+        intent = "latest"
+        sql = (
+            f"SELECT * FROM {SOURCE_TABLE}{where_clause} "
+            f"ORDER BY date_day DESC, strava_activity_id_of_day DESC LIMIT 1"
+        )
+    elif is_list or is_first_of_day or conditions:
+        intent = "list"
+        sql = f"SELECT * FROM {SOURCE_TABLE}{where_clause} ORDER BY date_day DESC LIMIT 50"
+    else:
+        intent = None
+        sql = f"SELECT * FROM {SOURCE_TABLE}{where_clause} ORDER BY date_day DESC LIMIT 10"
+
+    confidence = (1.0 if intent else NO_INTENT_CONFIDENCE) * UNKNOWN_WORD_FACTOR ** len(
+        unknown
+    )
+    return {
+        "sql": sql,
+        "confidence": round(confidence, 3),
+        "intent": intent,
+        "conditions": conditions,
+        "unknown_words": unknown,
+    }
@@ -0,0 +1,74 @@
+# =====================================================================
+# Guardrails for generated SQL: read-only check, row cap and cost check
+# =====================================================================
+
+import json
+
+import duckdb
+
+
+class QueryRejected(ValueError):
+    """A generated query that is not executed."""
+
+
+def validate_sql(sql: str) -> str:
+    """
+    Check that `sql` is exactly one read-only SELECT statement.
+
+    Returns:
+        The statement without a trailing semicolon, so it can be wrapped in a subquery
+
+    Raises:
+        QueryRejected: For several statements or anything other than SELECT
+        duckdb.ParserException: If the SQL does not parse
+    """
+    statements = duckdb.extract_statements(sql)
+    if len(statements) != 1:
+        raise QueryRejected(f"Expected exactly one statement, got {len(statements)}")
+    statement = statements[0]
+    if statement.type != duckdb.StatementType.SELECT:
+        raise QueryRejected(
+            f"Only SELECT statements are allowed, got {statement.type.name}"
+        )
+    return statement.query.strip().rstrip(";").strip()
+
+
+def limit_rows(sql: str, max_rows: int) -> str:
+    """Wrap a SELECT so it returns at most `max_rows` rows (DuckDB stops reading there)."""
+    return f"SELECT * FROM (\n{sql}\n) AS limited_result LIMIT {max_rows}"
+
+
+def _plan_rows(node: dict) -> tuple[int, int]:
+    """(estimated output rows, largest estimate in the subtree) of an EXPLAIN JSON node."""
+    children = [_plan_rows(child) for child in node.get("children", [])]
+    estimate = node.get("extra_info", {}).get("Estimated Cardinality")
+    if estimate is not None:
+        rows = int(estimate)
+    elif node.get("name") == "CROSS_PRODUCT":
+        # DuckDB does not estimate cross products, every pair of input rows is produced
+        rows = 1
+        for child_rows, _ in children:
+            rows *= child_rows
+    else:
+        rows = max((child_rows for child_rows, _ in children), default=0)
+    largest = max([rows, *(child_largest for _, child_largest in children)])
+    return rows, largest
+
+
+def estimated_rows(con, sql: str) -> int:
+    """Largest number of rows any operator of the plan is estimated to produce."""
+    plan = con.execute(f"EXPLAIN (FORMAT json) {sql}").fetchall()
+    return max(
+        (_plan_rows(node)[1] for _, nodes in plan for node in json.loads(nodes)),
+        default=0,
+    )
+
+
+def check_cost(con, sql: str, max_estimated_rows: int):
+    """Refuse a query whose plan is estimated to produce more than `max_estimated_rows` rows in one step."""
+    rows = estimated_rows(con, sql)
+    if rows > max_estimated_rows:
+        raise QueryRejected(
+            f"Query plan is estimated at {rows:,} rows in one step "
+            f"(limit {max_estimated_rows:,}), add filters or aggregate"
+        )
@@ -0,0 +1,91 @@
+# =====================================================================
+# Streams query results from a DuckDB cursor in batches
+# =====================================================================
+
+import io
+import json
+from datetime import date, datetime, time
+from decimal import Decimal
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+ARROW_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+JSON_MEDIA_TYPE = "application/json"
+
+# Result formats of /query: records is the default QueryResponse, the others are streamed
+FORMATS = ("records", "columns", "ndjson", "arrow")
+MEDIA_TYPES = {
+    "columns": JSON_MEDIA_TYPE,
+    "ndjson": NDJSON_MEDIA_TYPE,
+    "arrow": ARROW_MEDIA_TYPE,
+}
+
+
+def negotiate_format(accept: str | None, requested: str | None) -> str:
+    """
+    Result format from the `format` query parameter, else from the Accept header.
+
+    Raises ValueError for an unknown format.
+    """
+    if requested:
+        if requested not in FORMATS:
+            raise ValueError(
+                f"Unknown format '{requested}', use one of: {', '.join(FORMATS)}"
+            )
+        return requested
+    accept = (accept or "").lower()
+    if NDJSON_MEDIA_TYPE in accept:
+        return "ndjson"
+    if ARROW_MEDIA_TYPE in accept:
+        return "arrow"
+    return "records"
+
+
+def _json_default(value):
+    """JSON encoding of the DuckDB types json.dumps does not know."""
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    return str(value)
+
+
+def _dumps(value) -> str:
+    return json.dumps(value, default=_json_default)
+
+
+def ndjson_rows(cursor, batch_rows: int):
+    """One JSON object per row and line, `batch_rows` rows per chunk."""
+    columns = [column[0] for column in cursor.description]
+    while rows := cursor.fetchmany(batch_rows):
+        yield "".join(_dumps(dict(zip(columns, row))) + "\n" for row in rows)
+
+
+def columnar_json(cursor, batch_rows: int, header: dict):
+    """
+    {**header, "columns": [...], "data": [[...], ...]}, written row batch by row batch.
+
+    Column names are sent once instead of with every row.
+    """
+    columns = [column[0] for column in cursor.description]
+    yield _dumps({**header, "columns": columns})[:-1] + ', "data": ['
+    separator = ""
+    while rows := cursor.fetchmany(batch_rows):
+        yield separator + ",".join(_dumps(list(row)) for row in rows)
+        separator = ","
+    yield "]}"
+
+
+def arrow_stream(cursor, batch_rows: int):
+    """Arrow IPC stream, one record batch per chunk (requires pyarrow)."""
+    import pyarrow as pa
+
+    reader = cursor.fetch_record_batch(batch_rows)
+    sink = io.BytesIO()
+    with pa.ipc.new_stream(sink, reader.schema) as writer:
+        for batch in reader:
+            writer.write_batch(batch)
+            yield sink.getvalue()
+            sink.seek(0)
+            sink.truncate()
+    # End-of-stream marker written on close
+    yield sink.getvalue()
@@ -0,0 +1,379 @@
+# =====================================================================
+# Routes time-bucketed count queries on fct_activities to the rollups
+# =====================================================================
+
+import copy
+import json
+import threading
+from datetime import date
+from functools import lru_cache
+from typing import Optional
+
+import duckdb
+
+SOURCE_SCHEMA, SOURCE_NAME = "semantic", "fct_activities"
+
+# Coarsest first: a query is routed to the first rollup that can answer it exactly
+ROLLUP_TABLES = {
+    "month": ("semantic.rollup_activities_monthly", "month_start"),
+    "week": ("semantic.rollup_activities_weekly", "week_start"),
+    "day": ("semantic.rollup_activities_daily", "date_day"),
+}
+
+# Columns of fct_activities that exist unchanged in every rollup
+ROLLUP_COLUMNS = {"activity_name", "is_sport_exercise"}
+
+# All columns of fct_activities: in GROUP BY, WHERE and HAVING a name binds to one of
+# these before a select alias of the same name (as DuckDB does)
+SOURCE_COLUMNS = {
+    "strava_activity_id",
+    "strava_activity_id_of_day",
+    "date_day",
+    "name",
+    "activity_name",
+    "is_sport_exercise",
+    "transformed_at",
+}
+
+# Column references that are really functions without parentheses
+CONSTANT_COLUMNS = {"current_date", "current_timestamp", "now"}
+
+# Scalar functions that give the same result on the rollup columns as on the facts
+SCALAR_FUNCTIONS = {
+    "lower",
+    "upper",
+    "coalesce",
+    "strftime",
+    "date_trunc",
+    "date_part",
+    "year",
+    "quarter",
+    "month",
+    "week",
+    "current_date",
+    "today",
+    "min",
+    "max",
+}
+
+# Date functions that take the unit as their first argument, and the ones named after it
+UNIT_FUNCTIONS = {"date_trunc", "date_part"}
+UNIT_NAMED_FUNCTIONS = {"year", "quarter", "month", "week"}
+
+# Comparisons of date_day with a literal that a coarser rollup answers with its bucket column
+# if the literal is the first day of a bucket
+BOUND_COMPARISONS = {"COMPARE_GREATERTHANOREQUALTO", "COMPARE_LESSTHAN"}
+
+# One in-memory DuckDB per thread parses and prints the queries
+_parsers = threading.local()
+
+
+class _NotRoutable(Exception):
+    """The query cannot be answered exactly by a rollup."""
+
+
+def _parser():
+    con = getattr(_parsers, "con", None)
+    if con is None:
+        con = _parsers.con = duckdb.connect()
+    return con
+
+
+def _parse(sql: str) -> Optional[dict]:
+    """Parse tree of a single SELECT statement, None if it is anything else."""
+    try:
+        (serialized,) = (
+            _parser().execute("SELECT json_serialize_sql(?)", [sql]).fetchone()
+        )
+    except duckdb.Error:
+        return None
+    parsed = json.loads(serialized)
+    if parsed.get("error") or len(parsed["statements"]) != 1:
+        return None
+    return parsed["statements"][0]["node"]
+
+
+def _print(node: dict) -> str:
+    """SQL of a parse tree."""
+    serialized = json.dumps(
+        {"error": False, "statements": [{"node": node, "named_param_map": []}]}
+    )
+    return (
+        _parser().execute("SELECT json_deserialize_sql(?)", [serialized]).fetchone()[0]
+    )
+
+
+@lru_cache(maxsize=None)
+def _expression_json(sql: str) -> str:
+    return json.dumps(_parse(f"SELECT {sql}")["select_list"][0])
+
+
+def _expression(sql: str) -> dict:
+    """Parse tree of an expression (a fresh copy on every call)."""
+    return json.loads(_expression_json(sql))
+
+
+def _column_name(node: dict) -> Optional[str]:
+    """Lowercase name of an unqualified column reference, None for anything else."""
+    if node.get("class") != "COLUMN_REF":
+        return None
+    names = node["column_names"]
+    if len(names) != 1:
+        raise _NotRoutable(f"qualified column {'.'.join(names)}")
+    return names[0].lower()
+
+
+def _string_constant(node: dict) -> Optional[str]:
+    """Value of a string literal, also inside a cast like DATE '2025-01-01'."""
+    if node.get("class") == "CAST":
+        node = node["child"]
+    if node.get("class") == "CONSTANT" and node["value"]["type"]["id"] == "VARCHAR":
+        return node["value"]["value"]
+    return None
+
+
+def _is_count(node: dict) -> bool:
+    """COUNT(*) or COUNT(strava_activity_id), which counts every activity."""
+    if node.get("class") != "FUNCTION" or node["distinct"] or node["filter"]:
+        return False
+    name = node["function_name"].lower()
+    if name == "count_star":
+        return True
+    return (
+        name == "count"
+        and len(node["children"]) == 1
+        and _column_name(node["children"][0]) == "strava_activity_id"
+    )
+
+
+def _is_monday(literal: str) -> bool:
+    try:
+        return date.fromisoformat(literal).weekday() == 0
+    except ValueError:
+        return False
+
+
+def _grains_for_unit(unit: str) -> set:
+    """Rollup grains that can answer a truncation or extraction of date_day to `unit`."""
+    if unit in ("month", "quarter", "year"):
+        return {"month", "day"}
+    if unit == "week":
+        return {"week", "day"}
+    return {"day"}
+
+
+def _grains_for_literal(literal: str) -> set:
+    """Rollup grains that can answer date_day >= literal or date_day < literal."""
+    grains = {"day"}
+    if literal.endswith("-01"):
+        grains.add("month")
+    if _is_monday(literal):
+        grains.add("week")
+    return grains
+
+
+class _Query:
+    """Collects what a rollup needs from the parse tree of a query on fct_activities."""
+
+    def __init__(self):
+        self.grains = {"month", "week", "day"}
+        self.counts = []  # COUNT nodes, replaced by a sum of activity_count
+        # date_day references that a coarser rollup answers with its bucket column
+        self.bucket_refs = []
+
+    def visit(self, node: dict):
+        """Check an expression and record its counts and date_day usages."""
+        kind = node.get("class")
+        if kind == "CONSTANT":
+            return
+        if kind == "COLUMN_REF":
+            name = _column_name(node)
+            if name == "date_day":
+                self.grains &= {"day"}
+            elif name not in ROLLUP_COLUMNS | CONSTANT_COLUMNS:
+                raise _NotRoutable(f"column {name}")
+            return
+        if _is_count(node):
+            self.counts.append(node)
+            return
+        if kind == "FUNCTION":
+            self._visit_function(node)
+        elif kind == "COMPARISON":
+            self._visit_comparison(node)
+        elif kind in ("CONJUNCTION", "OPERATOR"):
+            for child in node["children"]:
+                self.visit(child)
+        elif kind == "CAST":
+            self.visit(node["child"])
+        elif kind == "BETWEEN":
+            for key in ("input", "lower", "upper"):
+                self.visit(node[key])
+        else:
+            # Subqueries, window functions, CASE, * ...
+            raise _NotRoutable(f"{kind} expression")
+
+    def _visit_function(self, node: dict):
+        name = node["function_name"].lower()
+        if node["distinct"] or node["filter"]:
+            raise _NotRoutable(f"{name} with DISTINCT or FILTER")
+        if not node["is_operator"] and name not in SCALAR_FUNCTIONS:
+            raise _NotRoutable(f"function {name}")
+        children = node["children"]
+        unit = None
+        if name in UNIT_FUNCTIONS and len(children) == 2:
+            unit, argument = _string_constant(children[0]), children[1]
+        elif name in UNIT_NAMED_FUNCTIONS and len(children) == 1:
+            unit, argument = name, children[0]
+        if unit and _column_name(argument) == "date_day":
+            self.grains &= _grains_for_unit(unit.lower())
+            self.bucket_refs.append(argument)
+            return
+        for child in children:
+            self.visit(child)
+
+    def _visit_comparison(self, node: dict):
+        left, right = node["left"], node["right"]
+        literal = _string_constant(right)
+        if (
+            node["type"] in BOUND_COMPARISONS
+            and _column_name(left) == "date_day"
+            and literal is not None
+        ):
+            self.grains &= _grains_for_literal(literal)
+            self.bucket_refs.append(left)
+            return
+        self.visit(left)
+        self.visit(right)
+
+
+def _resolve_aliases(node, aliases: dict, alias_first: bool):
+    """
+    Replace references to select aliases with the aliased expression.
+
+    A rollup has columns (week_start, month_start, activity_count, ...) that the facts
+    do not have, so an alias like `DATE_TRUNC('week', date_day) AS week_start` would
+    bind to the rollup column in GROUP BY instead of to the expression.
+    """
+    if isinstance(node, list):
+        return [_resolve_aliases(item, aliases, alias_first) for item in node]
+    if not isinstance(node, dict):
+        return node
+    if node.get("class") == "COLUMN_REF" and len(node["column_names"]) == 1:
+        name = node["column_names"][0].lower()
+        if name in aliases and (alias_first or name not in SOURCE_COLUMNS):
+            expression = copy.deepcopy(aliases[name])
+            expression["alias"] = ""
+            return expression
+        return node
+    if node.get("class") == "SUBQUERY":
+        return node
+    return {
+        key: _resolve_aliases(value, aliases, alias_first)
+        for key, value in node.items()
+    }
+
+
+def _check_shape(node: dict):
+    """Only a plain grouped SELECT on fct_activities, with ORDER BY and LIMIT at most."""
+    if node.get("type") != "SELECT_NODE":
+        raise _NotRoutable("not a plain SELECT")
+    table = node["from_table"]
+    if (
+        table["type"] != "BASE_TABLE"
+        or table["schema_name"].lower() != SOURCE_SCHEMA
+        or table["table_name"].lower() != SOURCE_NAME
+        or table.get("sample")
+    ):
+        raise _NotRoutable("not a query on fct_activities alone")
+    if node["cte_map"]["map"] or node["qualify"] or node["sample"]:
+        raise _NotRoutable("CTE, QUALIFY or SAMPLE")
+    if node["aggregate_handling"] != "STANDARD_HANDLING" or len(node["group_sets"]) > 1:
+        raise _NotRoutable("GROUP BY ALL, ROLLUP, CUBE or GROUPING SETS")
+    for modifier in node["modifiers"]:
+        if modifier["type"] not in ("ORDER_MODIFIER", "LIMIT_MODIFIER"):
+            raise _NotRoutable(modifier["type"])
+        for key in ("limit", "offset"):
+            if modifier.get(key) and modifier[key]["class"] != "CONSTANT":
+                raise _NotRoutable(f"{key} expression")
+
+
+def route_to_rollup(sql: str) -> Optional[str]:
+    """
+    Rewrite a count query on fct_activities to the coarsest rollup table that
+    answers it exactly, e.g. activities per month and sport.
+
+    The query is parsed by DuckDB. Only single-table queries whose measures are
+    COUNT(*) and whose filters and groupings use date_day, activity_name and
+    is_sport_exercise are routed. The grain follows the DATE_TRUNC/EXTRACT units
+    applied to date_day; date bounds that do not start a week or month, and
+    date_day used as is, restrict it to finer rollups.
+
+    Returns:
+        The rewritten SQL, or None if the query must run on fct_activities
+    """
+    node = _parse(sql)
+    if node is None:
+        return None
+    try:
+        _check_shape(node)
+        aliases = {
+            item["alias"].lower(): item for item in node["select_list"] if item["alias"]
+        }
+        for key in ("where_clause", "group_expressions", "having"):
+            node[key] = _resolve_aliases(node[key], aliases, alias_first=False)
+        for modifier in node["modifiers"]:
+            if modifier["type"] == "ORDER_MODIFIER":
+                modifier["orders"] = _resolve_aliases(
+                    modifier["orders"], aliases, alias_first=True
+                )
+
+        query = _Query()
+        expressions = [
+            *node["select_list"],
+            *node["group_expressions"],
+            *(
+                order["expression"]
+                for modifier in node["modifiers"]
+                for order in modifier.get("orders", [])
+            ),
+        ]
+        for clause in ("where_clause", "having"):
+            if node[clause]:
+                expressions.append(node[clause])
+        for expression in expressions:
+            query.visit(expression)
+    except _NotRoutable:
+        return None
+    if not query.counts or not query.grains:
+        return None
+
+    grain = next(grain for grain in ROLLUP_TABLES if grain in query.grains)
+    table, bucket_column = ROLLUP_TABLES[grain]
+
+    total = "CAST(SUM(activity_count) AS BIGINT)"
+    if not node["group_expressions"]:
+        # SUM over zero rows is NULL where COUNT(*) is 0
+        total = f"COALESCE({total}, 0)"
+    select_items = [id(item) for item in node["select_list"]]
+    for count in query.counts:
+        alias = count["alias"]
+        if id(count) in select_items and not alias:
+            # Keep DuckDB's column name for an unaliased count
+            alias = (
+                "count_star()"
+                if count["function_name"].lower() == "count_star"
+                else "count(strava_activity_id)"
+            )
+        elif id(count) not in select_items:
+            alias = ""
+        count.clear()
+        count.update(_expression(total))
+        count["alias"] = alias
+    if grain != "day":
+        for reference in query.bucket_refs:
+            reference["column_names"] = [bucket_column]
+
+    schema_name, table_name = table.split(".")
+    node["from_table"]["schema_name"] = schema_name
+    node["from_table"]["table_name"] = table_name
+    return _print(node)
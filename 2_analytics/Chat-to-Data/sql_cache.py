@@ -0,0 +1,146 @@
+# =====================================================================
+# Persistent question -> SQL cache for the LLM-generated queries
+# =====================================================================
+
+import hashlib
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+
+
+def normalize_question(question: str) -> str:
+    """Lowercase, collapse whitespace and drop trailing punctuation, so trivial variants share an entry."""
+    question = re.sub(r"\s+", " ", question.strip().lower())
+    return question.rstrip("?!. ")
+
+
+def cache_key(question: str, model: str, schema_version: str) -> str:
+    """Key of a question for one model and schema version."""
+    raw = f"{normalize_question(question)}\x00{model}\x00{schema_version}"
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+class SqlCache:
+    """
+    LRU cache of generated SQL with a TTL, persisted to a SQLite file.
+
+    The in-memory OrderedDict answers lookups; every insert is also written to
+    SQLite so the newest entries survive a restart. Entries of another model or
+    schema version never match, because both are part of the key.
+    """
+
+    def __init__(
+        self, path: Path, max_entries: int = 1000, ttl_seconds: float = 7 * 24 * 3600
+    ):
+        self.path = Path(path)
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # key -> (sql, created_at)
+        self._lock = threading.Lock()
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # Endpoints run in a thread pool, all access goes through self._lock
+        self._con = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._con.execute(
+            """CREATE TABLE IF NOT EXISTS sql_cache (
+                key TEXT PRIMARY KEY,
+                question TEXT,
+                model TEXT,
+                schema_version TEXT,
+                sql TEXT,
+                created_at REAL
+            )"""
+        )
+        self._load()
+
+    def _load(self):
+        """Drop expired rows and read the newest max_entries into memory (oldest first)."""
+        with self._lock:
+            self._con.execute(
+                "DELETE FROM sql_cache WHERE created_at < ?",
+                (time.time() - self.ttl_seconds,),
+            )
+            rows = self._con.execute(
+                "SELECT key, sql, created_at FROM sql_cache ORDER BY created_at DESC LIMIT ?",
+                (self.max_entries,),
+            ).fetchall()
+            self._con.execute(
+                "DELETE FROM sql_cache WHERE key NOT IN "
+                "(SELECT key FROM sql_cache ORDER BY created_at DESC LIMIT ?)",
+                (self.max_entries,),
+            )
+            self._con.commit()
+            for key, sql, created_at in reversed(rows):
+                self._entries[key] = (sql, created_at)
+
+    def get(self, question: str, model: str, schema_version: str) -> Optional[str]:
+        """Cached SQL of the question, None on a miss or if the entry expired."""
+        key = cache_key(question, model, schema_version)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and time.time() - entry[1] > self.ttl_seconds:
+                self._delete(key)
+                self._con.commit()
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, question: str, model: str, schema_version: str, sql: str):
+        """Store the SQL of a question and evict the least recently used entries above max_entries."""
+        key = cache_key(question, model, schema_version)
+        created_at = time.time()
+        with self._lock:
+            self._entries[key] = (sql, created_at)
+            self._entries.move_to_end(key)
+            self._con.execute(
+                "INSERT OR REPLACE INTO sql_cache VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    key,
+                    normalize_question(question),
+                    model,
+                    schema_version,
+                    sql,
+                    created_at,
+                ),
+            )
+            while len(self._entries) > self.max_entries:
+                oldest = next(iter(self._entries))
+                self._delete(oldest)
+            self._con.commit()
+
+    def invalidate(self, question: str, model: str, schema_version: str):
+        """Remove the entry of a question (e.g. because its SQL failed)."""
+        key = cache_key(question, model, schema_version)
+        with self._lock:
+            if key in self._entries:
+                self._delete(key)
+                self._con.commit()
+
+    def _delete(self, key: str):
+        """Remove an entry from memory and SQLite (caller holds the lock and commits)."""
+        self._entries.pop(key, None)
+        self._con.execute("DELETE FROM sql_cache WHERE key = ?", (key,))
+
+    def stats(self) -> dict:
+        """Entry count and hit/miss counters since startup."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else None,
+                "path": str(self.path),
+            }
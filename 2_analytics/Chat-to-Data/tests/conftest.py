@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# The Chat-to-Data modules import each other by name (as when started with uvicorn api:app)
+sys.path.insert(0, str(Path(__file__).parent.parent))
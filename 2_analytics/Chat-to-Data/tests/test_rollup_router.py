@@ -0,0 +1,188 @@
+import duckdb
+import pytest
+
+from rollup_router import route_to_rollup
+
+# fct_activities and its rollups as built by dbt (rollup_activities_*.sql), reduced
+# to the columns the router uses
+SETUP_SQL = """
+CREATE SCHEMA semantic;
+CREATE TABLE semantic.fct_activities AS
+SELECT
+    i AS strava_activity_id,
+    1 AS strava_activity_id_of_day,
+    DATE '2024-12-20' + CAST(i % 420 AS INTEGER) AS date_day,
+    'Activity ' || i AS name,
+    ['Run', 'Cycling', 'Swim', 'Yoga', NULL][i % 5 + 1] AS activity_name,
+    i % 5 < 3 AS is_sport_exercise,
+    TIMESTAMP '2026-01-01' AS transformed_at
+FROM range(2000) AS t(i);
+
+CREATE TABLE semantic.rollup_activities_daily AS
+SELECT
+    date_day,
+    CAST(date_trunc('week', date_day) AS DATE) AS week_start,
+    CAST(date_trunc('month', date_day) AS DATE) AS month_start,
+    activity_name,
+    is_sport_exercise,
+    count(*) AS activity_count
+FROM semantic.fct_activities
+GROUP BY date_day, activity_name, is_sport_exercise;
+
+CREATE TABLE semantic.rollup_activities_weekly AS
+SELECT week_start, activity_name, is_sport_exercise,
+    CAST(sum(activity_count) AS BIGINT) AS activity_count
+FROM semantic.rollup_activities_daily
+GROUP BY week_start, activity_name, is_sport_exercise;
+
+CREATE TABLE semantic.rollup_activities_monthly AS
+SELECT month_start, activity_name, is_sport_exercise,
+    CAST(sum(activity_count) AS BIGINT) AS activity_count
+FROM semantic.rollup_activities_daily
+GROUP BY month_start, activity_name, is_sport_exercise;
+"""
+
+FACTS = "semantic.fct_activities"
+
+
+@pytest.fixture(scope="module")
+def con():
+    con = duckdb.connect()
+    con.execute(SETUP_SQL)
+    yield con
+    con.close()
+
+
+def routed_table(sql: str) -> str:
+    return sql.split(" FROM ")[1].split()[0]
+
+
+def assert_same_result(con, sql: str, routed: str):
+    original = con.execute(sql)
+    expected_columns = [column[0] for column in original.description]
+    expected_rows = original.fetchall()
+    rewritten = con.execute(routed)
+    assert [column[0] for column in rewritten.description] == expected_columns
+    assert rewritten.fetchall() == expected_rows
+
+
+@pytest.mark.parametrize(
+    "sql, table",
+    [
+        # Week buckets with year bounds that are not Mondays: the weekly rollup would
+        # miss the partial first week, the alias must not bind to the daily week_start
+        (
+            "SELECT DATE_TRUNC('week', date_day) AS week_start, COUNT(*) AS activity_count "
+            f"FROM {FACTS} WHERE (date_day >= '2025-01-01' AND date_day < '2026-01-01') "
+            "GROUP BY week_start ORDER BY week_start",
+            "semantic.rollup_activities_daily",
+        ),
+        (
+            "SELECT DATE_TRUNC('week', date_day) AS week_start, COUNT(*) AS activity_count "
+            f"FROM {FACTS} WHERE date_day >= '2025-01-06' AND date_day < '2025-03-03' "
+            "GROUP BY week_start ORDER BY week_start",
+            "semantic.rollup_activities_weekly",
+        ),
+        (
+            "SELECT DATE_TRUNC('week', date_day) AS week_start, COUNT(*) AS activity_count "
+            f"FROM {FACTS} GROUP BY week_start ORDER BY week_start",
+            "semantic.rollup_activities_weekly",
+        ),
+        (
+            "SELECT DATE_TRUNC('month', date_day) AS month_start, COUNT(*) AS activity_count "
+            f"FROM {FACTS} WHERE date_day >= '2025-01-01' AND date_day < '2026-01-01' "
+            "GROUP BY month_start ORDER BY month_start",
+            "semantic.rollup_activities_monthly",
+        ),
+        (
+            "SELECT EXTRACT(YEAR FROM date_day) AS year, activity_name, COUNT(*) AS n "
+            f"FROM {FACTS} GROUP BY year, activity_name ORDER BY year, n DESC, activity_name",
+            "semantic.rollup_activities_monthly",
+        ),
+        (
+            f"SELECT activity_name, COUNT(*) AS activity_count FROM {FACTS} "
+            "GROUP BY activity_name ORDER BY activity_count DESC, activity_name",
+            "semantic.rollup_activities_monthly",
+        ),
+        (
+            f"SELECT date_day, COUNT(*) AS activity_count FROM {FACTS} "
+            "WHERE activity_name = 'Run' GROUP BY date_day ORDER BY date_day",
+            "semantic.rollup_activities_daily",
+        ),
+        (
+            f"SELECT COUNT(*) FROM {FACTS} WHERE date_day >= '2025-03-01' "
+            "AND date_day < '2025-04-01' AND is_sport_exercise = true",
+            "semantic.rollup_activities_monthly",
+        ),
+        (
+            f"SELECT count(strava_activity_id) FROM {FACTS} "
+            "WHERE date_day >= '2025-03-05' AND date_day < '2025-03-06'",
+            "semantic.rollup_activities_daily",
+        ),
+        (
+            f"SELECT COUNT(*) AS count FROM {FACTS} WHERE date_day >= '2030-01-01'",
+            "semantic.rollup_activities_monthly",
+        ),
+        (
+            f"SELECT activity_name, COUNT(*) AS n FROM {FACTS} GROUP BY 1 "
+            "HAVING COUNT(*) > 300 ORDER BY n DESC",
+            "semantic.rollup_activities_monthly",
+        ),
+        (
+            f"SELECT COUNT(*) AS count FROM {FACTS} "
+            "WHERE date_day >= CURRENT_DATE - INTERVAL '30 days'",
+            "semantic.rollup_activities_daily",
+        ),
+    ],
+)
+def test_routes_to_rollup_with_same_result(con, sql, table):
+    routed = route_to_rollup(sql)
+    assert routed is not None
+    assert routed_table(routed) == table
+    assert_same_result(con, sql, routed)
+
+
+@pytest.mark.parametrize(
+    "sql",
+    [
+        f"SELECT * FROM {FACTS}",
+        f"SELECT name, COUNT(*) FROM {FACTS} GROUP BY name",
+        f"SELECT COUNT(DISTINCT activity_name) FROM {FACTS}",
+        f"SELECT COUNT(*) FILTER (WHERE activity_name = 'Run') FROM {FACTS}",
+        f"SELECT COUNT(*) FROM {FACTS} WHERE activity_name IN (SELECT 'Run')",
+        f"SELECT COUNT(*) FROM {FACTS} WHERE strava_activity_id_of_day = 1",
+        f"SELECT activity_name, COUNT(*) OVER () FROM {FACTS}",
+        f"SELECT activity_name, COUNT(*) FROM {FACTS} GROUP BY ROLLUP (activity_name)",
+        f"SELECT COUNT(*) FROM {FACTS} f JOIN {FACTS} g USING (date_day)",
+        f"WITH f AS (SELECT * FROM {FACTS}) SELECT COUNT(*) FROM f",
+        f"SELECT COUNT(*) FROM {FACTS} LIMIT (SELECT 1)",
+        f"SELECT COUNT(*) FROM {FACTS}; SELECT COUNT(*) FROM {FACTS}",
+        "SELECT COUNT(*) FROM semantic.fct_activity_readiness",
+        f"SELECT DISTINCT activity_name FROM {FACTS}",
+        "not sql at all",
+    ],
+)
+def test_keeps_queries_the_rollups_cannot_answer(sql):
+    assert route_to_rollup(sql) is None
+
+
+def test_alias_of_a_fact_column_binds_to_the_column(con):
+    # GROUP BY activity_name groups by the column, not by the select alias
+    sql = (
+        f"SELECT lower(activity_name) AS activity_name, COUNT(*) AS n FROM {FACTS} "
+        "GROUP BY activity_name ORDER BY n, activity_name"
+    )
+    routed = route_to_rollup(sql)
+    assert routed is not None
+    assert_same_result(con, sql, routed)
+
+
+def test_alias_named_like_a_rollup_column_is_not_taken_from_the_rollup(con):
+    sql = (
+        "SELECT DATE_TRUNC('month', date_day) AS week_start, COUNT(*) AS activity_count "
+        f"FROM {FACTS} WHERE date_day >= '2025-01-01' AND date_day < '2025-07-01' "
+        "GROUP BY week_start ORDER BY week_start"
+    )
+    routed = route_to_rollup(sql)
+    assert routed_table(routed) == "semantic.rollup_activities_monthly"
+    assert_same_result(con, sql, routed)
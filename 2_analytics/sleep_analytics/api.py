@@ -2,16 +2,23 @@
 # FastAPI backend for serving DuckDB
 # =====================================================================
 
-from fastapi import FastAPI
+from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from pathlib import Path
-import duckdb
-import pandas as pd
+import sys
+from typing import Optional
 
 # Get the project root directory (go up 3 levels from 2_analytics/sleep_analytics/)
 PROJECT_ROOT = Path(__file__).parent.parent.parent
-DUCKDB_PATH = str(PROJECT_ROOT / "0_data" / "database" / "analytics.duckdb")
+sys.path.insert(0, str(PROJECT_ROOT))
+from analytics_db import cached_query
+
 TABLE_NAME = "whoop.fct_whoop_sleeps"
+ROLLUP_TABLES = {
+    "day": ("whoop.rollup_whoop_sleeps_daily", "date_day"),
+    "week": ("whoop.rollup_whoop_sleeps_weekly", "week_start"),
+    "month": ("whoop.rollup_whoop_sleeps_monthly", "month_start"),
+}
 
 app = FastAPI()
 
@@ -25,10 +32,18 @@ app.add_middleware(
 
 
 @app.get("/data")
-def get_data():
-    """Returns the full sleep dataset as JSON."""
-    con = duckdb.connect(DUCKDB_PATH, read_only=True)
-    df = con.execute(
+def get_data(grain: Optional[str] = None):
+    """Returns the full sleep dataset as JSON.
+
+    With grain=day|week|month, returns the pre-aggregated sleep rollup instead
+    (totals and averages per sleep metric), e.g. /data?grain=month
+    """
+    if grain is not None:
+        return get_rollup(grain)
+
+    # Always read the currently published snapshot, never the dbt build copy.
+    # The result is cached until the next build is published.
+    df = cached_query(
         f"""
         SELECT
         date_day,
@@ -45,7 +60,22 @@ def get_data():
             asleep_duration_minutes IS NOT NULL
             AND moon_phase IS NOT NULL
     """
-    ).fetchdf()
-    con.close()
+    )
+
+    return df.to_dict(orient="records")
+
+
+def get_rollup(grain: str):
+    """Returns the sleep rollup of the given grain as JSON, oldest bucket first."""
+    if grain not in ROLLUP_TABLES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown grain '{grain}', use one of: {', '.join(ROLLUP_TABLES)}",
+        )
+    table, bucket_column = ROLLUP_TABLES[grain]
+
+    df = cached_query(
+        f"SELECT * EXCLUDE (transformed_at) FROM {table} ORDER BY {bucket_column}"
+    )
 
     return df.to_dict(orient="records")
@@ -0,0 +1,450 @@
+#!/usr/bin/env python3
+"""
+Analytics Database Snapshots
+Publishes the dbt-built analytics.duckdb as versioned read-only snapshots
+and resolves the currently published snapshot for the analytics APIs.
+
+dbt is the only writer of 0_data/database/analytics.duckdb (the build copy).
+After a successful build, publish_snapshot() copies it to
+0_data/database/snapshots/analytics_<build_id>.duckdb and atomically swaps the
+CURRENT.json pointer. Readers only ever open published snapshots, so they never
+wait on the dbt write lock and pick up a new version on their next request.
+
+analytics_connection() keeps one read-only DuckDB instance per API process on
+the current snapshot and hands out a cursor per request, so catalog and buffer
+cache survive between requests. A new snapshot gets a new instance; the old one
+is closed once its last request has finished.
+
+cached_query() answers repeated SQL from memory until a new version of the
+database is published (the result cache is keyed on the build ID).
+"""
+
+import argparse
+import json
+import os
+import shutil
+import stat
+import re
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+import duckdb
+import pandas as pd
+
+PROJECT_ROOT = Path(__file__).parent
+DATABASE_DIR = PROJECT_ROOT / "0_data" / "database"
+BUILD_PATH = DATABASE_DIR / "analytics.duckdb"
+SNAPSHOT_DIR = DATABASE_DIR / "snapshots"
+CURRENT_POINTER = SNAPSHOT_DIR / "CURRENT.json"
+KEEP_SNAPSHOTS = 3
+
+# Settings of the pooled read-only instance (per API process)
+READER_THREADS = int(os.getenv("ANALYTICS_DB_THREADS", "4"))
+READER_MEMORY_LIMIT = os.getenv("ANALYTICS_DB_MEMORY_LIMIT", "1GB")
+# Memory the query results of the current database version may use (per API process)
+RESULT_CACHE_BYTES = int(os.getenv("ANALYTICS_RESULT_CACHE_BYTES", str(64 * 1024**2)))
+# Queries whose result depends on more than the database (e.g. "last 30 days") are never cached
+VOLATILE_SQL_PATTERN = re.compile(
+    r"\b(current_date|current_time|current_timestamp|now|today|get_current_time"
+    r"|random|uuid|gen_random_uuid|setseed)\b",
+    re.I,
+)
+
+# Cache of the parsed pointer file, keyed by its mtime
+_pointer_cache = {"mtime_ns": None, "pointer": None}
+
+
+def _write_atomic(path: Path, content: str):
+    """Write a file via a temporary file and os.replace, so readers never see a partial file."""
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    with open(tmp_path, "w") as f:
+        f.write(content)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def read_current_snapshot() -> dict | None:
+    """
+    Read the CURRENT.json pointer of the published snapshot.
+
+    Returns:
+        Pointer dict (build_id, file, published_at, size_bytes), or None if nothing is published yet
+    """
+    try:
+        mtime_ns = CURRENT_POINTER.stat().st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+    if _pointer_cache["mtime_ns"] != mtime_ns:
+        with open(CURRENT_POINTER, "r") as f:
+            _pointer_cache["pointer"] = json.load(f)
+        _pointer_cache["mtime_ns"] = mtime_ns
+
+    return _pointer_cache["pointer"]
+
+
+def current_database_path() -> Path:
+    """
+    Path of the analytics database readers should open.
+
+    Falls back to the dbt build copy if no snapshot has been published yet.
+    """
+    pointer = read_current_snapshot()
+    if pointer:
+        snapshot_path = SNAPSHOT_DIR / pointer["file"]
+        if snapshot_path.exists():
+            return snapshot_path
+    return BUILD_PATH
+
+
+def current_build_id() -> str | None:
+    """Build ID of the published snapshot, or None if nothing is published yet."""
+    pointer = read_current_snapshot()
+    return pointer["build_id"] if pointer else None
+
+
+class _SnapshotReader:
+    """A read-only DuckDB instance on one snapshot and the number of requests using it."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.con = duckdb.connect(
+            str(path),
+            read_only=True,
+            config={
+                "threads": READER_THREADS,
+                "memory_limit": READER_MEMORY_LIMIT,
+                # Queries only read the snapshot, never files (read_csv, COPY, ...)
+                "enable_external_access": False,
+            },
+        )
+        self.active = 0
+        self.retired = False
+
+
+_reader = None
+_reader_lock = threading.Lock()
+
+
+def _acquire_reader(path: Path) -> _SnapshotReader:
+    """The pooled reader of `path`, (re)opened if a different snapshot is current."""
+    global _reader
+    with _reader_lock:
+        if _reader is None or _reader.path != path:
+            previous = _reader
+            _reader = _SnapshotReader(path)
+            if previous is not None:
+                previous.retired = True
+                if previous.active == 0:
+                    previous.con.close()
+        _reader.active += 1
+        return _reader
+
+
+def _release_reader(reader: _SnapshotReader):
+    """Finish a request; close the reader if it was replaced and this was its last request."""
+    with _reader_lock:
+        reader.active -= 1
+        if reader.retired and reader.active == 0:
+            reader.con.close()
+
+
+@contextmanager
+def analytics_connection():
+    """
+    Read-only connection to the current analytics database for one request.
+
+    Published snapshots are served from the pooled instance (a cursor per
+    request). If nothing is published yet, the dbt build copy is opened and
+    closed per request as before, so a reader never holds it open while dbt
+    wants to write.
+
+    Example:
+        with analytics_connection() as con:
+            df = con.execute("SELECT ...").fetchdf()
+    """
+    path = current_database_path()
+    if path == BUILD_PATH:
+        con = duckdb.connect(
+            str(path), read_only=True, config={"enable_external_access": False}
+        )
+        try:
+            yield con
+        finally:
+            con.close()
+        return
+
+    reader = _acquire_reader(path)
+    try:
+        cursor = reader.con.cursor()
+        try:
+            yield cursor
+        finally:
+            cursor.close()
+    finally:
+        _release_reader(reader)
+
+
+def database_version() -> str:
+    """
+    Token that changes whenever the analytics database readers see changes.
+
+    The build ID of the published snapshot, or mtime and size of the dbt build
+    copy (and its WAL) if nothing is published yet.
+    """
+    build_id = current_build_id()
+    if build_id and current_database_path() != BUILD_PATH:
+        return build_id
+    parts = []
+    for path in (BUILD_PATH, BUILD_PATH.with_name(BUILD_PATH.name + ".wal")):
+        try:
+            stat_result = path.stat()
+            parts.append(f"{stat_result.st_mtime_ns}:{stat_result.st_size}")
+        except FileNotFoundError:
+            parts.append("-")
+    return "build:" + "/".join(parts)
+
+
+class ResultCache:
+    """
+    LRU cache of query results for one database version, capped in bytes.
+
+    All entries belong to the same version; the first lookup after a new
+    version was published flushes the cache.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.version = None
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # normalized sql -> (DataFrame, bytes)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def normalize(sql: str) -> str:
+        """Collapse whitespace and drop a trailing semicolon (case is kept for string literals)."""
+        return re.sub(r"\s+", " ", sql).strip().rstrip(";").strip()
+
+    def _switch_version(self, version: str):
+        """Flush all entries if `version` is not the version they were computed on."""
+        if self.version != version:
+            self._entries.clear()
+            self.bytes = 0
+            self.version = version
+
+    def get(self, sql: str, version: str) -> pd.DataFrame | None:
+        """Cached result of the query on `version`, or None."""
+        key = self.normalize(sql)
+        with self._lock:
+            self._switch_version(version)
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, sql: str, version: str, df: pd.DataFrame):
+        """Store a result; results larger than the whole cache are not stored."""
+        key = self.normalize(sql)
+        size = int(df.memory_usage(index=True, deep=True).sum())
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            self._switch_version(version)
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.bytes -= previous[1]
+            self._entries[key] = (df, size)
+            self.bytes += size
+            while self.bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self.bytes -= evicted_size
+
+    def stats(self) -> dict:
+        """Entries, size and hit/miss counters since startup."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "database_version": self.version,
+                "entries": len(self._entries),
+                "bytes": self.bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else None,
+            }
+
+
+result_cache = ResultCache(RESULT_CACHE_BYTES)
+
+
+@contextmanager
+def interrupt_after(con, seconds: float | None):
+    """
+    Interrupt the query running on `con` once it takes longer than `seconds`.
+
+    The query then raises duckdb.InterruptException. None or 0 means no limit.
+    """
+    if not seconds:
+        yield
+        return
+    timer = threading.Timer(seconds, con.interrupt)
+    timer.daemon = True
+    timer.start()
+    try:
+        yield
+    finally:
+        timer.cancel()
+
+
+def _run_query(sql: str, timeout_seconds, precheck) -> pd.DataFrame:
+    """Execute a query on the current analytics database (see cached_query)."""
+    with analytics_connection() as con:
+        if precheck is not None:
+            precheck(con, sql)
+        with interrupt_after(con, timeout_seconds):
+            return con.execute(sql).fetchdf()
+
+
+def cached_query(
+    sql: str, timeout_seconds: float | None = None, precheck=None
+) -> pd.DataFrame:
+    """
+    Result of a read-only query on the current analytics database, from the result cache if possible.
+
+    The returned DataFrame may be shared with other requests and must not be modified.
+    Failing queries raise as usual and are not cached, nor are queries that use the
+    current date or time.
+
+    Args:
+        sql: The query
+        timeout_seconds: Interrupt the query after this many seconds (None: no limit)
+        precheck: Optional callable(con, sql) run before executing, e.g. to refuse
+            expensive plans by raising. Cache hits skip it.
+    """
+    if VOLATILE_SQL_PATTERN.search(sql):
+        return _run_query(sql, timeout_seconds, precheck)
+
+    version = database_version()
+    df = result_cache.get(sql, version)
+    if df is None:
+        df = _run_query(sql, timeout_seconds, precheck)
+        # A snapshot published while the query ran may have answered it, keep it uncached
+        if database_version() == version:
+            result_cache.put(sql, version, df)
+    return df
+
+
+def _prune_snapshots(keep: int, current_file: str):
+    """Delete all but the newest `keep` snapshots (never the current one)."""
+    snapshots = sorted(SNAPSHOT_DIR.glob("analytics_*.duckdb"), reverse=True)
+    for snapshot_path in snapshots[keep:]:
+        if snapshot_path.name == current_file:
+            continue
+        try:
+            snapshot_path.chmod(stat.S_IWUSR | stat.S_IRUSR)
+            snapshot_path.unlink()
+            print(f"  🗑️  Deleted old snapshot: {snapshot_path.name}")
+        except Exception as e:
+            # Can fail on Windows while an API process still has the file open
+            print(f"  ⚠️  Could not delete {snapshot_path.name}: {e}")
+
+
+def publish_snapshot(build_path: Path = BUILD_PATH, keep: int = KEEP_SNAPSHOTS) -> dict:
+    """
+    Publish the dbt build copy as a new versioned, read-only snapshot.
+
+    Args:
+        build_path: The analytics database dbt writes to
+        keep: Number of snapshots to keep on disk (older ones are deleted)
+
+    Returns:
+        The new CURRENT.json pointer dict
+
+    Raises:
+        FileNotFoundError: If the build database does not exist
+        RuntimeError: If the build database is still locked by a writer (dbt running)
+    """
+    build_path = Path(build_path)
+    if not build_path.exists():
+        raise FileNotFoundError(
+            f"Build database not found: {build_path}\n"
+            f"Run dbt with --target analytics first (or publish the single-file build\n"
+            f"with --build-path {DATABASE_DIR / 'single.duckdb'})."
+        )
+
+    # Taking the write lock doubles as a guard against publishing mid-build.
+    # CHECKPOINT folds the WAL into the database file so the copy is self-contained.
+    try:
+        con = duckdb.connect(str(build_path))
+    except duckdb.IOException as e:
+        raise RuntimeError(
+            f"Build database is locked by another writer (is dbt still running?): {e}"
+        )
+
+    SNAPSHOT_DIR.mkdir(parents=True, exist_ok=True)
+    build_id = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+    snapshot_file = f"analytics_{build_id}.duckdb"
+    snapshot_path = SNAPSHOT_DIR / snapshot_file
+
+    tmp_path = SNAPSHOT_DIR / f".{snapshot_file}.tmp"
+    try:
+        con.execute("CHECKPOINT")
+        # Still holding the lock, so no dbt run can write while the file is copied
+        shutil.copyfile(build_path, tmp_path)
+    finally:
+        con.close()
+    os.replace(tmp_path, snapshot_path)
+    snapshot_path.chmod(stat.S_IRUSR | stat.S_IRGRP | stat.S_IROTH)
+
+    pointer = {
+        "build_id": build_id,
+        "file": snapshot_file,
+        "published_at": datetime.now().isoformat(),
+        "size_bytes": snapshot_path.stat().st_size,
+    }
+    _write_atomic(CURRENT_POINTER, json.dumps(pointer, indent=2))
+    print(f"✅ Published analytics snapshot: {snapshot_file}")
+
+    _prune_snapshots(keep, snapshot_file)
+    return pointer
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Publish or inspect analytics database snapshots."
+    )
+    parser.add_argument(
+        "command", choices=["publish", "status"], nargs="?", default="status"
+    )
+    parser.add_argument("--keep", type=int, default=KEEP_SNAPSHOTS)
+    parser.add_argument(
+        "--build-path",
+        type=Path,
+        default=BUILD_PATH,
+        help="Database to publish (single.duckdb for the single-file build)",
+    )
+    args = parser.parse_args()
+
+    try:
+        if args.command == "publish":
+            publish_snapshot(args.build_path, keep=args.keep)
+        else:
+            pointer = read_current_snapshot()
+            if pointer:
+                print(f"📦 Current snapshot: {pointer['file']}")
+                print(f"   Build ID: {pointer['build_id']}")
+                print(f"   Published at: {pointer['published_at']}")
+            else:
+                print(f"⚠️  No snapshot published yet, readers use: {BUILD_PATH}")
+    except (FileNotFoundError, RuntimeError) as e:
+        print(f"❌ {e}")
+        raise SystemExit(1)
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+#################################################################################
+##### This script compares the three-file and the single-file dbt build.    #####
+##### 1. Copies the pipeline into a scratch workspace per scale and layout. #####
+##### 2. Generates synthetic raw data and runs the loaders.                 #####
+##### 3. Runs the full dbt build twice (initial and incremental rebuild)    #####
+#####    with the source/transform/analytics targets or the single target.  #####
+##### 4. Measures build time and the size of all DuckDB files, appends the  #####
+#####    results to logs/build_layout_runs.jsonl and prints a comparison.   #####
+#################################################################################
+
+import argparse
+import json
+import os
+import shutil
+import sys
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+
+from dbt_profile import (
+    DBT_STEPS,
+    LOADERS,
+    create_workspace,
+    git_commit,
+    project_root,
+    run_command,
+)
+
+history_path = project_root / "logs" / "build_layout_runs.jsonl"
+
+DEFAULT_SCALES = [1, 10, 50]
+
+LAYOUTS = {
+    "three_file": DBT_STEPS,
+    "single_file": [(["seed"], "single"), (["run"], "single")],
+}
+
+
+def database_footprint(database_dir: Path) -> int:
+    """Bytes on disk of all DuckDB files (including WAL files) in a directory."""
+    return sum(
+        path.stat().st_size
+        for path in database_dir.iterdir()
+        if path.suffix in (".duckdb", ".wal")
+    )
+
+
+def run_dbt_build(steps: list, dbt_dir: Path, env: dict) -> float:
+    """Run all dbt steps of a layout and return the wall time in seconds."""
+    start = time.perf_counter()
+    for arguments, target in steps:
+        run_command(["dbt", *arguments, "--target", target], cwd=dbt_dir, env=env)
+    return time.perf_counter() - start
+
+
+def benchmark_layout(layout: str, scale: int, seed: int, keep_workspace: bool) -> dict:
+    """Build one synthetic scale with one layout and return its measurements."""
+    print(f"\n🏗️  {layout}, scale {scale}")
+    workspace = create_workspace(scale, seed)
+    dbt_dir = workspace / "1_elt" / "2_transform"
+    database_dir = workspace / "0_data" / "database"
+    env = {**os.environ, "DBT_PROFILES_DIR": str(dbt_dir)}
+
+    try:
+        for loader in LOADERS:
+            run_command([sys.executable, str(loader)], cwd=workspace)
+        raw_bytes = database_footprint(database_dir)
+
+        if not (dbt_dir / "dbt_packages").exists():
+            run_command(["dbt", "deps"], cwd=dbt_dir, env=env)
+
+        build_seconds = run_dbt_build(LAYOUTS[layout], dbt_dir, env)
+        print(f"  ⏱️  Initial build: {build_seconds:.2f}s")
+        database_bytes = database_footprint(database_dir)
+
+        # Same data again: measures the fixed cost of a routine incremental refresh
+        rebuild_seconds = run_dbt_build(LAYOUTS[layout], dbt_dir, env)
+        print(f"  ⏱️  Incremental rebuild: {rebuild_seconds:.2f}s")
+    finally:
+        if keep_workspace:
+            print(f"  📁 Workspace kept: {workspace}")
+        else:
+            shutil.rmtree(workspace, ignore_errors=True)
+
+    return {
+        "layout": layout,
+        "scale": scale,
+        "seed": seed,
+        "build_seconds": round(build_seconds, 3),
+        "rebuild_seconds": round(rebuild_seconds, 3),
+        "raw_bytes": raw_bytes,
+        "database_bytes": database_bytes,
+    }
+
+
+def print_comparison(records: list[dict]):
+    """Print both layouts side by side per scale, relative to the three-file layout."""
+    print(
+        f"\n📊 {'scale':>5} {'layout':<12} {'build s':>9} {'rebuild s':>10} "
+        f"{'disk MB':>9} {'vs three_file':>14}"
+    )
+    for scale in sorted({record["scale"] for record in records}):
+        by_layout = {r["layout"]: r for r in records if r["scale"] == scale}
+        base = by_layout.get("three_file")
+        for layout, record in by_layout.items():
+            change = "-"
+            if base and layout != "three_file":
+                change = (
+                    f"{(record['build_seconds'] / base['build_seconds'] - 1) * 100:+.0f}% / "
+                    f"{(record['database_bytes'] / base['database_bytes'] - 1) * 100:+.0f}%"
+                )
+            print(
+                f"   {scale:>5} {layout:<12} {record['build_seconds']:>9.2f} "
+                f"{record['rebuild_seconds']:>10.2f} "
+                f"{record['database_bytes'] / 1024**2:>9.1f} {change:>14}"
+            )
+    print("   (vs three_file: build time / disk footprint)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Compare build time and disk footprint of the dbt build layouts."
+    )
+    parser.add_argument(
+        "--scales",
+        type=int,
+        nargs="+",
+        default=DEFAULT_SCALES,
+        help="Athlete-years of synthetic data per benchmark run",
+    )
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument(
+        "--layouts", nargs="+", choices=list(LAYOUTS), default=list(LAYOUTS)
+    )
+    parser.add_argument("--keep-workspace", action="store_true")
+    args = parser.parse_args()
+
+    run_id = uuid.uuid4().hex
+    commit = git_commit()
+    records = []
+    try:
+        for scale in args.scales:
+            for layout in args.layouts:
+                record = benchmark_layout(layout, scale, args.seed, args.keep_workspace)
+                records.append(
+                    {
+                        "run_id": run_id,
+                        "benchmarked_at": datetime.now().isoformat(),
+                        "git_commit": commit,
+                        **record,
+                    }
+                )
+    except RuntimeError as e:
+        print(f"❌ {e}")
+        raise SystemExit(1)
+
+    history_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(history_path, "a") as f:
+        for record in records:
+            f.write(json.dumps(record) + "\n")
+    print(f"\n📈 Results written to: {history_path}")
+
+    print_comparison(records)
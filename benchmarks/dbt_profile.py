@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+#################################################################################
+##### This script profiles the dbt build at several synthetic data scales.  #####
+##### 1. Copies the pipeline into a scratch workspace per scale.            #####
+##### 2. Generates synthetic raw data, runs the loaders and dbt.            #####
+##### 3. Collects per-model execution time and rows affected from           #####
+#####    target/run_results.json and appends them to                        #####
+#####    logs/dbt_profile_runs.jsonl.                                       #####
+##### 4. Flags models that got slower than the baseline by more than the    #####
+#####    threshold and exits with 1, so it can gate SQL changes.            #####
+#################################################################################
+
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+
+import duckdb
+
+from synthetic_data import generate_dataset
+
+# Get project root directory (1 level up: benchmarks -> project_root)
+project_root = Path(__file__).parent.parent
+history_path = project_root / "logs" / "dbt_profile_runs.jsonl"
+baseline_path = Path(__file__).parent / "dbt_profile_baseline.json"
+
+DEFAULT_SCALES = [1, 10, 50]
+DEFAULT_THRESHOLD = 0.25
+# Ignore slowdowns below this many seconds, they are mostly noise on small models
+MIN_REGRESSION_SECONDS = 0.05
+
+LOADERS = [
+    Path("1_elt") / "1_load" / "strava" / "load_strava_data.py",
+    # Creates strava.strava_activity_stream_metrics, which staging reads even without streams
+    Path("1_elt") / "1_load" / "strava" / "load_strava_streams.py",
+    Path("1_elt") / "1_load" / "whoop" / "load_whoop_data.py",
+]
+
+# Same order and targets as in 1_elt/2_transform/HOW_TO_RUN.md
+DBT_STEPS = [
+    (["seed"], "source"),
+    (["run", "--select", "staging.*"], "source"),
+    (["run", "--select", "intermediate.*"], "transform"),
+    (["run", "--select", "metrics.*"], "analytics"),
+]
+
+
+def create_workspace(scale: int, seed: int) -> Path:
+    """Copy the pipeline code into a scratch directory and generate raw data for it."""
+    workspace = Path(tempfile.mkdtemp(prefix=f"dbt_profile_{scale}_"))
+    shutil.copytree(
+        project_root / "1_elt",
+        workspace / "1_elt",
+        ignore=shutil.ignore_patterns("__pycache__", "target", "logs"),
+    )
+    shutil.copy(project_root / "config_loader.py", workspace)
+    shutil.copy(project_root / "config_sample.yml", workspace / "config.yml")
+    (workspace / "0_data" / "database").mkdir(parents=True)
+
+    counts = generate_dataset(workspace / "0_data" / "raw", scale, seed)
+    print(f"  🧪 Generated {counts} ({scale} athlete-year(s), seed {seed})")
+    return workspace
+
+
+def run_command(command: list, cwd: Path, env: dict = None):
+    """Run a pipeline command and raise with its output if it fails."""
+    result = subprocess.run(command, cwd=cwd, env=env, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(
+            f"Command failed: {' '.join(map(str, command))}\n"
+            f"{result.stdout[-3000:]}{result.stderr[-3000:]}"
+        )
+
+
+def count_rows(database_path: Path, relation_name: str) -> int | None:
+    """Row count of a built relation (dbt-duckdb does not report rows affected)."""
+    # relation_name is fully qualified: "analytics"."semantic"."fct_activities"
+    database, schema, table = [part.strip('"') for part in relation_name.split(".")]
+    try:
+        con = duckdb.connect(str(database_path), read_only=True)
+        try:
+            query = f'SELECT COUNT(*) FROM "{schema}"."{table}"'
+            return con.execute(query).fetchone()[0]
+        finally:
+            con.close()
+    except duckdb.Error:
+        return None
+
+
+def profile_scale(
+    scale: int, seed: int, run_id: str, commit: str, keep_workspace: bool
+) -> list[dict]:
+    """Build the whole project on one synthetic scale and return one record per dbt node."""
+    print(f"\n📏 Scale {scale}")
+    workspace = create_workspace(scale, seed)
+    dbt_dir = workspace / "1_elt" / "2_transform"
+    env = {**os.environ, "DBT_PROFILES_DIR": str(dbt_dir)}
+    records = []
+
+    try:
+        for loader in LOADERS:
+            run_command([sys.executable, str(loader)], cwd=workspace)
+
+        if not (dbt_dir / "dbt_packages").exists():
+            run_command(["dbt", "deps"], cwd=dbt_dir, env=env)
+
+        for arguments, target in DBT_STEPS:
+            start = time.perf_counter()
+            run_command(["dbt", *arguments, "--target", target], cwd=dbt_dir, env=env)
+            wall_seconds = time.perf_counter() - start
+            print(
+                f"  ⏱️  dbt {' '.join(arguments)} --target {target}: {wall_seconds:.2f}s"
+            )
+
+            with open(dbt_dir / "target" / "run_results.json", "r") as f:
+                run_results = json.load(f)
+            database_path = workspace / "0_data" / "database" / f"{target}.duckdb"
+
+            for result in run_results["results"]:
+                node = result["unique_id"]
+                relation_name = result.get("relation_name")
+                rows_affected = (result.get("adapter_response") or {}).get(
+                    "rows_affected"
+                )
+                if (rows_affected is None or rows_affected < 0) and relation_name:
+                    rows_affected = count_rows(database_path, relation_name)
+
+                records.append(
+                    {
+                        "run_id": run_id,
+                        "profiled_at": datetime.now().isoformat(),
+                        "git_commit": commit,
+                        "scale": scale,
+                        "seed": seed,
+                        "target": target,
+                        "node": node,
+                        "model": node.split(".")[-1],
+                        "status": result["status"],
+                        "execution_time": round(result["execution_time"], 4),
+                        "rows_affected": rows_affected,
+                    }
+                )
+    finally:
+        if keep_workspace:
+            print(f"  📁 Workspace kept: {workspace}")
+        else:
+            shutil.rmtree(workspace, ignore_errors=True)
+
+    return records
+
+
+def git_commit() -> str | None:
+    """Short hash of the checked out commit, so history entries can be traced back."""
+    try:
+        result = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=project_root,
+            capture_output=True,
+            text=True,
+        )
+        return result.stdout.strip() or None
+    except OSError:
+        return None
+
+
+def load_baseline() -> dict:
+    """Baseline execution times as {scale: {model: seconds}} (empty if none saved yet)."""
+    if not baseline_path.exists():
+        return {}
+    with open(baseline_path, "r") as f:
+        return json.load(f)["execution_time"]
+
+
+def save_baseline(records: list[dict]):
+    """Store the execution times of this run as the new baseline."""
+    execution_time = {}
+    for record in records:
+        scale_times = execution_time.setdefault(str(record["scale"]), {})
+        scale_times[record["model"]] = record["execution_time"]
+    baseline = {
+        "created_at": datetime.now().isoformat(),
+        "git_commit": git_commit(),
+        "execution_time": execution_time,
+    }
+    with open(baseline_path, "w") as f:
+        json.dump(baseline, f, indent=2, sort_keys=True)
+    print(f"\n📌 Baseline saved to: {baseline_path}")
+
+
+def find_regressions(records: list[dict], baseline: dict, threshold: float) -> list:
+    """Models whose execution time grew by more than `threshold` against the baseline."""
+    regressions = []
+    for record in records:
+        base = baseline.get(str(record["scale"]), {}).get(record["model"])
+        if base is None:
+            continue
+        current = record["execution_time"]
+        if current > base * (1 + threshold) and current - base > MIN_REGRESSION_SECONDS:
+            regressions.append((record, base))
+    return regressions
+
+
+def print_summary(records: list[dict], baseline: dict, top: int):
+    """Print the slowest models per scale with their change against the baseline."""
+    for scale in sorted({record["scale"] for record in records}):
+        scale_records = [r for r in records if r["scale"] == scale]
+        total = sum(r["execution_time"] for r in scale_records)
+        print(f"\n📊 Scale {scale}: {len(scale_records)} nodes, {total:.2f}s total")
+        print(
+            f"  {'model':<40} {'seconds':>9} {'share':>7} {'rows':>10} {'vs base':>9}"
+        )
+
+        for record in sorted(scale_records, key=lambda r: -r["execution_time"])[:top]:
+            base = baseline.get(str(scale), {}).get(record["model"])
+            change = (
+                f"{(record['execution_time'] / base - 1) * 100:+.0f}%" if base else "-"
+            )
+            rows = (
+                record["rows_affected"] if record["rows_affected"] is not None else "-"
+            )
+            print(
+                f"  {record['model']:<40} {record['execution_time']:>9.3f} "
+                f"{record['execution_time'] / total * 100 if total else 0:>6.1f}% "
+                f"{rows:>10} {change:>9}"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Profile the dbt build on synthetic data and flag regressions."
+    )
+    parser.add_argument(
+        "--scales",
+        type=int,
+        nargs="+",
+        default=DEFAULT_SCALES,
+        help="Athlete-years of synthetic data per profiling run",
+    )
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        help="Allowed relative slowdown per model against the baseline (0.25 = 25%%)",
+    )
+    parser.add_argument(
+        "--save-baseline",
+        action="store_true",
+        help="Store this run as the new baseline instead of comparing against it",
+    )
+    parser.add_argument("--top", type=int, default=15, help="Models shown per scale")
+    parser.add_argument("--keep-workspace", action="store_true")
+    args = parser.parse_args()
+
+    run_id = uuid.uuid4().hex
+    commit = git_commit()
+    records = []
+    try:
+        for scale in args.scales:
+            records.extend(
+                profile_scale(scale, args.seed, run_id, commit, args.keep_workspace)
+            )
+    except RuntimeError as e:
+        print(f"❌ {e}")
+        raise SystemExit(1)
+
+    history_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(history_path, "a") as f:
+        for record in records:
+            f.write(json.dumps(record) + "\n")
+    print(f"\n📈 Profile history written to: {history_path}")
+
+    baseline = {} if args.save_baseline else load_baseline()
+    print_summary(records, baseline, args.top)
+
+    if args.save_baseline:
+        save_baseline(records)
+    elif not baseline:
+        print("\n⚠️  No baseline yet, save one with --save-baseline")
+    else:
+        regressions = find_regressions(records, baseline, args.threshold)
+        if regressions:
+            print(
+                f"\n❌ {len(regressions)} model(s) slower than baseline by >{args.threshold:.0%}:"
+            )
+            for record, base in regressions:
+                print(
+                    f"  - {record['model']} (scale {record['scale']}): "
+                    f"{base:.3f}s -> {record['execution_time']:.3f}s"
+                )
+            raise SystemExit(1)
+        print(f"\n✅ No model slower than baseline by >{args.threshold:.0%}")
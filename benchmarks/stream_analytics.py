@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+#################################################################################
+##### This script benchmarks the stream metrics of load_strava_streams.py.  #####
+##### 1. Generates synthetic per-second streams in memory.                  #####
+##### 2. Computes the metrics with the batched NumPy implementation and     #####
+#####    with a plain Python loop per activity on a sample.                 #####
+##### 3. Checks that both agree and reports activities/s and samples/s.     #####
+##### 4. Appends the results to logs/stream_analytics_runs.jsonl.           #####
+#################################################################################
+
+import argparse
+import json
+import math
+import random
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from dbt_profile import git_commit, project_root
+from synthetic_data import (
+    END_DATE,
+    STRAVA_TYPES,
+    Athlete,
+    strava_activity,
+    strava_streams,
+)
+
+sys.path.insert(0, str(project_root / "1_elt" / "1_load" / "strava"))
+from stream_metrics import (
+    BEST_EFFORT_METERS,
+    HEART_RATE_ZONE_BOUNDS,
+    MAX_SAMPLE_GAP_SECONDS,
+    NORMALIZED_POWER_SECONDS,
+    POWER_CURVE_SECONDS,
+    StreamBatch,
+    compute_stream_metrics,
+    metric_columns,
+)
+
+history_path = project_root / "logs" / "stream_analytics_runs.jsonl"
+
+MAX_HEARTRATE = 190
+
+
+def synthetic_streams(count: int, seed: int) -> tuple[list, list]:
+    """Streams of `count` synthetic outdoor activities (rides with a power meter also get power)."""
+    rng = random.Random(seed)
+    outdoor_types = [
+        name for name, (_, distance, _) in STRAVA_TYPES.items() if distance
+    ]
+    athletes = [Athlete(index, seed) for index in range(max(1, count // 20))]
+    activity_ids, streams = [], []
+    for n in range(count):
+        athlete = athletes[n % len(athletes)]
+        intensity = rng.random()
+        activity = strava_activity(
+            athlete,
+            10_000_000_000 + n,
+            rng.choice(outdoor_types),
+            END_DATE - timedelta(days=n % 365, hours=rng.uniform(0, 12)),
+            intensity,
+        )
+        activity_ids.append(activity["id"])
+        streams.append(strava_streams(athlete, activity, intensity))
+    return activity_ids, streams
+
+
+def rolling_averages(values: list, window: int) -> list:
+    """Average of every `window` consecutive values, with a running sum."""
+    averages = []
+    total = 0.0
+    for i, value in enumerate(values):
+        total += value
+        if i >= window:
+            total -= values[i - window]
+        if i >= window - 1:
+            averages.append(total / window)
+    return averages
+
+
+def naive_metrics(streams: dict, max_heartrate: float) -> dict:
+    """The same metrics for one activity, with Python loops over the samples."""
+    data = {key: stream["data"] for key, stream in streams.items()}
+    time_stream = data.get("time") or []
+    metrics = {column: math.nan for column in metric_columns()}
+    if not time_stream:
+        return metrics
+    metrics["stream_seconds"] = time_stream[-1] - time_stream[0]
+
+    watts = data.get("watts")
+    if watts and len(watts) == len(time_stream):
+        power = [0.0] * (int(time_stream[-1]) + 1)
+        for second, value in zip(time_stream, watts):
+            power[int(second)] = value
+        for label, seconds in POWER_CURVE_SECONDS.items():
+            averages = rolling_averages(power, seconds)
+            metrics[f"max_power_{label}_watts"] = max(averages, default=math.nan)
+        rolling = rolling_averages(power, NORMALIZED_POWER_SECONDS)
+        if rolling:
+            metrics["normalized_power_watts"] = (
+                sum(value**4 for value in rolling) / len(rolling)
+            ) ** 0.25
+
+    distance = data.get("distance")
+    if distance and len(distance) == len(time_stream):
+        for label, meters in BEST_EFFORT_METERS.items():
+            best = None
+            end = 0
+            for start in range(len(distance)):
+                end = max(end, start)
+                while end < len(distance) and distance[end] - distance[start] < meters:
+                    end += 1
+                if end == len(distance):
+                    break
+                elapsed = time_stream[end] - time_stream[start]
+                best = elapsed if best is None or elapsed < best else best
+            metrics[f"best_{label}_seconds"] = math.nan if best is None else best
+
+    heartrate = data.get("heartrate")
+    if heartrate and len(heartrate) == len(time_stream):
+        zones = [0.0] * (len(HEART_RATE_ZONE_BOUNDS) + 1)
+        for i in range(len(heartrate) - 1):
+            duration = time_stream[i + 1] - time_stream[i]
+            if not heartrate[i] or duration > MAX_SAMPLE_GAP_SECONDS:
+                continue
+            share = heartrate[i] / max_heartrate
+            zone = sum(share >= bound for bound in HEART_RATE_ZONE_BOUNDS)
+            zones[zone] += duration
+        for zone, seconds in enumerate(zones):
+            metrics[f"heart_rate_zone_{zone + 1}_seconds"] = seconds
+
+    return metrics
+
+
+def compare(batched, naive: list) -> float:
+    """Largest absolute difference between the batched and the naive results."""
+    expected = np.array([[row[column] for column in metric_columns()] for row in naive])
+    actual = batched[metric_columns()].to_numpy()[: len(naive)]
+    if not np.array_equal(np.isnan(expected), np.isnan(actual)):
+        raise AssertionError(
+            "Batched and naive metrics differ in which values are null"
+        )
+    both = ~np.isnan(expected)
+    return float(np.max(np.abs(expected[both] - actual[both]), initial=0.0))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Benchmark the batched NumPy stream metrics against a Python loop."
+    )
+    parser.add_argument("--activities", type=int, default=1000)
+    parser.add_argument(
+        "--naive-activities",
+        type=int,
+        default=20,
+        help="Activities computed with the Python loop (it is slow)",
+    )
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    print(f"🏗️  Generating streams of {args.activities} synthetic activities...")
+    activity_ids, streams = synthetic_streams(args.activities, args.seed)
+    samples = sum(len(s["time"]["data"]) for s in streams)
+
+    start = time.perf_counter()
+    batches = []
+    for batch_start in range(0, len(streams), args.batch_size):
+        batch = StreamBatch(
+            activity_ids[batch_start : batch_start + args.batch_size],
+            streams[batch_start : batch_start + args.batch_size],
+        )
+        batches.append(compute_stream_metrics(batch, MAX_HEARTRATE))
+    batched_seconds = time.perf_counter() - start
+    batched = pd.concat(batches, ignore_index=True)
+
+    naive_count = min(args.naive_activities, args.activities)
+    start = time.perf_counter()
+    naive = [naive_metrics(s, MAX_HEARTRATE) for s in streams[:naive_count]]
+    naive_seconds = time.perf_counter() - start
+
+    max_difference = compare(batched, naive)
+    record = {
+        "run_id": uuid.uuid4().hex,
+        "benchmarked_at": datetime.now().isoformat(),
+        "git_commit": git_commit(),
+        "activities": args.activities,
+        "samples": samples,
+        "batch_size": args.batch_size,
+        "batched_seconds": round(batched_seconds, 3),
+        "batched_activities_per_second": round(args.activities / batched_seconds, 1),
+        "naive_activities": naive_count,
+        "naive_seconds": round(naive_seconds, 3),
+        "naive_activities_per_second": round(naive_count / naive_seconds, 2),
+        "max_difference": max_difference,
+    }
+
+    history_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(history_path, "a") as f:
+        f.write(json.dumps(record) + "\n")
+
+    print(
+        f"\n📊 Batched NumPy: {record['batched_activities_per_second']:,.1f} activities/s "
+        f"({samples / batched_seconds:,.0f} samples/s, {args.activities} activities)"
+    )
+    print(
+        f"   Python loop:   {record['naive_activities_per_second']:,.2f} activities/s "
+        f"({naive_count} activities)"
+    )
+    print(
+        f"   Speedup: {record['batched_activities_per_second'] / record['naive_activities_per_second']:,.0f}x, "
+        f"largest difference {max_difference:.2e}"
+    )
+    print(f"\n📈 Results written to: {history_path}")
@@ -0,0 +1,601 @@
+#!/usr/bin/env python3
+#################################################################################
+##### This script generates deterministic synthetic raw data at scale.      #####
+##### 1. Writes Strava activities in the shape `flatten_activity` reads.    #####
+##### 2. Writes WHOOP v2 sleeps, workouts, cycles and recoveries with the   #####
+#####    nested score structs the staging models use.                       #####
+##### 3. Optionally writes per-second Strava streams per activity.          #####
+##### 4. Scales from one athlete-year to thousands, same seed = same data.  #####
+#################################################################################
+
+import argparse
+import json
+import math
+import random
+import time
+import uuid
+from contextlib import ExitStack
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import numpy as np
+
+# Every athlete covers the same calendar window ending here, so more athletes
+# means more rows per day and more years means a longer history
+END_DATE = datetime(2025, 12, 31)
+DAYS_PER_YEAR = 365
+
+# Strava type -> (base share of activities, typical distance in km, typical speed in m/s).
+# Only types with a row in seeds/activity_mapping.csv, so every activity gets an activity_name
+STRAVA_TYPES = {
+    "Run": (0.40, 10.0, 2.9),
+    "Ride": (0.25, 40.0, 7.5),
+    "Hike": (0.15, 8.0, 1.2),
+    "WeightTraining": (0.10, 0.0, 0.0),
+    "Yoga": (0.05, 0.0, 0.0),
+    "Swim": (0.05, 2.0, 0.8),
+}
+
+# Strava type -> WHOOP sport name and sport id of the matching WHOOP workout
+WHOOP_SPORTS = {
+    "Run": ("running", 0),
+    "Ride": ("cycling", 1),
+    "Hike": ("hiking-rucking", 52),
+    "WeightTraining": ("weightlifting", 45),
+    "Yoga": ("yoga", 44),
+    "Swim": ("swimming", 33),
+}
+
+# Activity types recorded with GPS, these get distance, gear and location
+OUTDOOR_TYPES = {"Run", "Ride", "Hike", "Swim"}
+ZONE_NAMES = ["zero", "one", "two", "three", "four", "five"]
+CITIES = [(52.52, 13.40), (48.14, 11.58), (53.55, 9.99), (50.94, 6.96), (47.37, 8.54)]
+
+# Raw file prefixes as written by the extract scripts
+DATASETS = ["activities", "workouts", "sleeps", "cycles", "recoveries"]
+
+
+def _timestamp(value: datetime) -> str:
+    return value.strftime("%Y-%m-%dT%H:%M:%S.000Z")
+
+
+def _parse_timestamp(value: str) -> datetime:
+    return datetime.strptime(value, "%Y-%m-%dT%H:%M:%S.000Z")
+
+
+class JsonArrayWriter:
+    """Writes a JSON array record by record, so memory stays flat at any scale."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.count = 0
+
+    def __enter__(self):
+        self.file = open(self.path, "w")
+        self.file.write("[")
+        return self
+
+    def write(self, record: dict):
+        self.file.write(("," if self.count else "") + json.dumps(record))
+        self.count += 1
+
+    def __exit__(self, *exc):
+        self.file.write("]")
+        self.file.close()
+
+
+class Athlete:
+    """Stable per-athlete traits that shape all of their generated data."""
+
+    def __init__(self, index: int, seed: int):
+        # String seeds are hashed deterministically, so each athlete is reproducible on its own
+        self.rng = random.Random(f"{seed}-{index}")
+        rng = self.rng
+
+        self.seed = seed
+        self.index = index
+        self.user_id = 10_000 + index
+        self.home = rng.choice(CITIES)
+        self.gear_ids = [f"g{self.user_id}{n}" for n in range(rng.randint(1, 3))]
+        self.bike_ids = [f"b{self.user_id}{n}" for n in range(rng.randint(0, 2))]
+
+        self.sessions_per_week = rng.uniform(2.5, 9.0)
+        self.sport_weights = {
+            activity_type: share * rng.uniform(0.2, 2.0)
+            for activity_type, (share, _, _) in STRAVA_TYPES.items()
+        }
+        self.fitness = rng.uniform(0.8, 1.25)  # scales speed
+        self.power_meter = rng.random() < 0.5
+        self.ftp_watts = rng.uniform(180, 320)
+        self.max_heartrate = rng.randint(172, 200)
+        self.resting_heartrate = rng.randint(45, 65)
+        self.hrv_baseline_milli = rng.uniform(35, 110)
+        self.sleep_need_hours = rng.uniform(7.0, 8.5)
+        self.bedtime_hour = rng.uniform(21.75, 24.25)
+
+    def sport_weights_on(self, date: datetime) -> dict:
+        """Seasonal sport mix: more riding in summer, more gym and yoga in winter."""
+        summer = math.sin((date.timetuple().tm_yday - 80) / DAYS_PER_YEAR * 2 * math.pi)
+        weights = dict(self.sport_weights)
+        weights["Ride"] *= 1 + 0.6 * summer
+        weights["Swim"] *= 1 + 0.4 * summer
+        weights["WeightTraining"] *= 1 - 0.4 * summer
+        weights["Yoga"] *= 1 - 0.3 * summer
+        return weights
+
+
+def strava_activity(athlete, activity_id, activity_type, start, intensity) -> dict:
+    """One Strava activity with the fields `flatten_activity` reads."""
+    rng = athlete.rng
+    _, distance_km, speed = STRAVA_TYPES[activity_type]
+    outdoor = activity_type in OUTDOOR_TYPES
+    has_power = activity_type == "Ride" and athlete.power_meter
+
+    speed *= athlete.fitness * (0.9 + 0.2 * intensity)
+    distance = rng.lognormvariate(0, 0.35) * distance_km * 1000 if outdoor else 0.0
+    moving_time = (
+        max(int(distance / speed), 300) if outdoor else rng.randint(1800, 5400)
+    )
+    heart_rate_reserve = athlete.max_heartrate - athlete.resting_heartrate
+    average_heartrate = athlete.resting_heartrate + heart_rate_reserve * (
+        0.5 + 0.3 * intensity
+    )
+    average_watts = athlete.ftp_watts * (0.55 + 0.3 * intensity) if has_power else None
+
+    start_latlng = [
+        round(athlete.home[0] + rng.uniform(-0.15, 0.15), 6),
+        round(athlete.home[1] + rng.uniform(-0.15, 0.15), 6),
+    ]
+    end_latlng = [round(start_latlng[0] + rng.uniform(-0.02, 0.02), 6), start_latlng[1]]
+    gear_ids = athlete.bike_ids if activity_type == "Ride" else athlete.gear_ids
+    part_of_day = (
+        "Morning" if start.hour < 11 else "Lunch" if start.hour < 14 else "Evening"
+    )
+
+    return {
+        "id": activity_id,
+        "name": f"{part_of_day} {activity_type}",
+        "type": activity_type,
+        "sport_type": activity_type,
+        "start_date": _timestamp(start),
+        "start_date_local": _timestamp(start + timedelta(hours=1)),
+        "timezone": "(GMT+01:00) Europe/Berlin",
+        "distance": round(distance, 1),
+        "moving_time": moving_time,
+        "elapsed_time": int(moving_time * rng.uniform(1.0, 1.25)),
+        "total_elevation_gain": round(distance / 1000 * rng.uniform(0, 15), 1),
+        "average_speed": round(distance / moving_time, 3),
+        "max_speed": round(distance / moving_time * rng.uniform(1.3, 2.0), 3),
+        "average_heartrate": round(average_heartrate, 1),
+        "max_heartrate": float(
+            min(
+                athlete.max_heartrate, round(average_heartrate * rng.uniform(1.08, 1.2))
+            )
+        ),
+        "average_watts": round(average_watts, 1) if has_power else None,
+        "kilojoules": (
+            round(average_watts * moving_time / 1000, 1) if has_power else None
+        ),
+        "average_cadence": (
+            round(rng.uniform(78, 92), 1) if activity_type in ("Run", "Ride") else None
+        ),
+        "achievement_count": rng.choices([0, 1, 2, 5], weights=[60, 20, 15, 5])[0],
+        "kudos_count": int(rng.expovariate(1 / 6)),
+        "comment_count": rng.choices([0, 1, 2], weights=[80, 15, 5])[0],
+        "athlete_count": rng.choices([1, 2, 3], weights=[80, 15, 5])[0],
+        "trainer": activity_type == "Ride" and rng.random() < 0.2,
+        "commute": activity_type == "Ride" and rng.random() < 0.15,
+        "manual": rng.random() < 0.02,
+        "private": rng.random() < 0.05,
+        "flagged": False,
+        "gear_id": rng.choice(gear_ids) if outdoor and gear_ids else None,
+        "start_latlng": start_latlng if outdoor else [],
+        "end_latlng": end_latlng if outdoor else [],
+    }
+
+
+def whoop_workout(athlete, activity, intensity) -> dict:
+    """The WHOOP v2 workout recorded alongside a Strava activity."""
+    rng = athlete.rng
+    sport_name, sport_id = WHOOP_SPORTS[activity["type"]]
+    start = _parse_timestamp(activity["start_date"])
+    duration_milli = activity["elapsed_time"] * 1000
+    created_at = start + timedelta(
+        milliseconds=duration_milli, minutes=rng.randint(1, 60)
+    )
+    outdoor = activity["type"] in OUTDOOR_TYPES
+
+    # Harder sessions shift time into the higher heart rate zones
+    zone_weights = [
+        max(0.02, 1 - abs(zone / 5 - (0.2 + 0.6 * intensity)) * 2) for zone in range(6)
+    ]
+    strain = 4 + 14 * intensity * min(1.5, duration_milli / 3_600_000)
+
+    return {
+        "id": str(uuid.UUID(int=rng.getrandbits(128), version=4)),
+        "v1_id": None,
+        "user_id": athlete.user_id,
+        "created_at": _timestamp(created_at),
+        "updated_at": _timestamp(created_at),
+        "start": _timestamp(start),
+        "end": _timestamp(start + timedelta(milliseconds=duration_milli)),
+        "timezone_offset": "+01:00",
+        "sport_name": sport_name,
+        "score_state": "SCORED",
+        "score": {
+            "strain": round(min(21.0, strain + rng.uniform(-1, 1)), 4),
+            "average_heart_rate": int(activity["average_heartrate"])
+            + rng.randint(-3, 3),
+            "max_heart_rate": int(activity["max_heartrate"]),
+            "kilojoule": round(
+                activity["kilojoules"] or duration_milli / 1000 * rng.uniform(0.4, 0.9),
+                4,
+            ),
+            "percent_recorded": (
+                100.0 if rng.random() < 0.95 else round(rng.uniform(80, 99), 1)
+            ),
+            "distance_meter": activity["distance"] if outdoor else None,
+            "altitude_gain_meter": (
+                activity["total_elevation_gain"] if outdoor else None
+            ),
+            "altitude_change_meter": round(rng.uniform(-5, 5), 1) if outdoor else None,
+            "zone_durations": {
+                f"zone_{name}_milli": int(duration_milli * weight / sum(zone_weights))
+                for name, weight in zip(ZONE_NAMES, zone_weights)
+            },
+        },
+        "sport_id": sport_id,
+    }
+
+
+def whoop_sleep(athlete, start, asleep_hours, cycle_id, nap=False) -> dict:
+    """A WHOOP v2 sleep with stage_summary and sleep_needed structs."""
+    rng = athlete.rng
+    asleep_milli = int(asleep_hours * 3_600_000)
+    awake_milli = int(asleep_milli * rng.uniform(0.04, 0.14))
+    deep_milli = int(asleep_milli * rng.uniform(0.13, 0.25))
+    rem_milli = int(asleep_milli * rng.uniform(0.17, 0.28))
+    in_bed_milli = asleep_milli + awake_milli + rng.randint(2, 15) * 60_000
+    need_milli = int(athlete.sleep_need_hours * 3_600_000)
+    debt_milli = 0 if nap else max(0, int(rng.gauss(0.3, 0.3) * 3_600_000))
+    end = start + timedelta(milliseconds=in_bed_milli)
+
+    return {
+        "id": str(uuid.UUID(int=rng.getrandbits(128), version=4)),
+        "cycle_id": cycle_id,
+        "v1_id": None,
+        "user_id": athlete.user_id,
+        "created_at": _timestamp(end + timedelta(minutes=rng.randint(1, 90))),
+        "updated_at": _timestamp(end + timedelta(minutes=rng.randint(90, 180))),
+        "start": _timestamp(start),
+        "end": _timestamp(end),
+        "timezone_offset": "+01:00",
+        "nap": nap,
+        "score_state": "SCORED",
+        "score": {
+            "stage_summary": {
+                "total_in_bed_time_milli": in_bed_milli,
+                "total_awake_time_milli": awake_milli,
+                "total_no_data_time_milli": 0,
+                "total_light_sleep_time_milli": asleep_milli - deep_milli - rem_milli,
+                "total_slow_wave_sleep_time_milli": deep_milli,
+                "total_rem_sleep_time_milli": rem_milli,
+                "sleep_cycle_count": max(1, round(asleep_hours / 1.5)),
+                "disturbance_count": rng.randint(0, 15),
+            },
+            "sleep_needed": {
+                "baseline_milli": need_milli,
+                "need_from_sleep_debt_milli": debt_milli,
+                "need_from_recent_strain_milli": rng.randint(0, 1_800_000),
+                "need_from_recent_nap_milli": 0,
+            },
+            "respiratory_rate": round(rng.gauss(15, 0.8), 4),
+            "sleep_performance_percentage": round(
+                min(100.0, asleep_milli / (need_milli + debt_milli) * 100), 1
+            ),
+            "sleep_consistency_percentage": round(rng.uniform(50, 95), 1),
+            "sleep_efficiency_percentage": round(asleep_milli / in_bed_milli * 100, 4),
+        },
+    }
+
+
+def whoop_cycle(athlete, cycle_id, start, end, strain, kilojoule) -> dict:
+    """A WHOOP v2 physiological cycle (wake-up to wake-up)."""
+    rng = athlete.rng
+    return {
+        "id": cycle_id,
+        "user_id": athlete.user_id,
+        "created_at": _timestamp(start + timedelta(minutes=rng.randint(1, 30))),
+        "updated_at": _timestamp(end),
+        "start": _timestamp(start),
+        "end": _timestamp(end),
+        "timezone_offset": "+01:00",
+        "score_state": "SCORED",
+        "score": {
+            "strain": round(strain, 4),
+            "kilojoule": round(kilojoule, 4),
+            "average_heart_rate": athlete.resting_heartrate + rng.randint(12, 25),
+            "max_heart_rate": athlete.max_heartrate - rng.randint(0, 25),
+        },
+    }
+
+
+def whoop_recovery(athlete, cycle_id, sleep, recovery_score, hrv_milli) -> dict:
+    """A WHOOP v2 recovery, scored from the night's sleep."""
+    rng = athlete.rng
+    return {
+        "cycle_id": cycle_id,
+        "sleep_id": sleep["id"],
+        "user_id": athlete.user_id,
+        "created_at": sleep["created_at"],
+        "updated_at": sleep["updated_at"],
+        "score_state": "SCORED",
+        "score": {
+            "user_calibrating": False,
+            "recovery_score": round(recovery_score),
+            "resting_heart_rate": round(
+                athlete.resting_heartrate + (50 - recovery_score) / 10
+            ),
+            "hrv_rmssd_milli": round(hrv_milli, 4),
+            "spo2_percentage": round(rng.uniform(94, 99), 4),
+            "skin_temp_celsius": round(rng.gauss(33.7, 0.4), 4),
+        },
+    }
+
+
+def strava_streams(athlete, activity, intensity) -> dict:
+    """Per-second streams around the activity averages, in Strava's key_by_type format."""
+    np_rng = np.random.default_rng([athlete.seed, athlete.index, activity["id"]])
+    n = activity["elapsed_time"]
+
+    def smooth_noise(scale: float, window: int = 30) -> np.ndarray:
+        noise = np_rng.normal(0, scale, n + window - 1)
+        return np.convolve(noise, np.ones(window) / math.sqrt(window), "valid")
+
+    seconds = np.arange(n)
+    velocity = np.clip(activity["average_speed"] * (1 + smooth_noise(0.08)), 0, None)
+    # Short stops, so that moving time < elapsed time
+    velocity[np_rng.random(n) < 1 - activity["moving_time"] / n] = 0
+    heartrate = np.clip(
+        activity["average_heartrate"] + 12 * (seconds / n - 0.5) + smooth_noise(2.5),
+        athlete.resting_heartrate,
+        athlete.max_heartrate,
+    )
+
+    streams = {
+        "time": seconds,
+        "distance": np.cumsum(velocity),
+        "velocity_smooth": velocity,
+        "heartrate": heartrate.round(),
+        "altitude": 40 + np.cumsum(smooth_noise(0.05)),
+    }
+    if activity["average_cadence"]:
+        cadence = activity["average_cadence"] + smooth_noise(1.5)
+        streams["cadence"] = np.where(velocity > 0, cadence, 0).round()
+    if activity["average_watts"]:
+        watts = activity["average_watts"] * (1 + smooth_noise(0.15, window=10))
+        # Occasional hard efforts give the power curve a realistic shape
+        for _ in range(max(1, n // 1200)):
+            effort_start = int(np_rng.integers(0, max(1, n - 300)))
+            effort_length = int(np_rng.integers(10, 300))
+            watts[effort_start : effort_start + effort_length] *= 1.2 + 0.5 * intensity
+        streams["watts"] = np.where(velocity > 0, np.clip(watts, 0, None), 0).round()
+
+    return {
+        key: {
+            "data": values.round(2).tolist(),
+            "series_type": "distance",
+            "original_size": n,
+            "resolution": "high",
+        }
+        for key, values in streams.items()
+    }
+
+
+def generate_athlete(
+    athlete, first_date, days, writers, streams_dir=None, streams_fraction=0.0
+) -> int:
+    """
+    Write all records of one athlete, day by day.
+
+    Sleep, recovery and training are coupled: hard days lengthen the next night,
+    short nights and high strain lower HRV and recovery, and low recovery means
+    fewer and easier sessions.
+
+    Returns:
+        Number of written stream files
+    """
+    rng = athlete.rng
+    previous_strain = 8.0
+    streams_count = 0
+
+    for day in range(days):
+        date = first_date + timedelta(days=day)
+        cycle_id = athlete.user_id * 100_000 + day
+        weekend = date.weekday() >= 5
+
+        # Night sleep starting the evening before, longer after hard days and on weekends
+        bedtime = date - timedelta(hours=24 - athlete.bedtime_hour - 0.75 * weekend)
+        bedtime += timedelta(minutes=rng.gauss(0, 35))
+        asleep_hours = rng.gauss(
+            athlete.sleep_need_hours
+            - 0.6
+            + 0.05 * (previous_strain - 10)
+            + 0.5 * weekend,
+            0.7,
+        )
+        asleep_hours = min(10.5, max(3.5, asleep_hours))
+        sleep = whoop_sleep(athlete, bedtime, asleep_hours, cycle_id)
+        writers["sleeps"].write(sleep)
+
+        # Recovery follows HRV, which drops after strain and bad sleep
+        sleep_performance = sleep["score"]["sleep_performance_percentage"]
+        hrv_milli = (
+            athlete.hrv_baseline_milli
+            * rng.lognormvariate(0, 0.15)
+            * (1 - 0.015 * (previous_strain - 10))
+            * (0.85 + 0.15 * sleep_performance / 100)
+        )
+        recovery_score = 55 + 110 * (hrv_milli / athlete.hrv_baseline_milli - 1)
+        recovery_score = min(
+            99, max(1, recovery_score + 0.3 * (sleep_performance - 85))
+        )
+        writers["recoveries"].write(
+            whoop_recovery(athlete, cycle_id, sleep, recovery_score, hrv_milli)
+        )
+
+        # Training: fewer and easier sessions on low recovery days
+        wake_up = _parse_timestamp(sleep["end"])
+        weights = athlete.sport_weights_on(date)
+        sessions_expected = (
+            athlete.sessions_per_week / 7 * (0.6 + 0.8 * recovery_score / 100)
+        )
+        sessions = min(3, sum(rng.random() < sessions_expected / 3 for _ in range(3)))
+        day_strain = rng.uniform(4, 7)
+        day_kilojoule = rng.uniform(6000, 9000)
+
+        for session in range(sessions):
+            activity_type = rng.choices(list(weights), weights=list(weights.values()))[
+                0
+            ]
+            intensity = min(
+                1.0, max(0.0, rng.gauss(0.25 + 0.5 * recovery_score / 100, 0.2))
+            )
+            start = date + timedelta(hours=7 + 5 * session + rng.uniform(0, 4))
+            start = max(start, wake_up + timedelta(minutes=30))
+            activity_id = 10_000_000_000 + cycle_id * 10 + session
+
+            activity = strava_activity(
+                athlete, activity_id, activity_type, start, intensity
+            )
+            writers["activities"].write(activity)
+
+            # Most activities are also recorded by WHOOP
+            if rng.random() < 0.9:
+                workout = whoop_workout(athlete, activity, intensity)
+                writers["workouts"].write(workout)
+                day_strain += 0.5 * workout["score"]["strain"]
+                day_kilojoule += workout["score"]["kilojoule"]
+
+            if streams_dir and rng.random() < streams_fraction:
+                with open(streams_dir / f"streams_{activity_id}.json", "w") as f:
+                    json.dump(strava_streams(athlete, activity, intensity), f)
+                streams_count += 1
+
+        # Occasional afternoon nap after a short night
+        if asleep_hours < athlete.sleep_need_hours - 1 and rng.random() < 0.3:
+            nap_start = date + timedelta(hours=14, minutes=rng.randint(0, 90))
+            nap_hours = rng.uniform(0.3, 1.2)
+            writers["sleeps"].write(
+                whoop_sleep(athlete, nap_start, nap_hours, cycle_id, nap=True)
+            )
+
+        previous_strain = min(21.0, day_strain)
+        next_bedtime = _parse_timestamp(sleep["start"]) + timedelta(days=1)
+        writers["cycles"].write(
+            whoop_cycle(
+                athlete, cycle_id, wake_up, next_bedtime, previous_strain, day_kilojoule
+            )
+        )
+
+    return streams_count
+
+
+def generate_dataset(
+    raw_dir: Path,
+    athlete_years: int = 1,
+    seed: int = 42,
+    years: int = 1,
+    streams_fraction: float = 0.0,
+) -> dict:
+    """
+    Write synthetic raw JSON files for the loaders into raw_dir/strava and raw_dir/whoop.
+
+    Args:
+        raw_dir: Raw data directory (0_data/raw of the target workspace)
+        athlete_years: Number of athlete-years to generate (per athlete-year roughly
+            300 activities and WHOOP workouts, 380 sleeps, 365 cycles and recoveries)
+        seed: Random seed, the same seed and arguments always produce the same records
+        years: History length per athlete, athletes = ceil(athlete_years / years)
+        streams_fraction: Share of activities that also get per-second streams
+            (written to raw_dir/strava/streams/streams_<activity_id>.json)
+
+    Returns:
+        Dict with the number of generated records per dataset
+    """
+    strava_dir = Path(raw_dir) / "strava"
+    whoop_dir = Path(raw_dir) / "whoop"
+    strava_dir.mkdir(parents=True, exist_ok=True)
+    whoop_dir.mkdir(parents=True, exist_ok=True)
+    streams_dir = None
+    if streams_fraction > 0:
+        streams_dir = strava_dir / "streams"
+        streams_dir.mkdir(exist_ok=True)
+
+    days = years * DAYS_PER_YEAR
+    first_date = END_DATE - timedelta(days=days - 1)
+
+    # Named like the extract script output, so the loaders pick them up as the newest files
+    stamp = datetime.now()
+    paths = {
+        "activities": strava_dir / f"activities_{stamp:%Y%m%d_%H%M%S}.json",
+        **{
+            dataset: whoop_dir / f"{dataset}_{stamp:%Y-%m-%d}.json"
+            for dataset in DATASETS[1:]
+        },
+    }
+
+    streams_count = 0
+    with ExitStack() as stack:
+        writers = {
+            dataset: stack.enter_context(JsonArrayWriter(path))
+            for dataset, path in paths.items()
+        }
+        for index in range(math.ceil(athlete_years / years)):
+            streams_count += generate_athlete(
+                Athlete(index, seed),
+                first_date,
+                days,
+                writers,
+                streams_dir,
+                streams_fraction,
+            )
+
+    counts = {dataset: writer.count for dataset, writer in writers.items()}
+    counts["streams"] = streams_count
+    return counts
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Generate synthetic Strava/WHOOP raw data for benchmarks."
+    )
+    parser.add_argument(
+        "--output",
+        type=Path,
+        required=True,
+        help="Directory to write to (gets strava/ and whoop/ subfolders). "
+        "Do not point this at 0_data/raw: the loaders delete all but the newest files.",
+    )
+    parser.add_argument("--athlete-years", type=int, default=1)
+    parser.add_argument("--years", type=int, default=1, help="History per athlete")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument(
+        "--streams",
+        type=float,
+        default=0.0,
+        help="Share of activities that also get per-second streams (0-1)",
+    )
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    counts = generate_dataset(
+        args.output, args.athlete_years, args.seed, args.years, args.streams
+    )
+    elapsed = time.perf_counter() - start
+    size_mb = sum(f.stat().st_size for f in args.output.rglob("*.json")) / 1024**2
+
+    print(f"✅ Generated {args.athlete_years} athlete-year(s) in {elapsed:.1f}s")
+    for dataset, count in counts.items():
+        print(f"   {dataset}: {count:,}")
+    print(f"   Written to: {args.output} ({size_mb:,.1f} MB)")
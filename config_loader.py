@@ -95,6 +95,10 @@ class Config:
     def processed_data_path(self):
         return self.get("paths", "processed_data", default="0_data/processed")
 
+    @property
+    def load_metrics_to_duckdb(self):
+        return self.get("load_metrics", "write_to_duckdb", default=True)
+
     @property
     def whoop_client_id(self):
         return self.get("whoop", "client_id")
@@ -1,5 +1,96 @@
+#!/usr/bin/env python3
+"""
+sport-analytics command line interface (run from the project root).
+
+    python main.py run                        # full refresh: extract, load, transform, publish
+    python main.py run --select transform+    # rebuild from the data already loaded
+    python main.py run --select whoop+        # only the WHOOP branch and what depends on it
+    python main.py run --full-build           # rebuild every dbt model, not only changed ones
+    python main.py list                       # show the stages and their dependencies
+    python main.py recluster                  # rewrite out-of-order fact tables, then publish
+"""
+
+import argparse
+import time
+
+from pipeline import (
+    MAINTENANCE_STAGES,
+    STAGES,
+    print_summary,
+    run_pipeline,
+    select_stages,
+)
+from source_state import BuildPlan
+
+
 def main():
-    print("Hello from sport-analytics!")
+    parser = argparse.ArgumentParser(
+        prog="python main.py", description="Run the sport analytics pipeline."
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = subparsers.add_parser(
+        "run", help="Run the extract -> load -> transform -> publish pipeline"
+    )
+    run_parser.add_argument(
+        "--select",
+        nargs="+",
+        help="Stages or tags to run; prefix/suffix '+' adds upstream/downstream stages",
+    )
+    run_parser.add_argument(
+        "--max-workers", type=int, default=4, help="Stages that may run at once"
+    )
+    run_parser.add_argument(
+        "--full-build",
+        action="store_true",
+        help="Rebuild all dbt models, not only those downstream of changed sources",
+    )
+    run_parser.add_argument(
+        "--dry-run", action="store_true", help="Only print the selected stages"
+    )
+
+    list_parser = subparsers.add_parser("list", help="List the pipeline stages")
+    list_parser.add_argument("--select", nargs="+")
+
+    subparsers.add_parser(
+        "recluster",
+        help="Rewrite fact tables whose rows drifted out of cluster_by order, then publish",
+    )
+
+    args = parser.parse_args()
+
+    if args.command == "recluster":
+        start = time.perf_counter()
+        records = run_pipeline(MAINTENANCE_STAGES, max_workers=1)
+        print_summary(records, time.perf_counter() - start)
+        if any(record["status"] != "success" for record in records):
+            raise SystemExit(1)
+        return
+
+    try:
+        stages = select_stages(args.select)
+    except ValueError as e:
+        print(f"❌ {e}")
+        raise SystemExit(2)
+
+    if args.command == "list" or args.dry_run:
+        for stage in STAGES:
+            if stage in stages:
+                after = ", ".join(stage.depends_on) or "-"
+                print(
+                    f"  {stage.name:<20} after: {after:<40} tags: {', '.join(stage.tags)}"
+                )
+        return
+
+    start = time.perf_counter()
+    plan = BuildPlan(full_build=args.full_build)
+    records = run_pipeline(stages, max_workers=args.max_workers, plan=plan)
+    print_summary(records, time.perf_counter() - start)
+    if plan.sources is not None:
+        print(f"📋 dbt: {plan.describe()}")
+
+    if any(record["status"] != "success" for record in records):
+        raise SystemExit(1)
 
 
 if __name__ == "__main__":
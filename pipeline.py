@@ -0,0 +1,371 @@
+#!/usr/bin/env python3
+"""
+Pipeline Orchestrator
+Runs extract -> load -> transform -> publish as a DAG of stages.
+
+The Strava and WHOOP branches are independent, so their stages run
+concurrently. DuckDB allows a single writing process per database file, so
+every stage declares the files it opens for writing and two stages sharing a
+file never run at the same time. Each stage runs as its own process (the
+scripts are written to be run standalone), with its output captured to
+logs/pipeline/<stage>.log.
+
+The dbt stages only rebuild models downstream of the raw tables that changed
+since the last complete build (see source_state.py).
+"""
+
+import subprocess
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime
+from pathlib import Path
+
+from source_state import BuildPlan
+
+PROJECT_ROOT = Path(__file__).parent
+DBT_DIR = PROJECT_ROOT / "1_elt" / "2_transform"
+LOG_DIR = PROJECT_ROOT / "logs" / "pipeline"
+
+
+class Stage:
+    """
+    One step of the pipeline: a command plus its dependencies and write locks.
+
+    The command is either a fixed argument list or a function of the run's
+    BuildPlan that returns the arguments when the stage starts, or None if the
+    stage has nothing to do.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        command,
+        cwd: Path = PROJECT_ROOT,
+        depends_on: tuple = (),
+        locks: tuple = (),
+        tags: tuple = (),
+    ):
+        self.name = name
+        self.command = command
+        self.cwd = cwd
+        self.depends_on = depends_on
+        self.locks = locks
+        self.tags = tags
+
+
+def dbt_seed(plan: BuildPlan) -> list | None:
+    # Seeds are part of the project fingerprint, unchanged seeds are already loaded
+    if plan and not plan.project_changed:
+        return None
+    return ["dbt", "seed", "--target", "source"]
+
+
+def dbt_run(layer: str, target: str):
+    """Command of a dbt run stage, selecting only the models that need a rebuild."""
+
+    def command(plan: BuildPlan) -> list | None:
+        selectors = plan.selectors(layer) if plan else [f"{layer}.*"]
+        if not selectors:
+            return None
+        return ["dbt", "run", "--select", *selectors, "--target", target]
+
+    return command
+
+
+def publish(plan: BuildPlan) -> list | None:
+    if plan and not plan.selectors("metrics"):
+        return None
+    return [sys.executable, "analytics_db.py", "publish"]
+
+
+# Same order and targets as in 1_elt/2_transform/HOW_TO_RUN.md. The transform and
+# analytics targets ATTACH the upstream files read-write, so they lock them as well.
+STAGES = [
+    Stage(
+        "extract_strava",
+        [sys.executable, "1_elt/0_extract/strava/extract_strava_data.py"],
+        tags=("extract", "strava"),
+    ),
+    Stage(
+        "extract_whoop",
+        [sys.executable, "1_elt/0_extract/whoop/extract_whoop_data.py"],
+        tags=("extract", "whoop"),
+    ),
+    Stage(
+        "load_strava",
+        [sys.executable, "1_elt/1_load/strava/load_strava_data.py"],
+        depends_on=("extract_strava",),
+        locks=("source",),
+        tags=("load", "strava"),
+    ),
+    Stage(
+        "load_whoop",
+        [sys.executable, "1_elt/1_load/whoop/load_whoop_data.py"],
+        depends_on=("extract_whoop",),
+        locks=("source",),
+        tags=("load", "whoop"),
+    ),
+    Stage(
+        "load_strava_streams",
+        [sys.executable, "1_elt/1_load/strava/load_strava_streams.py"],
+        depends_on=("load_strava",),
+        locks=("source",),
+        tags=("load", "strava"),
+    ),
+    Stage(
+        "dbt_seed",
+        dbt_seed,
+        cwd=DBT_DIR,
+        locks=("source",),
+        tags=("transform", "dbt"),
+    ),
+    Stage(
+        "dbt_staging",
+        dbt_run("staging", "source"),
+        cwd=DBT_DIR,
+        depends_on=("load_strava", "load_strava_streams", "load_whoop", "dbt_seed"),
+        locks=("source",),
+        tags=("transform", "dbt"),
+    ),
+    Stage(
+        "dbt_intermediate",
+        dbt_run("intermediate", "transform"),
+        cwd=DBT_DIR,
+        depends_on=("dbt_staging",),
+        locks=("source", "transform"),
+        tags=("transform", "dbt"),
+    ),
+    Stage(
+        "dbt_metrics",
+        dbt_run("metrics", "analytics"),
+        cwd=DBT_DIR,
+        depends_on=("dbt_intermediate",),
+        locks=("source", "transform", "analytics"),
+        tags=("transform", "dbt"),
+    ),
+    Stage(
+        "publish",
+        publish,
+        depends_on=("dbt_metrics",),
+        locks=("analytics",),
+        tags=("publish",),
+    ),
+]
+
+# On demand only (python main.py recluster): reclustering checks scan every fact
+# table in full, which would make each incremental run cost O(table size)
+MAINTENANCE_STAGES = [
+    Stage(
+        "dbt_recluster",
+        ["dbt", "run-operation", "recluster_tables", "--target", "analytics"],
+        cwd=DBT_DIR,
+        locks=("analytics",),
+        tags=("maintenance", "dbt"),
+    ),
+    Stage(
+        "publish",
+        [sys.executable, "analytics_db.py", "publish"],
+        depends_on=("dbt_recluster",),
+        locks=("analytics",),
+        tags=("publish",),
+    ),
+]
+
+
+def select_stages(selectors: list = None, stages: list = STAGES) -> list:
+    """
+    Resolve --select arguments to the stages to run, in pipeline order.
+
+    A selector is a stage name or a tag (extract, load, transform, dbt, publish,
+    strava, whoop). Like in dbt, a leading "+" adds all upstream stages and a
+    trailing "+" all downstream stages, e.g. "load_whoop+" or "+dbt_staging".
+    Without selectors, every stage is selected.
+    """
+    if not selectors:
+        return list(stages)
+
+    by_name = {stage.name: stage for stage in stages}
+    downstream = {stage.name: set() for stage in stages}
+    for stage in stages:
+        for dependency in stage.depends_on:
+            downstream[dependency].add(stage.name)
+
+    def closure(start: set, edges) -> set:
+        found, todo = set(start), list(start)
+        while todo:
+            for name in edges(todo.pop()):
+                if name not in found:
+                    found.add(name)
+                    todo.append(name)
+        return found
+
+    selected = set()
+    for selector in selectors:
+        name = selector.strip("+")
+        matched = {
+            stage.name for stage in stages if name == stage.name or name in stage.tags
+        }
+        if not matched:
+            raise ValueError(
+                f"Unknown stage or tag '{name}', "
+                f"choose from: {', '.join(by_name)} or a tag"
+            )
+        if selector.startswith("+"):
+            matched = closure(matched, lambda n: by_name[n].depends_on)
+        if selector.endswith("+"):
+            matched = closure(matched, lambda n: downstream[n])
+        selected |= matched
+
+    return [stage for stage in stages if stage.name in selected]
+
+
+def run_stage(stage: Stage, command: list) -> tuple:
+    """Run one stage, write its output to the log directory and return (returncode, log path)."""
+    LOG_DIR.mkdir(parents=True, exist_ok=True)
+    log_path = LOG_DIR / f"{stage.name}.log"
+    with open(log_path, "w") as log:
+        log.write(f"$ {' '.join(command)}\n")
+        log.flush()
+        result = subprocess.run(
+            command, cwd=stage.cwd, stdout=log, stderr=subprocess.STDOUT
+        )
+    return result.returncode, log_path
+
+
+def run_pipeline(stages: list, max_workers: int = 4, plan: BuildPlan = None) -> list:
+    """
+    Run the given stages as a DAG and return one timing record per stage.
+
+    Dependencies on stages that are not part of the run count as satisfied, so
+    a partial run (e.g. only the transform stages) works on the existing data.
+    When a stage fails, its downstream stages are skipped and independent ones
+    still run. Stages whose command resolves to None for the given build plan
+    are recorded as unchanged. Without a plan, the dbt stages build everything.
+    """
+    selected = {stage.name for stage in stages}
+    pending = list(stages)
+    running = {}
+    records = {}
+    held_locks = set()
+    pipeline_start = time.perf_counter()
+
+    def finished(name: str) -> bool:
+        status = records.get(name, {}).get("status")
+        return name not in selected or status in ("success", "unchanged")
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        while pending or running:
+            for stage in list(pending):
+                blocked_by = [
+                    name
+                    for name in stage.depends_on
+                    if records.get(name, {}).get("status") in ("failed", "skipped")
+                ]
+                if blocked_by:
+                    pending.remove(stage)
+                    records[stage.name] = {
+                        "stage": stage.name,
+                        "status": "skipped",
+                        "reason": f"upstream {', '.join(blocked_by)} did not succeed",
+                    }
+                    print(f"⏭️  {stage.name} skipped ({records[stage.name]['reason']})")
+                    continue
+                if len(running) >= max_workers or held_locks & set(stage.locks):
+                    continue
+                if not all(finished(name) for name in stage.depends_on):
+                    continue
+
+                pending.remove(stage)
+                try:
+                    command = (
+                        stage.command(plan)
+                        if callable(stage.command)
+                        else stage.command
+                    )
+                except Exception as e:
+                    records[stage.name] = {"stage": stage.name, "status": "failed"}
+                    print(f"❌ {stage.name} could not be planned: {e}")
+                    continue
+                if command is None:
+                    records[stage.name] = {"stage": stage.name, "status": "unchanged"}
+                    print(f"💤 {stage.name} unchanged, nothing to rebuild")
+                    continue
+
+                held_locks |= set(stage.locks)
+                print(f"▶️  {stage.name}")
+                future = executor.submit(run_stage, stage, command)
+                running[future] = (stage, time.perf_counter())
+
+            if not running:
+                continue
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                stage, start = running.pop(future)
+                end = time.perf_counter()
+                held_locks -= set(stage.locks)
+                try:
+                    returncode, log_path = future.result()
+                except OSError as e:
+                    returncode, log_path = None, None
+                    print(f"❌ {stage.name} could not be started: {e}")
+
+                status = "success" if returncode == 0 else "failed"
+                records[stage.name] = {
+                    "stage": stage.name,
+                    "status": status,
+                    "started_at": round(start - pipeline_start, 2),
+                    "seconds": round(end - start, 2),
+                    "log": str(log_path) if log_path else None,
+                }
+                if status == "success":
+                    print(f"✅ {stage.name} ({end - start:.2f}s)")
+                elif log_path:
+                    print(f"❌ {stage.name} failed, see {log_path}:")
+                    print(_tail(log_path))
+
+    records = [records[stage.name] for stage in stages]
+    if plan:
+        save_build_state(plan, records)
+    return records
+
+
+def save_build_state(plan: BuildPlan, records: list):
+    """
+    Remember the source fingerprints once every dbt stage and the publish
+    succeeded, so the next run only rebuilds what changed after this one.
+    """
+    statuses = {record["stage"]: record["status"] for record in records}
+    build_stages = [
+        stage.name
+        for stage in STAGES
+        if "transform" in stage.tags or "publish" in stage.tags
+    ]
+    if all(statuses.get(name) in ("success", "unchanged") for name in build_stages):
+        plan.save()
+
+
+def _tail(path: Path, lines: int = 20) -> str:
+    with open(path, "r", errors="replace") as f:
+        return "".join(f.readlines()[-lines:]).rstrip()
+
+
+def print_summary(records: list, wall_seconds: float):
+    """Print per-stage timings and compare the wall time with running them one by one."""
+    print(f"\n📊 Pipeline summary ({datetime.now().strftime('%Y-%m-%d %H:%M:%S')})")
+    print(f"  {'stage':<20} {'status':<8} {'start':>8} {'seconds':>9}")
+    for record in records:
+        started_at = record.get("started_at")
+        seconds = record.get("seconds")
+        print(
+            f"  {record['stage']:<20} {record['status']:<8} "
+            f"{f'{started_at:.2f}' if started_at is not None else '-':>8} "
+            f"{f'{seconds:.2f}' if seconds is not None else '-':>9}"
+        )
+
+    sequential_seconds = sum(record.get("seconds") or 0 for record in records)
+    print(
+        f"\n⏱️  Wall time: {wall_seconds:.2f}s "
+        f"(stages one after another: {sequential_seconds:.2f}s)"
+    )
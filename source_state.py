@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Source State
+Decides which dbt models need a rebuild by comparing fingerprints of the raw
+tables in source.duckdb with the ones taken at the last complete build.
+
+A fingerprint is the row count plus an order-independent hash of all rows, so
+it changes with every load that inserts rows, no matter whether the load ran
+through the orchestrator or by hand. Only models downstream of changed sources
+(`dbt run --select source:whoop.whoop_sleeps+`) are rebuilt. Any change to the
+dbt project itself (models, macros, seeds, vars) triggers a full build.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+
+import duckdb
+import yaml
+
+PROJECT_ROOT = Path(__file__).parent
+DBT_DIR = PROJECT_ROOT / "1_elt" / "2_transform"
+DATABASE_DIR = PROJECT_ROOT / "0_data" / "database"
+SOURCE_PATH = DATABASE_DIR / "source.duckdb"
+STATE_PATH = DATABASE_DIR / "dbt_build_state.json"
+
+# Files that change what dbt builds, independent of the data
+PROJECT_FILES = ["dbt_project.yml", "packages.yml", "models", "macros", "seeds"]
+
+
+def declared_sources() -> dict:
+    """
+    dbt sources declared in the project's YAML files.
+
+    Returns:
+        {"whoop.whoop_sleeps": "whoop.whoop_sleeps", ...} mapping the dbt source
+        name (<source>.<table>) to its relation in source.duckdb
+    """
+    sources = {}
+    for path in sorted((DBT_DIR / "models").rglob("*.yml")):
+        with open(path, "r") as f:
+            document = yaml.safe_load(f) or {}
+        for source in document.get("sources") or []:
+            schema = source.get("schema", source["name"])
+            for table in source.get("tables") or []:
+                identifier = table.get("identifier", table["name"])
+                sources[f"{source['name']}.{table['name']}"] = f"{schema}.{identifier}"
+    return sources
+
+
+def fingerprint_sources(database_path: Path = SOURCE_PATH) -> dict:
+    """Fingerprint of every declared source table (None if the table does not exist)."""
+    if not database_path.exists():
+        return {name: None for name in declared_sources()}
+
+    fingerprints = {}
+    con = duckdb.connect(str(database_path), read_only=True)
+    try:
+        for name, relation in declared_sources().items():
+            try:
+                # Order-independent: the sum changes with every added or removed row,
+                # also with a duplicate pair, which cancels out in the XOR
+                rows, hash_sum, hash_xor = con.execute(
+                    f"SELECT COUNT(*), COALESCE(SUM(HASH(t)::HUGEINT), 0), "
+                    f"COALESCE(BIT_XOR(HASH(t)), 0) FROM {relation} t"
+                ).fetchone()
+                fingerprints[name] = f"{rows}:{hash_sum}:{hash_xor}"
+            except duckdb.CatalogException:
+                fingerprints[name] = None
+    finally:
+        con.close()
+    return fingerprints
+
+
+def project_fingerprint() -> str:
+    """Hash over the paths and contents of all dbt project files."""
+    digest = hashlib.sha256()
+    for entry in PROJECT_FILES:
+        path = DBT_DIR / entry
+        files = sorted(path.rglob("*")) if path.is_dir() else [path]
+        for file in files:
+            if file.is_file():
+                digest.update(str(file.relative_to(DBT_DIR)).encode())
+                digest.update(file.read_bytes())
+    return digest.hexdigest()
+
+
+def read_state() -> dict | None:
+    """Fingerprints of the last complete build (None if there was none yet)."""
+    if not STATE_PATH.exists():
+        return None
+    with open(STATE_PATH, "r") as f:
+        return json.load(f)
+
+
+def write_state(sources: dict, project: str):
+    """Store the fingerprints a complete build was run on."""
+    state = {
+        "built_at": datetime.now().isoformat(),
+        "project": project,
+        "sources": sources,
+    }
+    STATE_PATH.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = STATE_PATH.with_name(f".{STATE_PATH.name}.tmp")
+    with open(tmp_path, "w") as f:
+        json.dump(state, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, STATE_PATH)
+
+
+class BuildPlan:
+    """
+    Which models one pipeline run rebuilds.
+
+    The project fingerprint is taken up front; source fingerprints are taken on
+    first use, i.e. when the first dbt run stage starts after the loads. Call
+    save() once all dbt stages succeeded, so a failed build is picked up again
+    by the next run.
+    """
+
+    def __init__(self, full_build: bool = False):
+        self.full_build = full_build
+        self.state = None if full_build else read_state()
+        self.project = project_fingerprint()
+        self.sources = None
+        self.changed = None
+
+    @property
+    def project_changed(self) -> bool:
+        return self.state is None or self.state.get("project") != self.project
+
+    def changed_sources(self) -> list | None:
+        """Changed source names, or None if everything has to be rebuilt."""
+        if self.sources is None:
+            self.sources = fingerprint_sources()
+            if self.project_changed:
+                self.changed = None
+            else:
+                previous = self.state.get("sources", {})
+                self.changed = [
+                    name
+                    for name, fingerprint in self.sources.items()
+                    if fingerprint != previous.get(name)
+                ]
+        return self.changed
+
+    def selectors(self, layer: str) -> list:
+        """
+        dbt --select arguments for the models of one layer (e.g. "staging"),
+        an empty list if none of them needs a rebuild.
+        """
+        changed = self.changed_sources()
+        if changed is None:
+            return [f"{layer}.*"]
+        # "," intersects in dbt: models of this layer downstream of the source
+        return [f"source:{name}+,{layer}.*" for name in changed]
+
+    def describe(self) -> str:
+        changed = self.changed_sources()
+        if self.full_build:
+            return "full build (requested)"
+        if self.state is None:
+            return "full build (no previous build state)"
+        if changed is None:
+            return "full build (dbt project changed)"
+        if not changed:
+            return "no source changed"
+        return f"changed sources: {', '.join(changed)}"
+
+    def save(self):
+        if self.sources is not None:
+            write_state(self.sources, self.project)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Show which dbt sources changed since the last complete build."
+    )
+    parser.parse_args()
+
+    try:
+        plan = BuildPlan()
+        print(f"📋 {plan.describe()}")
+        for layer in ("staging", "intermediate", "metrics"):
+            print(f"   {layer}: {' '.join(plan.selectors(layer)) or '-'}")
+    except duckdb.Error as e:
+        print(f"❌ {e}")
+        raise SystemExit(1)